@@ -0,0 +1,46 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from orderflow.analytics import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the analytics rollups day by day from the order tables and the "
+        "archive (for orders written before the rollups existed, or to repair them)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            type=date.fromisoformat,
+            metavar="YYYY-MM-DD",
+            help="First day to rebuild (default: the oldest order's).",
+        )
+        parser.add_argument(
+            "--until",
+            type=date.fromisoformat,
+            metavar="YYYY-MM-DD",
+            help="Last day to rebuild (default: today).",
+        )
+
+    def handle(self, *args, **options):
+        first = options["since"] or rollups.first_day()
+        last = options["until"] or timezone.localdate()
+        if first is None:
+            self.stdout.write("No orders yet: nothing to rebuild.")
+            return
+        if first > last:
+            raise CommandError("--since must not be after --until.")
+        try:
+            days = rollups.backfill(first, last)
+        except rollups.DetachedMonths as exc:
+            raise CommandError(
+                f"The order partitions of {exc} are detached: rebuilding them would "
+                "zero their rollups. Choose --since/--until outside those months."
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {days} day(s) of rollups, {first} to {last}.")
+        )
@@ -0,0 +1,55 @@
+import json
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orderflow.analytics import reports
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute an ad-hoc report (order totals, basket sizes or co-purchased "
+        "products) from the order tables and print it as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("report", choices=sorted(reports.REPORTS))
+        parser.add_argument(
+            "--since",
+            type=date.fromisoformat,
+            metavar="YYYY-MM-DD",
+            help="First day of order creation (default: no lower bound).",
+        )
+        parser.add_argument(
+            "--until",
+            type=date.fromisoformat,
+            metavar="YYYY-MM-DD",
+            help="Last day of order creation (default: no upper bound).",
+        )
+        parser.add_argument(
+            "--bins", type=int, default=20, help="Histogram bins (totals)."
+        )
+        parser.add_argument(
+            "--limit", type=int, default=20, help="Pairs to list (co_purchase)."
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="Rows per chunk (default: ANALYTICS_REPORT_CHUNK_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        since, until = options["since"], options["until"]
+        if since and until and since > until:
+            raise CommandError("--since must not be after --until.")
+        for name in ("bins", "limit", "chunk_size"):
+            if options[name] is not None and options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be at least 1.")
+
+        name = options["report"]
+        data = reports.REPORTS[name](
+            reports.Range(since, until),
+            chunk_size=options["chunk_size"],
+            **{option: options[option] for option in reports.OPTIONS[name]},
+        )
+        self.stdout.write(json.dumps(data, indent=2))
@@ -0,0 +1,79 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class DailyRevenue(models.Model):
+    """
+    Orders and revenue per day of order creation, kept in step with the orders by
+    `orders.services` (see orderflow.analytics.rollups).
+
+    Every order write bumps its day's totals, so a day is split over `slot`s
+    (picked from the order id) to keep concurrent writers off a single row.
+    """
+
+    day = models.DateField()
+    slot = models.PositiveSmallIntegerField(default=0)
+    orders = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=16, decimal_places=2, default=Decimal("0"))
+
+    class Meta:
+        verbose_name = _("daily revenue")
+        verbose_name_plural = _("daily revenue")
+        permissions = [
+            ("view_analytics", "Can view order analytics"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "slot"], name="analytics_revenue_day"
+            ),
+        ]
+
+
+class DailyProductSales(models.Model):
+    """
+    Units sold and revenue (at the lines' unit price snapshots) per product and day.
+    """
+
+    day = models.DateField()
+    product = models.ForeignKey(
+        "orders.Product", on_delete=models.PROTECT, related_name="+", db_index=False
+    )
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=16, decimal_places=2, default=Decimal("0"))
+
+    class Meta:
+        verbose_name = _("daily product sales")
+        verbose_name_plural = _("daily product sales")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "product"], name="analytics_product_day"
+            ),
+        ]
+
+
+class DailyCustomerSales(models.Model):
+    """
+    Orders and revenue per customer and day.
+    """
+
+    day = models.DateField()
+    customer = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        related_name="+",
+        db_index=False,
+    )
+    orders = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=16, decimal_places=2, default=Decimal("0"))
+
+    class Meta:
+        verbose_name = _("daily customer sales")
+        verbose_name_plural = _("daily customer sales")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "customer"], name="analytics_customer_day"
+            ),
+        ]
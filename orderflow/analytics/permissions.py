@@ -0,0 +1,10 @@
+from rest_framework.permissions import BasePermission
+
+
+class CanViewAnalytics(BasePermission):
+    """
+    Admin dashboards only: requires 'analytics.view_analytics'.
+    """
+
+    def has_permission(self, request, view):
+        return request.user.has_perm("analytics.view_analytics")
@@ -0,0 +1,312 @@
+"""
+Ad-hoc order reports computed in memory with NumPy.
+
+The needed `Order`/`OrderItem` columns are streamed through a server-side
+cursor (`QuerySet.iterator`) in chunks of `ANALYTICS_REPORT_CHUNK_SIZE` rows.
+Each chunk becomes a few arrays that are reduced right away (bincounts,
+histograms, unique counts) into accumulators whose size depends on the
+data's shape, not its volume, so memory stays bounded however many orders
+a date range holds:
+
+- `totals`: count, sum, mean and quantiles of `total_price`, and a histogram
+- `baskets`: orders and revenue by lines per order, and quantiles of lines
+  and units per order
+- `co_purchase`: the product pairs bought together most often
+
+Money is handled in integer cents. Quantiles are nearest-rank, read from a
+histogram. For totals the bins are 1 cent wide (exact) until the range needs
+more than `FINE_BINS` bins.
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from itertools import islice
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+from django.conf import settings
+from django.db.models import BigIntegerField, F, Max, Min
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from orderflow.orders.models import Order, OrderItem, Product
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+FINE_BINS = 100_000  # totals quantile histogram
+
+
+@dataclass(frozen=True)
+class Range:
+    """
+    Orders created from `date_from` to `date_to`, inclusive (either may be None).
+    """
+
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+    def bounds(self, field: str) -> dict:
+        lookups = {}
+        if self.date_from is not None:
+            start = datetime.combine(self.date_from, time.min)
+            lookups[f"{field}__gte"] = timezone.make_aware(start)
+        if self.date_to is not None:
+            end = datetime.combine(self.date_to + timedelta(days=1), time.min)
+            lookups[f"{field}__lt"] = timezone.make_aware(end)
+        return lookups
+
+    def orders(self):
+        return Order.objects.filter(**self.bounds("created_at"))
+
+    def items(self):
+        return OrderItem.objects.filter(**self.bounds("order_created_at"))
+
+
+def cents(field: str):
+    return Cast(F(field) * 100, BigIntegerField())
+
+
+def money(value) -> str:
+    """
+    An amount in cents (int or float) as a string with two decimals.
+    """
+    return f"{Decimal(round(float(value))).scaleb(-2):.2f}"
+
+
+# ---------- loading ----------
+def chunks(qs, *fields: str, chunk_size: Optional[int] = None) -> Iterator[list]:
+    """
+    `qs.values_list(*fields)` in lists of up to `chunk_size` rows, fetched
+    through a server-side cursor (on PostgreSQL).
+    """
+    size = chunk_size or settings.ANALYTICS_REPORT_CHUNK_SIZE
+    rows = qs.values_list(*fields).iterator(chunk_size=size)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+class Codes(dict):
+    """
+    Dense int codes for ids (UUIDs), in order of first appearance.
+    """
+
+    def encode(self, ids) -> np.ndarray:
+        return np.fromiter(
+            (self.setdefault(pk, len(self)) for pk in ids), dtype=np.int64
+        )
+
+
+def baskets(qs, columns: tuple, chunk_size=None) -> Iterator[tuple]:
+    """
+    Chunks of whole orders from `qs` (`OrderItem`s): (order code per row, then
+    `columns` as arrays). An order never spans two chunks.
+    """
+    carry = []
+    for chunk in chunks(
+        qs.order_by("order_id"), "order_id", *columns, chunk_size=chunk_size
+    ):
+        # Rows come sorted by order: hold back the last order, it may go on.
+        rows = carry + chunk
+        cut = len(rows)
+        while cut and rows[cut - 1][0] == rows[-1][0]:
+            cut -= 1
+        if cut:
+            yield _columns(rows[:cut])
+        carry = rows[cut:]
+    if carry:
+        yield _columns(carry)
+
+
+def _columns(rows: list) -> tuple:
+    order_ids, *columns = zip(*rows)
+    codes = Codes().encode(order_ids)
+    return (codes, *(np.asarray(column) for column in columns))
+
+
+# ---------- helpers ----------
+def _add_counts(total: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    size = max(len(total), len(counts))
+    return np.pad(total, (0, size - len(total))) + np.pad(
+        counts, (0, size - len(counts))
+    )
+
+
+def quantiles(histogram: np.ndarray, values: Callable = lambda i: i) -> dict:
+    """
+    Nearest-rank quantiles of the values counted in `histogram` (bin i holds
+    value `values(i)`).
+    """
+    cumulative = np.cumsum(histogram)
+    n = int(cumulative[-1]) if len(cumulative) else 0
+    if not n:
+        return {f"p{round(q * 100)}": None for q in QUANTILES}
+    return {
+        f"p{round(q * 100)}": values(
+            int(np.searchsorted(cumulative, math.ceil(q * n), side="left"))
+        )
+        for q in QUANTILES
+    }
+
+
+# ---------- reports ----------
+def totals(period: Range = Range(), *, bins: int = 20, chunk_size=None) -> dict:
+    """
+    Distribution of order totals.
+    """
+    qs = period.orders().order_by()
+    low, high = qs.aggregate(
+        low=Min(cents("total_price")), high=Max(cents("total_price"))
+    ).values()
+    if low is None:
+        return {"orders": 0, "revenue": money(0), "histogram": []}
+    step = max(1, math.ceil((high - low + 1) / FINE_BINS))
+    fine = np.zeros((high - low) // step + 1, dtype=np.int64)
+    edges = np.linspace(low, high, bins + 1)
+    histogram = np.zeros(bins, dtype=np.int64)
+    count = revenue = 0
+
+    for chunk in chunks(
+        qs.annotate(cents=cents("total_price")), "cents", chunk_size=chunk_size
+    ):
+        values = np.fromiter((row[0] for row in chunk), dtype=np.int64)
+        count += len(values)
+        revenue += int(values.sum())
+        fine += np.bincount((values - low) // step, minlength=len(fine))
+        histogram += np.histogram(values, bins=edges)[0]
+
+    return {
+        "orders": count,
+        "revenue": money(revenue),
+        "mean": money(revenue / count),
+        "min": money(low),
+        "max": money(high),
+        "quantiles": {
+            name: money(value)
+            for name, value in quantiles(fine, lambda i: low + i * step).items()
+        },
+        "resolution": money(step),
+        "histogram": [
+            {"from": money(edges[i]), "to": money(edges[i + 1]), "orders": int(n)}
+            for i, n in enumerate(histogram)
+        ],
+    }
+
+
+def basket_sizes(period: Range = Range(), *, chunk_size=None) -> dict:
+    """
+    Orders and revenue by number of lines, and quantiles of lines and units per
+    order (orders without lines count as size 0).
+    """
+    orders = np.zeros(1, dtype=np.int64)  # by number of lines
+    revenue = np.zeros(1, dtype=np.int64)  # cents, by number of lines
+    units = np.zeros(1, dtype=np.int64)  # orders by units
+
+    qs = period.items().annotate(cents=cents("unit_price"))
+    for order, quantity, price in baskets(qs, ("quantity", "cents"), chunk_size):
+        lines = np.bincount(order)
+        amount = np.bincount(order, weights=quantity * price).astype(np.int64)
+        orders = _add_counts(orders, np.bincount(lines))
+        revenue = _add_counts(
+            revenue, np.bincount(lines, weights=amount).astype(np.int64)
+        )
+        units = _add_counts(
+            units, np.bincount(np.bincount(order, weights=quantity).astype(np.int64))
+        )
+
+    empty = period.orders().count() - int(orders.sum())
+    orders[0] += empty
+    units[0] += empty
+    count = int(orders.sum())
+    return {
+        "orders": count,
+        "sizes": [
+            {"lines": size, "orders": int(n), "revenue": money(revenue[size])}
+            for size, n in enumerate(orders)
+            if n
+        ],
+        "lines": {
+            "mean": (
+                round(float(np.arange(len(orders)) @ orders) / count, 2)
+                if count
+                else None
+            ),
+            **quantiles(orders),
+        },
+        "units": {
+            "mean": (
+                round(float(np.arange(len(units)) @ units) / count, 2)
+                if count
+                else None
+            ),
+            **quantiles(units),
+        },
+    }
+
+
+def co_purchase(period: Range = Range(), *, limit: int = 20, chunk_size=None) -> dict:
+    """
+    The `limit` product pairs found together in the most orders.
+    """
+    products = Codes()
+    pairs = np.zeros(0, dtype=np.int64)  # a << 32 | b, a < b (product codes)
+    counts = np.zeros(0, dtype=np.int64)
+    baskets_ = 0
+
+    for order, product_ids in baskets(period.items(), ("product_id",), chunk_size):
+        product = products.encode(product_ids)
+        by_order = np.lexsort((product, order))
+        order, product = order[by_order], product[by_order]
+        baskets_ += int((np.bincount(order) > 1).sum())
+        found = []
+        # Lines of an order are adjacent and sorted by product: pair every line
+        # with the ones d places after it, for every d up to the largest order.
+        for d in range(1, int(np.bincount(order).max())):
+            same = order[:-d] == order[d:]
+            found.append(product[:-d][same] << 32 | product[d:][same])
+        if not found:
+            continue
+        chunk_pairs, chunk_counts = np.unique(np.concatenate(found), return_counts=True)
+        merged, where = np.unique(
+            np.concatenate([pairs, chunk_pairs]), return_inverse=True
+        )
+        counts = np.bincount(
+            where, weights=np.concatenate([counts, chunk_counts]), minlength=len(merged)
+        ).astype(np.int64)
+        pairs = merged
+
+    top = np.argsort(-counts, kind="stable")[:limit]
+    ids = list(products)
+    chosen = {
+        ids[code] for pair in pairs[top] for code in (pair >> 32, pair & 0xFFFFFFFF)
+    }
+    names = dict(Product.objects.filter(pk__in=chosen).values_list("pk", "name"))
+
+    def product(code):
+        return {"id": str(ids[code]), "name": names.get(ids[code])}
+
+    return {
+        "orders": baskets_,  # with two or more products
+        "distinct_pairs": len(pairs),
+        "pairs": [
+            {
+                "products": [
+                    product(int(pairs[i] >> 32)),
+                    product(int(pairs[i] & 0xFFFFFFFF)),
+                ],
+                "orders": int(counts[i]),
+                "share": round(int(counts[i]) / baskets_, 4),
+            }
+            for i in top
+        ],
+    }
+
+
+REPORTS = {
+    "totals": totals,
+    "baskets": basket_sizes,
+    "co_purchase": co_purchase,
+}
+
+# Options each report takes besides `period` and `chunk_size`.
+OPTIONS = {"totals": ("bins",), "baskets": (), "co_purchase": ("limit",)}
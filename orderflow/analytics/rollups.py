@@ -0,0 +1,248 @@
+"""
+Rollups behind the analytics API: per day, orders and revenue in total
+(`DailyRevenue`), per product (`DailyProductSales`) and per customer
+(`DailyCustomerSales`), all on the order's creation day.
+
+`orders.services` calls `record()` inside its write transactions with the order
+as it was and as it is, so the rollups move in the same commit as the order.
+`backfill()` rebuilds days from the order tables and the archive, for history
+written before the rollups existed (`manage.py backfill_analytics`). Months
+whose partitions were detached (`partition_orders --detach-older-than`) are
+out of its reach, so it refuses ranges that touch them.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from typing import Iterable, Optional
+from uuid import UUID
+
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.utils import timezone
+
+from orderflow.orders import partitions
+from orderflow.orders.models import ArchivedOrder, Order, OrderItem
+
+from .models import DailyCustomerSales, DailyProductSales, DailyRevenue
+
+SLOTS = 8  # DailyRevenue rows per day
+
+
+class DetachedMonths(Exception):
+    """
+    A backfill range covers months whose order partitions are detached.
+    """
+
+    def __init__(self, months: list[date]):
+        self.months = months
+        super().__init__(", ".join(f"{month:%Y-%m}" for month in months))
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    What an order contributes to the rollups.
+    """
+
+    order_id: object
+    customer_id: object
+    day: date
+    total: Decimal
+    lines: tuple  # ((product_id, quantity, revenue), ...)
+
+    @property
+    def slot(self) -> int:
+        return self.order_id.int % SLOTS
+
+
+def snapshot(order: Order, lines: Iterable[tuple]) -> Snapshot:
+    """
+    `order` with `lines` as (product_id, quantity, unit_price) tuples.
+    """
+    return Snapshot(
+        order_id=order.pk,
+        customer_id=order.customer_id,
+        day=timezone.localdate(order.created_at),
+        total=order.total_price,
+        lines=tuple((pid, qty, qty * price) for pid, qty, price in lines),
+    )
+
+
+# ---------- incremental ----------
+def _add(model, keys: tuple, sums: tuple, deltas: dict) -> None:
+    """
+    Add `deltas` ({key values: sum values}) to `model`'s rows in one upsert.
+    Keys go in sorted order, so concurrent writers lock rows in the same order.
+    """
+    rows = sorted((k, v) for k, v in deltas.items() if any(v))
+    if not rows:
+        return
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    fields = [model._meta.get_field(name) for name in keys + sums]
+    columns = [qn(field.column) for field in fields]
+    split = len(keys)
+    conflict, added = columns[:split], columns[split:]
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    updates = ", ".join(f"{c} = {table}.{c} + EXCLUDED.{c}" for c in added)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)})"
+            f" VALUES {', '.join([placeholders] * len(rows))}"
+            f" ON CONFLICT ({', '.join(conflict)})"
+            f" DO UPDATE SET {updates}",
+            [
+                field.get_db_prep_value(value, connection)
+                for key, values in rows
+                for field, value in zip(fields, (*key, *values))
+            ],
+        )
+
+
+def record(before: Optional[Snapshot], after: Optional[Snapshot]) -> None:
+    """
+    Move the rollups from `before` to `after` (None: the order didn't/doesn't
+    exist). Call it in the transaction that writes the order.
+    """
+    revenue, customers = defaultdict(lambda: [0, 0]), defaultdict(lambda: [0, 0])
+    products = defaultdict(lambda: [0, 0])
+    for snap, sign in ((before, -1), (after, 1)):
+        if snap is None:
+            continue
+        for row in (
+            revenue[snap.day, snap.slot],
+            customers[snap.day, snap.customer_id],
+        ):
+            row[0] += sign
+            row[1] += sign * snap.total
+        for product_id, quantity, line_revenue in snap.lines:
+            row = products[snap.day, product_id]
+            row[0] += sign * quantity
+            row[1] += sign * line_revenue
+    _add(DailyRevenue, ("day", "slot"), ("orders", "revenue"), revenue)
+    _add(DailyCustomerSales, ("day", "customer"), ("orders", "revenue"), customers)
+    _add(DailyProductSales, ("day", "product"), ("quantity", "revenue"), products)
+
+
+# ---------- backfill ----------
+def _day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def first_day() -> Optional[date]:
+    """
+    Creation day of the oldest order, hot or archived.
+    """
+    oldest = [
+        qs.order_by("created_at").values_list("created_at", flat=True).first()
+        for qs in (Order.objects.all(), ArchivedOrder.objects.all())
+    ]
+    oldest = [value for value in oldest if value is not None]
+    return timezone.localdate(min(oldest)) if oldest else None
+
+
+def _archived_rows(start, end) -> tuple[dict, dict]:
+    customers, products = defaultdict(lambda: [0, 0]), defaultdict(lambda: [0, 0])
+    archived = ArchivedOrder.objects.filter(created_at__gte=start, created_at__lt=end)
+    for order in archived.only("customer_id", "total_price", "items").iterator():
+        row = customers[order.customer_id]
+        row[0] += 1
+        row[1] += order.total_price
+        for line in order.items:
+            row = products[UUID(line["product_id"])]
+            row[0] += line["quantity"]
+            row[1] += line["quantity"] * Decimal(line["unit_price"])
+    return customers, products
+
+
+def rebuild_day(day: date) -> None:
+    """
+    Recompute `day`'s rollups from the order tables and the archive.
+    """
+    start, end = _day_bounds(day)
+    models_ = (DailyRevenue, DailyProductSales, DailyCustomerSales)
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            # Order writes for the day wait instead of adding to rows being rebuilt.
+            tables = ", ".join(model._meta.db_table for model in models_)
+            with connection.cursor() as cursor:
+                cursor.execute(f"LOCK TABLE {tables} IN SHARE ROW EXCLUSIVE MODE")
+        for model in models_:
+            model.objects.filter(day=day).delete()
+
+        customers, products = _archived_rows(start, end)
+        orders = Order.objects.filter(created_at__gte=start, created_at__lt=end)
+        for row in orders.values("customer_id").annotate(
+            orders=Count("id"), revenue=Sum("total_price")
+        ):
+            totals = customers[row["customer_id"]]
+            totals[0] += row["orders"]
+            totals[1] += row["revenue"]
+        items = OrderItem.objects.filter(
+            order_created_at__gte=start, order_created_at__lt=end
+        )
+        for row in items.values("product_id").annotate(
+            units=Sum("quantity"),
+            amount=Sum(F("quantity") * F("unit_price"), output_field=DecimalField()),
+        ):
+            totals = products[row["product_id"]]
+            totals[0] += row["units"]
+            totals[1] += row["amount"]
+
+        DailyCustomerSales.objects.bulk_create(
+            DailyCustomerSales(day=day, customer_id=pk, orders=n, revenue=amount)
+            for pk, (n, amount) in customers.items()
+        )
+        DailyProductSales.objects.bulk_create(
+            DailyProductSales(day=day, product_id=pk, quantity=n, revenue=amount)
+            for pk, (n, amount) in products.items()
+        )
+        if customers:
+            DailyRevenue.objects.create(
+                day=day,
+                orders=sum(n for n, _ in customers.values()),
+                revenue=sum(amount for _, amount in customers.values()),
+            )
+
+
+def detached_months(first: date, last: date) -> list[date]:
+    """
+    Months with a detached partition (see `orders.partitions`) that overlap the
+    days `first` to `last`.
+    """
+    if not partitions.is_supported(connection):
+        return []
+    start, end = _day_bounds(first)[0], _day_bounds(last)[1] - timedelta(microseconds=1)
+    months = set(
+        partitions.month_range(
+            partitions.month_start(start.astimezone(dt_timezone.utc)),
+            partitions.month_start(end.astimezone(dt_timezone.utc)),
+        )
+    )
+    return [
+        month for month in partitions.detached_partitions(connection) if month in months
+    ]
+
+
+def backfill(first: date, last: date) -> int:
+    """
+    Rebuild every day from `first` to `last`, one transaction per day; returns
+    the number of days.
+
+    Orders in detached partitions are no longer in the order tables or the
+    archive, so rebuilding their days would zero them: raises `DetachedMonths`
+    (before touching anything) when the range overlaps one.
+    """
+    detached = detached_months(first, last)
+    if detached:
+        raise DetachedMonths(detached)
+    day, days = first, 0
+    while day <= last:
+        rebuild_day(day)
+        day += timedelta(days=1)
+        days += 1
+    return days
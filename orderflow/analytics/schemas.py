@@ -0,0 +1,200 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiExample, OpenApiParameter, OpenApiResponse, extend_schema
+from rest_framework import serializers as drf_serializers
+
+# Shared error shape from users app
+from orderflow.users.schemas import APIErrorSerializer  # noqa
+
+from .reports import REPORTS
+from .serializers import (
+    CustomerRowSerializer,
+    ProductRowSerializer,
+    ReportQuerySerializer,
+    RevenueQuerySerializer,
+    RevenueRowSerializer,
+    TopQuerySerializer,
+)
+
+# ------------------------------------------------------------------------------
+# Tags
+# ------------------------------------------------------------------------------
+
+TAGS_ANALYTICS = ["Analytics"]
+
+# ------------------------------------------------------------------------------
+# Response shapes
+# ------------------------------------------------------------------------------
+
+
+class RevenueOutSerializer(drf_serializers.Serializer):
+    results = RevenueRowSerializer(many=True)
+
+
+class ProductsOutSerializer(drf_serializers.Serializer):
+    results = ProductRowSerializer(many=True)
+
+
+class CustomersOutSerializer(drf_serializers.Serializer):
+    results = CustomerRowSerializer(many=True)
+
+
+# ------------------------------------------------------------------------------
+# Examples
+# ------------------------------------------------------------------------------
+
+REVENUE_EXAMPLE_RES = OpenApiExample(
+    name="Revenue per week (response)",
+    value={
+        "results": [
+            {"period": "2025-10-06", "orders": 412, "revenue": "38210.45"},
+            {"period": "2025-10-13", "orders": 377, "revenue": "35102.10"},
+        ]
+    },
+    response_only=True,
+)
+
+PRODUCTS_EXAMPLE_RES = OpenApiExample(
+    name="Top products (response)",
+    value={
+        "results": [
+            {
+                "product_id": "3f4c9b4c-4a8e-4c6d-9b8a-8e9a3a6a2f10",
+                "product_name": "Pro Tripod",
+                "quantity": 120,
+                "revenue": "11998.80",
+            }
+        ]
+    },
+    response_only=True,
+)
+
+CUSTOMERS_EXAMPLE_RES = OpenApiExample(
+    name="Top customers (response)",
+    value={
+        "results": [
+            {
+                "customer_id": "8b0d0d2c-2f31-4c23-9e5c-7a1e2d3c4b5a",
+                "username": "09120000000",
+                "orders": 14,
+                "revenue": "2310.40",
+            }
+        ]
+    },
+    response_only=True,
+)
+
+REPORT_EXAMPLE_RES = OpenApiExample(
+    name="Order totals report (response)",
+    value={
+        "orders": 1843,
+        "revenue": "171204.55",
+        "mean": "92.90",
+        "min": "2.50",
+        "max": "1499.00",
+        "quantiles": {
+            "p50": "61.00",
+            "p90": "210.40",
+            "p95": "305.00",
+            "p99": "780.00",
+        },
+        "resolution": "0.01",
+        "histogram": [
+            {"from": "2.50", "to": "77.33", "orders": 1104},
+            {"from": "77.33", "to": "152.15", "orders": 402},
+        ],
+    },
+    response_only=True,
+)
+
+# ------------------------------------------------------------------------------
+# Endpoint schemas (method decorators)
+# ------------------------------------------------------------------------------
+
+ERRORS = {400: APIErrorSerializer, 401: APIErrorSerializer, 403: APIErrorSerializer}
+
+revenue_schema = extend_schema(
+    tags=TAGS_ANALYTICS,
+    operation_id="analytics_revenue",
+    summary="Orders and revenue per period (admin)",
+    description=(
+        "Order count and revenue per `day`, `week` (starting Monday) or `month` of "
+        "order creation, between the optional `date_from` and `date_to` (inclusive). "
+        "Requires the `analytics.view_analytics` permission."
+    ),
+    parameters=[RevenueQuerySerializer],
+    responses={
+        200: OpenApiResponse(
+            response=RevenueOutSerializer, examples=[REVENUE_EXAMPLE_RES]
+        ),
+        **ERRORS,
+    },
+)
+
+products_schema = extend_schema(
+    tags=TAGS_ANALYTICS,
+    operation_id="analytics_products",
+    summary="Top products by revenue (admin)",
+    description=(
+        "Units sold and revenue per product, at the unit prices the order lines "
+        "were placed with, for orders created between `date_from` and `date_to`. "
+        "Requires the `analytics.view_analytics` permission."
+    ),
+    parameters=[TopQuerySerializer],
+    responses={
+        200: OpenApiResponse(
+            response=ProductsOutSerializer, examples=[PRODUCTS_EXAMPLE_RES]
+        ),
+        **ERRORS,
+    },
+)
+
+customers_schema = extend_schema(
+    tags=TAGS_ANALYTICS,
+    operation_id="analytics_customers",
+    summary="Top customers by revenue (admin)",
+    description=(
+        "Order count and revenue per customer for orders created between "
+        "`date_from` and `date_to`. Requires the `analytics.view_analytics` "
+        "permission."
+    ),
+    parameters=[TopQuerySerializer],
+    responses={
+        200: OpenApiResponse(
+            response=CustomersOutSerializer, examples=[CUSTOMERS_EXAMPLE_RES]
+        ),
+        **ERRORS,
+    },
+)
+
+report_schema = extend_schema(
+    tags=TAGS_ANALYTICS,
+    operation_id="analytics_report",
+    summary="Ad-hoc order report (admin)",
+    description=(
+        "Computed on request from the order tables (not the rollups) for orders "
+        "created between `date_from` and `date_to`:\n"
+        "- `totals`: count, revenue, mean, p50/p90/p95/p99 and a `bins`-bar "
+        "histogram of order totals\n"
+        "- `baskets`: orders and revenue per number of lines, and quantiles of "
+        "lines and units per order\n"
+        "- `co_purchase`: the `limit` product pairs bought together in the most "
+        "orders\n\n"
+        "Requires the `analytics.view_analytics` permission."
+    ),
+    parameters=[
+        OpenApiParameter(
+            "name",
+            str,
+            OpenApiParameter.PATH,
+            enum=list(REPORTS),
+            description="Report.",
+        ),
+        ReportQuerySerializer,
+    ],
+    responses={
+        200: OpenApiResponse(
+            response=OpenApiTypes.OBJECT, examples=[REPORT_EXAMPLE_RES]
+        ),
+        **ERRORS,
+    },
+)
@@ -0,0 +1,54 @@
+from django.db.models import F, Sum
+from django.db.models.functions import Trunc
+
+from .models import DailyCustomerSales, DailyProductSales, DailyRevenue
+
+PERIODS = ("day", "week", "month")
+
+
+def _between(qs, date_from=None, date_to=None):
+    if date_from is not None:
+        qs = qs.filter(day__gte=date_from)
+    if date_to is not None:
+        qs = qs.filter(day__lte=date_to)
+    return qs
+
+
+def revenue_by_period(*, period="day", date_from=None, date_to=None):
+    """
+    Orders and revenue per day, ISO week (starting Monday) or month, oldest first.
+    """
+    qs = _between(DailyRevenue.objects.all(), date_from, date_to)
+    return (
+        qs.annotate(period=Trunc("day", period))
+        .values("period")
+        .annotate(orders=Sum("orders"), revenue=Sum("revenue"))
+        .filter(orders__gt=0)
+        .order_by("period")
+    )
+
+
+def top_products(*, date_from=None, date_to=None, limit=20):
+    """
+    Products by revenue, with units sold.
+    """
+    qs = _between(DailyProductSales.objects.all(), date_from, date_to)
+    return (
+        qs.values("product_id", product_name=F("product__name"))
+        .annotate(quantity=Sum("quantity"), revenue=Sum("revenue"))
+        .filter(quantity__gt=0)
+        .order_by("-revenue", "product_id")[:limit]
+    )
+
+
+def top_customers(*, date_from=None, date_to=None, limit=20):
+    """
+    Customers by revenue, with their order counts.
+    """
+    qs = _between(DailyCustomerSales.objects.all(), date_from, date_to)
+    return (
+        qs.values("customer_id", username=F("customer__username"))
+        .annotate(orders=Sum("orders"), revenue=Sum("revenue"))
+        .filter(orders__gt=0)
+        .order_by("-revenue", "customer_id")[:limit]
+    )
@@ -0,0 +1,65 @@
+from rest_framework import serializers
+
+from .reports import OPTIONS, Range
+from .selectors import PERIODS
+
+
+# -------- Query parameters --------
+class DateRangeSerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        date_from, date_to = attrs.get("date_from"), attrs.get("date_to")
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError("date_from must not be after date_to.")
+        return attrs
+
+
+class RevenueQuerySerializer(DateRangeSerializer):
+    period = serializers.ChoiceField(choices=PERIODS, default="day")
+
+
+class TopQuerySerializer(DateRangeSerializer):
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class ReportQuerySerializer(DateRangeSerializer):
+    bins = serializers.IntegerField(
+        min_value=1, max_value=100, default=20, help_text="Histogram bins (totals)."
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=100,
+        default=20,
+        help_text="Pairs returned (co_purchase).",
+    )
+
+    def options(self, report: str) -> dict:
+        """
+        The validated parameters `REPORTS[report]` takes.
+        """
+        data = self.validated_data
+        period = Range(data.get("date_from"), data.get("date_to"))
+        return {"period": period, **{name: data[name] for name in OPTIONS[report]}}
+
+
+# -------- Results --------
+class RevenueRowSerializer(serializers.Serializer):
+    period = serializers.DateField(help_text="First day of the period.")
+    orders = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=16, decimal_places=2)
+
+
+class ProductRowSerializer(serializers.Serializer):
+    product_id = serializers.UUIDField()
+    product_name = serializers.CharField()
+    quantity = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=16, decimal_places=2)
+
+
+class CustomerRowSerializer(serializers.Serializer):
+    customer_id = serializers.UUIDField()
+    username = serializers.CharField()
+    orders = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=16, decimal_places=2)
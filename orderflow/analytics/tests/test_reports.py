@@ -0,0 +1,173 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from orderflow.analytics import reports
+from orderflow.orders import services as s
+from orderflow.orders.tests.factories import OrderFactory, ProductFactory, UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def order(*pairs):
+    return s.create_order(
+        customer=UserFactory(),
+        items=[
+            {"product": p.id, "quantity": qty, "_product_instance": p}
+            for p, qty in pairs
+        ],
+    )
+
+
+@pytest.fixture
+def products():
+    return (
+        ProductFactory(name="tea", unit_price="1.00"),
+        ProductFactory(name="cup", unit_price="2.50"),
+        ProductFactory(name="pot", unit_price="20.00"),
+    )
+
+
+@pytest.fixture
+def orders(products):
+    tea, cup, pot = products
+    order((tea, 1))  # 1.00
+    order((tea, 2), (cup, 1))  # 4.50
+    order((tea, 1), (cup, 2), (pot, 1))  # 26.00
+    order((cup, 1), (pot, 1))  # 22.50
+    OrderFactory()  # no lines: 0.00
+
+
+class TestTotals:
+    def test_distribution(self, orders):
+        report = reports.totals(bins=2, chunk_size=2)
+
+        assert report["orders"] == 5
+        assert report["revenue"] == "54.00"
+        assert report["mean"] == "10.80"
+        assert (report["min"], report["max"]) == ("0.00", "26.00")
+        assert report["quantiles"] == {
+            "p50": "4.50",
+            "p90": "26.00",
+            "p95": "26.00",
+            "p99": "26.00",
+        }
+        assert report["resolution"] == "0.01"
+        assert report["histogram"] == [
+            {"from": "0.00", "to": "13.00", "orders": 3},
+            {"from": "13.00", "to": "26.00", "orders": 2},
+        ]
+
+    def test_date_range(self, orders):
+        tomorrow = timezone.localdate() + timedelta(days=1)
+
+        assert reports.totals(reports.Range(date_from=tomorrow)) == {
+            "orders": 0,
+            "revenue": "0.00",
+            "histogram": [],
+        }
+
+
+class TestBaskets:
+    @pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+    def test_sizes_do_not_depend_on_chunking(self, orders, chunk_size):
+        report = reports.basket_sizes(chunk_size=chunk_size)
+
+        assert report["orders"] == 5
+        assert report["sizes"] == [
+            {"lines": 0, "orders": 1, "revenue": "0.00"},
+            {"lines": 1, "orders": 1, "revenue": "1.00"},
+            {"lines": 2, "orders": 2, "revenue": "27.00"},
+            {"lines": 3, "orders": 1, "revenue": "26.00"},
+        ]
+        assert report["lines"] == {
+            "mean": 1.6,
+            "p50": 2,
+            "p90": 3,
+            "p95": 3,
+            "p99": 3,
+        }
+        assert report["units"]["mean"] == 2.0
+        assert report["units"]["p90"] == 4
+
+
+class TestCoPurchase:
+    @pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+    def test_pairs_by_orders(self, orders, products, chunk_size):
+        _, cup, _ = products
+
+        report = reports.co_purchase(limit=3, chunk_size=chunk_size)
+        top = reports.co_purchase(limit=2, chunk_size=chunk_size)
+
+        assert report["orders"] == 3
+        assert report["distinct_pairs"] == 3
+        assert {
+            frozenset(p["name"] for p in pair["products"]): (
+                pair["orders"],
+                pair["share"],
+            )
+            for pair in report["pairs"]
+        } == {
+            frozenset({"cup", "pot"}): (2, 0.6667),
+            frozenset({"tea", "cup"}): (2, 0.6667),
+            frozenset({"tea", "pot"}): (1, 0.3333),
+        }
+        assert [pair["orders"] for pair in top["pairs"]] == [2, 2]
+        assert {p["id"] for p in top["pairs"][0]["products"]} >= {str(cup.pk)}
+
+    def test_no_orders(self):
+        assert reports.co_purchase() == {"orders": 0, "distinct_pairs": 0, "pairs": []}
+
+
+class TestEndpoint:
+    def test_reports(self, orders):
+        admin = UserFactory()
+        admin.user_permissions.add(Permission.objects.get(codename="view_analytics"))
+        client = APIClient()
+        client.force_authenticate(user=admin)
+
+        def get(name, **params):
+            return client.get(reverse("v1-analytics-report", args=[name]), params)
+
+        assert len(get("totals", bins=4).json()["histogram"]) == 4
+        assert get("baskets").json()["orders"] == 5
+        assert len(get("co_purchase", limit=1).json()["pairs"]) == 1
+        assert get("totals", bins=0).status_code == 400
+        assert client.get("/api/v1/analytics/reports/unknown/").status_code == 404
+
+    def test_requires_the_permission(self):
+        client = APIClient()
+        client.force_authenticate(user=UserFactory())
+
+        response = client.get(reverse("v1-analytics-report", args=["totals"]))
+
+        assert response.status_code == 403
+
+
+class TestCommand:
+    def test_prints_json(self, orders):
+        out = StringIO()
+
+        call_command("order_report", "baskets", "--chunk-size", "1", stdout=out)
+
+        assert json.loads(out.getvalue())["orders"] == 5
+
+    def test_rejects_bad_arguments(self):
+        with pytest.raises(CommandError):
+            call_command(
+                "order_report",
+                "totals",
+                "--since",
+                "2026-02-01",
+                "--until",
+                "2026-01-01",
+            )
+        with pytest.raises(CommandError):
+            call_command("order_report", "totals", "--bins", "0")
@@ -0,0 +1,145 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from orderflow.analytics import rollups
+from orderflow.analytics.models import DailyCustomerSales, DailyProductSales, DailyRevenue
+from orderflow.orders import archive
+from orderflow.orders import partitions as p
+from orderflow.orders import services as s
+from orderflow.orders.tests.factories import ProductFactory, UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def items(*pairs):
+    return [
+        {"product": p.id, "quantity": qty, "_product_instance": p} for p, qty in pairs
+    ]
+
+
+def state():
+    """
+    Every rollup summed over days (and slots).
+    """
+    revenue = DailyRevenue.objects.aggregate(
+        orders=Sum("orders"), revenue=Sum("revenue")
+    )
+    products = {
+        row["product_id"]: (row["quantity"], row["revenue"])
+        for row in DailyProductSales.objects.values("product_id").annotate(
+            quantity=Sum("quantity"), revenue=Sum("revenue")
+        )
+        if row["quantity"]
+    }
+    customers = {
+        row["customer_id"]: (row["orders"], row["revenue"])
+        for row in DailyCustomerSales.objects.values("customer_id").annotate(
+            orders=Sum("orders"), revenue=Sum("revenue")
+        )
+        if row["orders"]
+    }
+    return (revenue["orders"] or 0, revenue["revenue"] or 0), products, customers
+
+
+@pytest.fixture
+def products():
+    return ProductFactory(unit_price="10.00"), ProductFactory(unit_price="2.50")
+
+
+class TestIncrementalRollups:
+    def test_create_update_delete(self, products):
+        p1, p2 = products
+        customer = UserFactory()
+
+        order = s.create_order(customer=customer, items=items((p1, 2), (p2, 1)))
+        assert state() == (
+            (1, Decimal("22.50")),
+            {p1.pk: (2, Decimal("20.00")), p2.pk: (1, Decimal("2.50"))},
+            {customer.pk: (1, Decimal("22.50"))},
+        )
+
+        # Price changes after ordering don't move the rollups: lines keep snapshots.
+        p1.unit_price = Decimal("99.00")
+        p1.save()
+        s.update_order(order=order, items=items((p1, 3), (p2, 0)))
+        assert state() == (
+            (1, Decimal("30.00")),
+            {p1.pk: (3, Decimal("30.00"))},
+            {customer.pk: (1, Decimal("30.00"))},
+        )
+
+        s.delete_order(order=order)
+        assert state() == ((0, Decimal("0.00")), {}, {})
+
+    def test_rolled_back_with_the_order(self, products):
+        p1, _ = products
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                s.create_order(customer=UserFactory(), items=items((p1, 1)))
+                raise RuntimeError
+        assert state() == ((0, 0), {}, {})
+
+    def test_api_delete_goes_through_the_service(self, products):
+        p1, _ = products
+        customer = UserFactory()
+        order = s.create_order(customer=customer, items=items((p1, 1)))
+        client = APIClient()
+        client.force_authenticate(user=customer)
+        response = client.delete(reverse("v1-orders-detail", args=[order.pk]))
+
+        assert response.status_code == 204
+        assert state() == ((0, Decimal("0.00")), {}, {})
+
+
+class TestBackfill:
+    def test_rebuilds_hot_and_archived_orders(self, products):
+        p1, p2 = products
+        archived = s.create_order(customer=UserFactory(), items=items((p1, 1)))
+        hot = s.create_order(customer=UserFactory(), items=items((p1, 2), (p2, 2)))
+        archive.archive_orders(archived.created_at + timedelta(microseconds=1))
+        expected = state()
+        for model in (DailyRevenue, DailyProductSales, DailyCustomerSales):
+            model.objects.all().delete()
+        out = StringIO()
+
+        call_command("backfill_analytics", stdout=out)
+
+        assert state() == expected
+        assert expected[2][hot.customer_id] == (1, Decimal("25.00"))
+        assert "Rebuilt 1 day(s) of rollups" in out.getvalue()
+        # Rebuilding again replaces, rather than adds to, the day's rows.
+        call_command(
+            "backfill_analytics", "--since", str(timezone.localdate()), stdout=out
+        )
+        assert state() == expected
+
+    @pytest.mark.skipif(
+        not p.is_supported(connection), reason="partitioning needs PostgreSQL"
+    )
+    def test_refuses_ranges_with_detached_partitions(self):
+        month = p.add_months(p.current_month(), -14)
+        p.create_partitions(connection, month, month)
+        p.detach_partition(connection, month)
+        DailyRevenue.objects.create(day=month, orders=3, revenue="30.00")
+
+        with pytest.raises(CommandError, match=f"{month:%Y-%m} are detached"):
+            call_command(
+                "backfill_analytics",
+                "--since",
+                str(month - timedelta(days=1)),
+                "--until",
+                str(month),
+            )
+
+        assert DailyRevenue.objects.get(day=month).orders == 3
+        next_month = p.add_months(month, 1)
+        assert rollups.detached_months(next_month, next_month) == []
@@ -0,0 +1,133 @@
+from datetime import date
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from orderflow.analytics.models import DailyCustomerSales, DailyProductSales, DailyRevenue
+from orderflow.orders.tests.factories import ProductFactory, UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def admin_client():
+    admin = UserFactory()
+    admin.user_permissions.add(Permission.objects.get(codename="view_analytics"))
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
+
+
+def get(client, name, **params):
+    return client.get(reverse(f"v1-analytics-{name}"), params)
+
+
+class TestRevenue:
+    @pytest.fixture(autouse=True)
+    def rollups(self):
+        for day, slot, orders, revenue in [
+            (date(2026, 9, 28), 0, 1, "5.00"),  # Monday
+            (date(2026, 9, 30), 0, 2, "10.00"),
+            (date(2026, 9, 30), 3, 1, "2.50"),
+            (date(2026, 10, 5), 0, 4, "40.00"),  # next Monday, next month
+            (date(2026, 10, 6), 0, 0, "0.00"),  # every order there deleted
+        ]:
+            DailyRevenue.objects.create(
+                day=day, slot=slot, orders=orders, revenue=revenue
+            )
+
+    def test_per_day_merges_slots(self, admin_client):
+        response = get(admin_client, "revenue")
+
+        assert response.status_code == 200
+        assert response.json()["results"] == [
+            {"period": "2026-09-28", "orders": 1, "revenue": "5.00"},
+            {"period": "2026-09-30", "orders": 3, "revenue": "12.50"},
+            {"period": "2026-10-05", "orders": 4, "revenue": "40.00"},
+        ]
+
+    def test_per_week_and_month(self, admin_client):
+        weeks = get(admin_client, "revenue", period="week").json()["results"]
+        months = get(admin_client, "revenue", period="month").json()["results"]
+
+        assert [(r["period"], r["orders"]) for r in weeks] == [
+            ("2026-09-28", 4),
+            ("2026-10-05", 4),
+        ]
+        assert [(r["period"], r["revenue"]) for r in months] == [
+            ("2026-09-01", "17.50"),
+            ("2026-10-01", "40.00"),
+        ]
+
+    def test_date_range(self, admin_client):
+        response = get(
+            admin_client, "revenue", date_from="2026-09-29", date_to="2026-09-30"
+        )
+
+        assert [r["period"] for r in response.json()["results"]] == ["2026-09-30"]
+
+    def test_invalid_parameters(self, admin_client):
+        assert get(admin_client, "revenue", period="year").status_code == 400
+        response = get(
+            admin_client, "revenue", date_from="2026-10-01", date_to="2026-09-01"
+        )
+        assert response.status_code == 400
+
+    def test_requires_the_permission(self):
+        client = APIClient()
+        client.force_authenticate(user=UserFactory())
+        assert get(client, "revenue").status_code == 403
+        client.force_authenticate(user=None)
+        assert get(client, "revenue").status_code == 401
+
+
+class TestTopProductsAndCustomers:
+    def test_products_by_revenue(self, admin_client):
+        cheap, dear = ProductFactory(name="cheap"), ProductFactory(name="dear")
+        for day, product, quantity, revenue in [
+            (date(2026, 10, 1), cheap, 10, "10.00"),
+            (date(2026, 10, 2), cheap, 5, "5.00"),
+            (date(2026, 10, 2), dear, 1, "50.00"),
+            (date(2026, 11, 1), dear, 1, "50.00"),
+        ]:
+            DailyProductSales.objects.create(
+                day=day, product=product, quantity=quantity, revenue=revenue
+            )
+
+        october = get(admin_client, "products", date_to="2026-10-31").json()
+        top = get(admin_client, "products", limit=1).json()
+
+        assert october["results"] == [
+            {
+                "product_id": str(dear.pk),
+                "product_name": "dear",
+                "quantity": 1,
+                "revenue": "50.00",
+            },
+            {
+                "product_id": str(cheap.pk),
+                "product_name": "cheap",
+                "quantity": 15,
+                "revenue": "15.00",
+            },
+        ]
+        assert [r["revenue"] for r in top["results"]] == ["100.00"]
+
+    def test_customers_by_revenue(self, admin_client):
+        small, big = UserFactory(), UserFactory()
+        for customer, orders, revenue in [(small, 3, "9.00"), (big, 1, "90.00")]:
+            DailyCustomerSales.objects.create(
+                day=date(2026, 10, 1),
+                customer=customer,
+                orders=orders,
+                revenue=revenue,
+            )
+
+        response = get(admin_client, "customers")
+
+        assert [(r["username"], r["orders"]) for r in response.json()["results"]] == [
+            (big.username, 1),
+            (small.username, 3),
+        ]
@@ -0,0 +1,12 @@
+from rest_framework.routers import DefaultRouter
+
+from .views import AnalyticsViewSetV1
+
+app_name = "analytics"
+
+router = DefaultRouter()
+router.register("v1/analytics", AnalyticsViewSetV1, basename="v1-analytics")
+
+async_views = {}
+
+urlpatterns = []
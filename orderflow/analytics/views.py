@@ -0,0 +1,72 @@
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.viewsets import GenericViewSet
+
+from orderflow.contrib.docs import schemas_for
+from orderflow.contrib.views import ReplicaReadMixin
+
+from . import reports, selectors, serializers
+from .permissions import CanViewAnalytics
+
+schemas = schemas_for(__package__)  # method-level docs live here
+
+
+class AnalyticsViewSetV1(ReplicaReadMixin, GenericViewSet):
+    """
+    Order analytics for admin dashboards, read from the rollup tables:
+      - revenue: orders and revenue per day/week/month
+      - products / customers: top sellers and buyers by revenue
+    and ad-hoc reports, computed from the order tables themselves:
+      - reports/<name>: see orderflow.analytics.reports
+    """
+
+    permission_classes = (IsAuthenticated, CanViewAnalytics)
+    throttle_scope = "analytics"
+    pagination_class = None
+
+    query_budgets = {"revenue": 4, "products": 4, "customers": 4, "report": 4}
+
+    def query(self, serializer_class) -> dict:
+        serializer = serializer_class(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def respond(self, serializer_class, rows) -> Response:
+        data = {"results": serializer_class(rows, many=True).data}
+        return Response(status=status.HTTP_200_OK, data=data)
+
+    @schemas.revenue_schema
+    @action(detail=False, methods=["get"])
+    def revenue(self, request):
+        params = self.query(serializers.RevenueQuerySerializer)
+        rows = selectors.revenue_by_period(**params)
+        return self.respond(serializers.RevenueRowSerializer, rows)
+
+    @schemas.products_schema
+    @action(detail=False, methods=["get"])
+    def products(self, request):
+        params = self.query(serializers.TopQuerySerializer)
+        rows = selectors.top_products(**params)
+        return self.respond(serializers.ProductRowSerializer, rows)
+
+    @schemas.customers_schema
+    @action(detail=False, methods=["get"])
+    def customers(self, request):
+        params = self.query(serializers.TopQuerySerializer)
+        rows = selectors.top_customers(**params)
+        return self.respond(serializers.CustomerRowSerializer, rows)
+
+    @schemas.report_schema
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=f"reports/(?P<name>{'|'.join(reports.REPORTS)})",
+        throttle_scope="analytics_reports",
+    )
+    def report(self, request, name):
+        serializer = serializers.ReportQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = reports.REPORTS[name](**serializer.options(name))
+        return Response(status=status.HTTP_200_OK, data=data)
@@ -2,6 +2,10 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "orderflow.settings")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "orderflow.settings.production")
+# Persistent connections are per thread and leak under ASGI; share a pool instead.
+os.environ.setdefault("DB_POOL_ENABLED", "true")
+# Order/user reads run as native async views (no thread per request).
+os.environ.setdefault("ASYNC_VIEWS_ENABLED", "true")
 
 application = get_asgi_application()
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from . import profiling
+
+
+def _superuser_view(view):
+    def wrapped(request, *args, **kwargs):
+        # Profiles hold SQL parameters, i.e. other users' data.
+        if not request.user.is_superuser:
+            raise PermissionDenied
+        return view(request, *args, **kwargs)
+
+    return admin.site.admin_view(wrapped)
+
+
+def profile_list_view(request):
+    profiles = []
+    for profile_id in profiling.list_profiles():
+        record = profiling.load_profile(profile_id)
+        if record is not None:  # pruned meanwhile
+            profiles.append({"id": profile_id, **record})
+    context = {
+        **admin.site.each_context(request),
+        "title": "Request profiles",
+        "profiles": profiles,
+        "profiled_users": profiling.profiled_users(),
+        "token": profiling.make_token(request.user.get_username()),
+        "token_max_age": settings.PROFILING_TOKEN_MAX_AGE,
+        "enabled": settings.PROFILING_ENABLED,
+    }
+    return TemplateResponse(request, "admin/profiles/list.html", context)
+
+
+def profile_detail_view(request, profile_id):
+    record = profiling.load_profile(profile_id)
+    if record is None:
+        raise Http404
+    context = {
+        **admin.site.each_context(request),
+        "title": f"{record['method']} {record['path']}",
+        "profile_id": profile_id,
+        "profile": record,
+    }
+    return TemplateResponse(request, "admin/profiles/detail.html", context)
+
+
+urlpatterns = [
+    path("", _superuser_view(profile_list_view), name="profiles"),
+    path(
+        "<str:profile_id>/",
+        _superuser_view(profile_detail_view),
+        name="profile-detail",
+    ),
+]
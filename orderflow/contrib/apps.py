@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ContribConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "orderflow.contrib"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import checks  # noqa: F401
+        from .query_budget import install
+
+        connection_created.connect(install, dispatch_uid="orderflow.query_observers")
@@ -0,0 +1,244 @@
+"""
+Async (ASGI-native) read endpoints.
+
+`AsyncAPIView` serves GET/HEAD without DRF's sync request cycle: JWT auth,
+permission checks and throttles are awaited, querysets are read with the async
+ORM, and errors go through the same `EXCEPTION_HANDLER` as DRF views so clients
+see identical responses. Every other method is delegated to `fallback`, the
+regular DRF view for the same route (see `ExtendableRouter`).
+"""
+
+from contextlib import nullcontext
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django_filters.utils import translate_validation
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .db_routers import ais_pinned_to_primary, use_replica
+from .throttling import SlidingWindowScopedRateThrottle
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """
+    `JWTAuthentication` with the user lookup awaited (`aget`).
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)  # no DB access
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise exceptions.AuthenticationFailed(
+                "Token contained no recognizable user identification"
+            ) from e
+        try:
+            user = await self.user_model.objects.aget(
+                **{jwt_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist as e:
+            raise exceptions.AuthenticationFailed(
+                "User not found", code="user_not_found"
+            ) from e
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                "User is inactive", code="user_inactive"
+            )
+        if jwt_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                jwt_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise exceptions.AuthenticationFailed(
+                    "The user's password has been changed.", code="password_changed"
+                )
+        return user
+
+
+class AsyncPageNumberPagination:
+    """
+    `PageNumberPagination` (same params and response shape) over the async ORM.
+    """
+
+    page_query_param = "page"
+    last_page_strings = ("last",)
+
+    def __init__(self, page_size: Optional[int] = None):
+        self.page_size = page_size or api_settings.PAGE_SIZE
+
+    async def apaginate_queryset(self, queryset, request) -> list:
+        self.request = request
+        self.count = await queryset.acount()
+        self.num_pages = max(-(-self.count // self.page_size), 1)
+        raw = request.GET.get(self.page_query_param) or 1
+        if raw in self.last_page_strings:
+            raw = self.num_pages
+        try:
+            self.page = int(raw)
+        except (TypeError, ValueError):
+            raise exceptions.NotFound("Invalid page.")
+        if not 1 <= self.page <= self.num_pages:
+            raise exceptions.NotFound("Invalid page.")
+
+        start = (self.page - 1) * self.page_size
+        page_qs = queryset[start:][: self.page_size]
+        return [obj async for obj in page_qs.aiterator(chunk_size=self.page_size)]
+
+    def get_next_link(self) -> Optional[str]:
+        if self.page >= self.num_pages:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page + 1)
+
+    def get_previous_link(self) -> Optional[str]:
+        if self.page <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page - 1)
+
+    def get_paginated_data(self, data) -> dict:
+        return {
+            "count": self.count,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+
+
+class AsyncAPIView(View):
+    authentication_class = AsyncJWTAuthentication
+    throttle_classes = (SlidingWindowScopedRateThrottle,)
+    throttle_scope: Optional[str] = None
+    # Sync view serving the route's other methods: `as_view(fallback=...)`.
+    fallback = None
+
+    # filtering/ordering (same semantics as DjangoFilterBackend/OrderingFilter)
+    filterset_class = None
+    ordering_fields: tuple[str, ...] = ()
+    ordering: tuple[str, ...] = ()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # DRF views are CSRF-exempt (SessionAuthentication enforces it itself).
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            if self.fallback is None:
+                return await self.http_method_not_allowed(request, *args, **kwargs)
+            return await sync_to_async(self.fallback)(request, *args, **kwargs)
+
+        try:
+            await self.ainitial(request)
+            with await self.read_context(request):
+                response = await self.get(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(request, exc)
+        patch_vary_headers(response, ("Accept",))
+        return response
+
+    # ---------- request checks ----------
+    async def ainitial(self, request):
+        auth = None
+        try:
+            result = await self.authentication_class().aauthenticate(request)
+        except exceptions.APIException:
+            request.user = AnonymousUser()
+            raise
+        if result is not None:
+            request.user, auth = result
+        else:
+            request.user = AnonymousUser()
+        request.auth = auth
+
+        await self.acheck_permissions(request)
+        await self.acheck_throttles(request)
+
+    async def acheck_permissions(self, request):
+        if not request.user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+
+    async def acheck_throttles(self, request):
+        waits = []
+        for throttle_class in self.throttle_classes:
+            throttle = throttle_class()
+            if not await throttle.aallow_request(request, self):
+                waits.append(throttle.wait())
+        if waits:
+            raise exceptions.Throttled(
+                max((w for w in waits if w is not None), default=None)
+            )
+
+    async def read_context(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return nullcontext()
+        user = request.user
+        if user.is_authenticated and await ais_pinned_to_primary(user.pk):
+            return nullcontext()
+        return use_replica()
+
+    # ---------- querysets ----------
+    def filter_queryset(self, request, queryset):
+        if self.filterset_class is not None:
+            filterset = self.filterset_class(
+                request.GET, queryset=queryset, request=request
+            )
+            if not filterset.is_valid():
+                raise translate_validation(filterset.errors)
+            queryset = filterset.qs
+        ordering = self.get_ordering(request)
+        return queryset.order_by(*ordering) if ordering else queryset
+
+    def get_ordering(self, request) -> tuple[str, ...]:
+        raw = request.GET.get(api_settings.ORDERING_PARAM)
+        if raw:
+            terms = [term.strip() for term in raw.split(",")]
+            valid = tuple(t for t in terms if t.lstrip("-") in self.ordering_fields)
+            if valid:
+                return valid
+        return self.ordering
+
+    # ---------- responses ----------
+    def render(self, data, status: int = 200) -> HttpResponse:
+        return HttpResponse(
+            JSONRenderer().render(data),
+            status=status,
+            content_type="application/json",
+        )
+
+    def handle_exception(self, request, exc) -> HttpResponse:
+        if isinstance(
+            exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+        ):
+            exc.auth_header = self.authentication_class().authenticate_header(request)
+        handler = api_settings.EXCEPTION_HANDLER
+        drf_response = handler(exc, {"view": self, "request": request})
+        if drf_response is None:
+            raise exc
+        response = self.render(drf_response.data, status=drf_response.status_code)
+        for name, value in drf_response.items():  # WWW-Authenticate, Retry-After
+            if name.lower() != "content-type":
+                response[name] = value
+        return response
@@ -0,0 +1,11 @@
+"""
+Reproducible API benchmarks, driven by `manage.py bench_api`.
+
+`seed` loads a fixed volume of users, products and orders (via the test
+factories) tagged so a run can remove what it created; `scenarios` replays
+order and authentication requests in-process through the full middleware and
+DRF stack; `results` summarizes latencies and compares a run with a saved
+baseline. Requests go through Django's test client, so numbers exclude the
+network and the WSGI server: use them to compare commits, not capacity
+(`bench_workers` measures that).
+"""
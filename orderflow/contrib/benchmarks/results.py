@@ -0,0 +1,113 @@
+import json
+import platform
+import statistics
+import subprocess
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import django
+from django.conf import settings
+from django.db import connection
+
+# Metrics compared against a baseline, and which direction is better.
+COMPARED = {"p50_ms": "lower", "p95_ms": "lower", "p99_ms": "lower", "rps": "higher"}
+# p99 of a few hundred requests is a handful of samples: reported, never a regression.
+GATED = frozenset({"p50_ms", "p95_ms", "rps"})
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize(samples: list[float], errors: int, elapsed: float) -> dict:
+    ms = [s * 1000 for s in samples] or [0.0]
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    """
+    What a result depends on besides the code: worth checking before comparing.
+    """
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "settings": settings.SETTINGS_MODULE,
+        "machine": platform.machine(),
+    }
+
+
+def save(report: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+def load(path: Path) -> dict:
+    return json.loads(path.read_text())
+
+
+@dataclass
+class Change:
+    scenario: str
+    metric: str
+    baseline: float
+    current: float
+    pct: float  # positive is worse
+    regressed: bool
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 10.0) -> list[Change]:
+    """
+    Per scenario and metric, how much worse (+) or better (-) `current` is, in %.
+    A `GATED` metric more than `tolerance` percent worse is a regression.
+    """
+    changes = []
+    for scenario, result in current["results"].items():
+        before = baseline["results"].get(scenario)
+        if before is None:
+            continue
+        for metric, better in COMPARED.items():
+            old, new = before[metric], result[metric]
+            if not old:
+                continue
+            pct = (new - old) / old * 100
+            if better == "higher":
+                pct = -pct
+            changes.append(
+                Change(
+                    scenario,
+                    metric,
+                    old,
+                    new,
+                    round(pct, 1),
+                    metric in GATED and pct > tolerance,
+                )
+            )
+    return changes
@@ -0,0 +1,155 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+from urllib.parse import urlencode
+
+from django.test import Client
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from orderflow.orders.filters import OrderFilter
+
+from .seed import Dataset, filter_values
+
+
+@dataclass
+class Scenario:
+    """
+    One request shape, replayed `n` times; `path` and `body` get the iteration.
+    """
+
+    name: str
+    method: str
+    path: Callable[[int], str]
+    body: Optional[Callable[[int], dict]] = None
+    authenticated: bool = True
+    expect: int = 200
+    on_response: Optional[Callable] = None
+
+
+@dataclass
+class Run:
+    samples: list  # seconds, successful requests only
+    errors: int
+    elapsed: float
+    statuses: dict
+
+
+def order_scenarios(dataset: Dataset) -> list[Scenario]:
+    list_url = reverse("v1-orders-list")
+    order_ids, products = dataset.order_ids, dataset.product_ids
+    lines = dataset.volumes.lines
+
+    def detail_url(i):
+        return reverse("v1-orders-detail", args=[order_ids[i % len(order_ids)]])
+
+    def create_body(i):
+        start = (i * lines) % len(products)
+        chosen = {products[(start + k) % len(products)] for k in range(lines)}
+        return {"items": [{"product": str(pid), "quantity": 1} for pid in chosen]}
+
+    def update_body(i):
+        order_id = order_ids[i % len(order_ids)]
+        # A different quantity on every pass over the orders: always a real update.
+        quantity = 1 + (i // len(order_ids)) % 5
+        return {
+            "items": [
+                {"product": str(pid), "quantity": quantity}
+                for pid in dataset.order_lines[order_id]
+            ]
+        }
+
+    scenarios = [Scenario("orders.list", "GET", lambda i: list_url)]
+    values = filter_values(dataset)
+    for name in OrderFilter.base_filters:
+        query = urlencode({name: values[name]})
+        scenarios.append(
+            Scenario(
+                f"orders.list[{name}]", "GET", lambda i, q=query: f"{list_url}?{q}"
+            )
+        )
+    # Writes last: created orders would otherwise grow the lists read above.
+    scenarios += [
+        Scenario("orders.retrieve", "GET", detail_url),
+        Scenario("orders.update", "PATCH", detail_url, update_body),
+        Scenario("orders.create", "POST", lambda i: list_url, create_body, expect=201),
+    ]
+    return scenarios
+
+
+def auth_scenarios(dataset: Dataset) -> list[Scenario]:
+    sign_in_url = reverse("v1-authentication-sign-in-password")
+    refresh_url = reverse("v1-authentication-refresh-token")
+    credentials = {"mobile": dataset.user.username, "password": dataset.password}
+    # Refresh tokens rotate (and the old one is blacklisted): chain them.
+    state = {}
+
+    def refresh_body(i):
+        if "refresh" not in state:
+            client = Client()
+            response = client.post(
+                sign_in_url, credentials, content_type="application/json"
+            )
+            state["refresh"] = response.json()["refresh"]
+        return {"refresh": state["refresh"]}
+
+    def keep_refresh(response):
+        if response.status_code == 200:
+            state["refresh"] = response.json().get("refresh", state["refresh"])
+
+    return [
+        Scenario(
+            "auth.sign_in",
+            "POST",
+            lambda i: sign_in_url,
+            lambda i: credentials,
+            authenticated=False,
+        ),
+        Scenario(
+            "auth.refresh",
+            "POST",
+            lambda i: refresh_url,
+            refresh_body,
+            authenticated=False,
+            on_response=keep_refresh,
+        ),
+    ]
+
+
+def all_scenarios(dataset: Dataset) -> list[Scenario]:
+    return order_scenarios(dataset) + auth_scenarios(dataset)
+
+
+def run(scenario: Scenario, dataset: Dataset, *, requests: int, warmup: int = 0) -> Run:
+    """
+    Replay `scenario` in-process; only the `requests` after `warmup` are timed.
+    """
+    headers = {}
+    if scenario.authenticated:  # per scenario: access tokens only live minutes
+        headers["authorization"] = f"Bearer {AccessToken.for_user(dataset.user)}"
+    client = Client(raise_request_exception=False, headers=headers)
+    send = getattr(client, scenario.method.lower())
+
+    samples, errors, statuses = [], 0, {}
+    started = None
+    for i in range(warmup + requests):
+        if i == warmup:
+            started = time.perf_counter()
+        path = scenario.path(i)
+        body = scenario.body(i) if scenario.body else None
+        start = time.perf_counter()
+        if body is None:
+            response = send(path)
+        else:
+            response = send(path, body, content_type="application/json")
+        duration = time.perf_counter() - start
+        if scenario.on_response:
+            scenario.on_response(response)
+        if i < warmup:
+            continue
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.status_code == scenario.expect:
+            samples.append(duration)
+        else:
+            errors += 1
+    return Run(samples, errors, time.perf_counter() - started, statuses)
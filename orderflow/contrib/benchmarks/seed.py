@@ -0,0 +1,168 @@
+import random
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+import factory.random
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max, Min
+from django.db.models.functions import TruncDate
+from factory import fuzzy as fz
+
+from orderflow.analytics import rollups
+from orderflow.analytics.models import DailyCustomerSales, DailyProductSales
+from orderflow.orders.models import Order, OrderItem, Product
+from orderflow.orders.tests.factories import OrderFactory, OrderItemFactory, ProductFactory
+from orderflow.users.tests.factories import UserFactory
+
+# Seeded rows are recognisable so a run can remove them (and only them).
+USERNAME_PREFIX = "0980"
+PRODUCT_PREFIX = "bench-product-"
+PASSWORD = "bench-password"
+BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class Volumes:
+    users: int = 50
+    products: int = 200
+    orders: int = 1000
+    lines: int = 3  # per order
+
+    def __post_init__(self):
+        if min(self.users, self.products, self.orders, self.lines) < 1:
+            raise ValueError("Every volume must be at least 1.")
+        if self.lines > self.products:
+            raise ValueError("Lines per order can't exceed the number of products.")
+
+
+@dataclass
+class Dataset:
+    """
+    What the scenarios need: the acting user and the rows they can touch.
+    """
+
+    volumes: Volumes
+    user: object
+    password: str
+    product_ids: list
+    # {order id: [product id, ...]} for the acting user's orders
+    order_lines: dict = field(default_factory=dict)
+
+    @property
+    def order_ids(self) -> list:
+        return list(self.order_lines)
+
+
+def username(n: int) -> str:
+    return f"{USERNAME_PREFIX}{n:07d}"
+
+
+def clear() -> None:
+    """
+    Delete everything a previous run seeded or created.
+    """
+    User = get_user_model()
+    with transaction.atomic():
+        users = User.objects.filter(username__startswith=USERNAME_PREFIX)
+        products = Product.objects.filter(name__startswith=PRODUCT_PREFIX)
+        orders = Order.objects.filter(customer__in=users)
+        days = set(
+            orders.annotate(day=TruncDate("created_at")).values_list("day", flat=True)
+        )
+        DailyCustomerSales.objects.filter(customer__in=users).delete()
+        DailyProductSales.objects.filter(product__in=products).delete()
+        orders.delete()  # items cascade
+        products.delete()
+        users.delete()
+        for day in days:  # the daily totals without the deleted orders
+            rollups.rebuild_day(day)
+
+
+@transaction.atomic
+def seed(volumes: Volumes, *, seed: int = 0) -> Dataset:
+    """
+    Replace earlier benchmark data with `volumes` worth of rows.
+
+    Orders go to users round-robin and lines pick distinct random products; the
+    same `seed` gives the same prices, quantities and order shapes.
+    """
+    clear()
+    rng = random.Random(seed)
+    factory.random.reseed_random(seed)
+    User = get_user_model()
+
+    password = make_password(PASSWORD)  # hashed once, shared by every user
+    users = [
+        UserFactory.build(username=username(n), password=None)
+        for n in range(volumes.users)
+    ]
+    for user in users:
+        user.password = password
+    User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+
+    products = [
+        ProductFactory.build(
+            name=f"{PRODUCT_PREFIX}{n:06d}",
+            unit_price=fz.FuzzyDecimal(0.5, 99.99),
+        )
+        for n in range(volumes.products)
+    ]
+    Product.objects.bulk_create(products, batch_size=BATCH_SIZE)
+
+    orders, items = [], []
+    for n in range(volumes.orders):
+        order = OrderFactory.build(customer=users[n % volumes.users])
+        lines = [
+            OrderItemFactory.build(
+                order=order, product=product, quantity=rng.randint(1, 5)
+            )
+            for product in rng.sample(products, volumes.lines)
+        ]
+        order.total_price = sum(line.quantity * line.unit_price for line in lines)
+        orders.append(order)
+        items += lines
+    Order.objects.bulk_create(orders, batch_size=BATCH_SIZE)
+    OrderItem.objects.bulk_create(items, batch_size=BATCH_SIZE)
+
+    order_lines = {}
+    for item in items:
+        if item.order.customer_id == users[0].pk:
+            order_lines.setdefault(item.order_id, []).append(item.product_id)
+    return Dataset(
+        volumes=volumes,
+        user=users[0],
+        password=PASSWORD,
+        product_ids=[product.pk for product in products],
+        order_lines=order_lines,
+    )
+
+
+def filter_values(dataset: Dataset) -> dict[str, str]:
+    """
+    A mid-range value for every `OrderFilter` filter, over the user's orders.
+    """
+    bounds = Order.objects.filter(customer=dataset.user).aggregate(
+        created_min=Min("created_at"),
+        created_max=Max("created_at"),
+        updated_min=Min("updated_at"),
+        updated_max=Max("updated_at"),
+        total_min=Min("total_price"),
+        total_max=Max("total_price"),
+    )
+
+    def middle(name):
+        low, high = bounds[f"{name}_min"], bounds[f"{name}_max"]
+        return low + (high - low) / 2
+
+    created, updated = middle("created").isoformat(), middle("updated").isoformat()
+    total = str(middle("total").quantize(Decimal("0.01")))
+    return {
+        "created_from": created,
+        "created_to": created,
+        "edited_from": updated,
+        "edited_to": updated,
+        "min_total": total,
+        "max_total": total,
+    }
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+BROWSER_MIDDLEWARE_PATH = "orderflow.contrib.middleware.BrowserOnlyMiddleware"
+
+# Cache backends whose entries other worker processes can't see.
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+# What admin.E408-E410 (silenced in settings) look for in MIDDLEWARE.
+ADMIN_MIDDLEWARE = (
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+)
+
+
+@register(Tags.admin)
+def check_browser_middleware(app_configs, **kwargs):
+    """
+    The admin's middleware must run for it, inside `BrowserOnlyMiddleware`.
+    """
+    if BROWSER_MIDDLEWARE_PATH not in settings.MIDDLEWARE:
+        return []
+    return [
+        Error(
+            f"'{path}' must be in MIDDLEWARE or BROWSER_MIDDLEWARE in order to use "
+            "the admin application.",
+            id="contrib.E001",
+        )
+        for path in ADMIN_MIDDLEWARE
+        if path not in settings.MIDDLEWARE and path not in settings.BROWSER_MIDDLEWARE
+    ]
+
+
+@register(Tags.caches, Tags.database)
+def check_replica_pin_cache(app_configs, **kwargs):
+    """
+    Read-your-writes pins live in the default cache: with replicas, every worker
+    must see them.
+    """
+    if not settings.DATABASE_REPLICAS or settings.DATABASE_REPLICA_PIN_SECONDS <= 0:
+        return []
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            f"The default cache ({backend}) is local to each process, so a user "
+            "pinned to the primary after a write can read stale data from a replica "
+            "in another worker.",
+            hint="Set CACHE_URL to a shared cache (e.g. redis://redis:6379/1).",
+            id="contrib.W001",
+        )
+    ]
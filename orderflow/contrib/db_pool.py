@@ -0,0 +1,30 @@
+from typing import Optional
+
+from django.db import connections
+
+
+def pool_stats(alias: str = "default") -> Optional[dict]:
+    """
+    Snapshot of this process's psycopg pool for `alias`, or None without pooling.
+    Counters (`requests_*`, `wait_ms_total`) are cumulative since the pool opened.
+    """
+    pool = getattr(connections[alias], "pool", None)
+    if pool is None:
+        return None
+    stats = pool.get_stats()
+    size = stats.get("pool_size", 0)
+    available = stats.get("pool_available", 0)
+    return {
+        "min_size": stats.get("pool_min", pool.min_size),
+        "max_size": stats.get("pool_max", pool.max_size),
+        "size": size,
+        "available": available,
+        "in_use": size - available,
+        "waiting": stats.get("requests_waiting", 0),
+        "requests_total": stats.get("requests_num", 0),
+        "requests_queued_total": stats.get("requests_queued", 0),
+        "requests_errors_total": stats.get("requests_errors", 0),
+        "wait_ms_total": stats.get("requests_wait_ms", 0),
+        "connections_total": stats.get("connections_num", 0),
+        "connect_ms_total": stats.get("connections_ms", 0),
+    }
@@ -0,0 +1,75 @@
+"""
+Read-replica routing.
+
+Reads go to the primary unless a request opted in with `use_replica()` (see
+`ReplicaReadMixin`). Even then, anything inside a transaction on the primary
+(e.g. `services.*`, which are `@transaction.atomic`) keeps reading from it, and
+users who just wrote are pinned to the primary for
+`DATABASE_REPLICA_PIN_SECONDS` so they read their own writes.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_read_alias: ContextVar[Optional[str]] = ContextVar("read_alias", default=None)
+
+
+def current_read_alias() -> Optional[str]:
+    return _read_alias.get()
+
+
+@contextmanager
+def use_replica(alias: Optional[str] = None):
+    """
+    Route reads in this context to `alias` (default: a random replica).
+    A no-op when no replicas are configured.
+    """
+    if alias is None and settings.DATABASE_REPLICAS:
+        alias = random.choice(settings.DATABASE_REPLICAS)
+    token = _read_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        _read_alias.reset(token)
+
+
+# ---------- read-your-writes ----------
+def _pin_key(user_id) -> str:
+    return f"db-primary-pin:{user_id}"
+
+
+def pin_to_primary(user_id) -> None:
+    if settings.DATABASE_REPLICAS and settings.DATABASE_REPLICA_PIN_SECONDS > 0:
+        cache.set(_pin_key(user_id), 1, timeout=settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user_id) -> bool:
+    return cache.get(_pin_key(user_id)) is not None
+
+
+async def ais_pinned_to_primary(user_id) -> bool:
+    return await cache.aget(_pin_key(user_id)) is not None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas mirror the primary, so objects from either may be related.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,26 @@
+"""
+Local development helpers (referenced from settings/local.py only).
+"""
+
+import functools
+import socket
+
+from django.conf import settings
+
+
+@functools.cache
+def _docker_gateway_ips() -> tuple[str, ...]:
+    # Requests from the Docker host arrive from the .1 address of the container's
+    # networks. Resolved on first use rather than at settings import.
+    try:
+        _, _, ips = socket.gethostbyname_ex(socket.gethostname())
+    except OSError:
+        return ()
+    return tuple(ip.rsplit(".", 1)[0] + ".1" for ip in ips)
+
+
+def show_toolbar(request) -> bool:
+    if not settings.DEBUG:
+        return False
+    remote_addr = request.META.get("REMOTE_ADDR")
+    return remote_addr in settings.INTERNAL_IPS or remote_addr in _docker_gateway_ips()
@@ -0,0 +1,28 @@
+"""
+Documentation-only machinery, loaded only when `settings.API_DOCS_ENABLED`.
+
+Views get their `extend_schema` decorators through `schemas_for(__package__)`.
+With docs disabled the app's `schemas` module (and drf_spectacular) is never
+imported and every decorator is a no-op.
+"""
+
+from importlib import import_module
+
+from django.conf import settings
+
+
+def _identity(func):
+    return func
+
+
+class _NoSchemas:
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _identity
+
+
+def schemas_for(package: str):
+    if settings.API_DOCS_ENABLED:
+        return import_module(f"{package}.schemas")
+    return _NoSchemas()
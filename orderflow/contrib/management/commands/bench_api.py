@@ -0,0 +1,181 @@
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...benchmarks import results, scenarios
+from ...benchmarks.seed import Volumes, clear, seed
+
+
+def default_output() -> Path:
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return settings.BASE_DIR.parent / "build" / "benchmarks" / f"bench-{stamp}.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the order and authentication endpoints in-process against "
+        "seeded data; write the results as JSON and compare them with a baseline. "
+        "Run with DJANGO_SETTINGS_MODULE=orderflow.settings.bench (throttles off; "
+        "BENCH_DATABASE=sqlite for a SQLite stand-in)."
+    )
+
+    def add_arguments(self, parser):
+        defaults = Volumes()
+        parser.add_argument("--users", type=int, default=defaults.users)
+        parser.add_argument("--products", type=int, default=defaults.products)
+        parser.add_argument("--orders", type=int, default=defaults.orders)
+        parser.add_argument(
+            "--lines", type=int, default=defaults.lines, help="Lines per order."
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument(
+            "--requests", type=int, default=200, help="Timed requests per scenario."
+        )
+        parser.add_argument("--warmup", type=int, default=20)
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            help="Repeatable name prefix, e.g. orders.list or auth; default: all.",
+        )
+        parser.add_argument("--output", type=Path, help="Results file (JSON).")
+        parser.add_argument("--baseline", type=Path, help="Results to compare with.")
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Also write the results to --baseline.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=10.0,
+            help="Percent a metric may get worse before it counts as a regression.",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error when any metric regressed.",
+        )
+        parser.add_argument(
+            "--keep-data",
+            action="store_true",
+            help="Leave the seeded rows in the database afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests must be at least 1.")
+        if options["save_baseline"] and not options["baseline"]:
+            raise CommandError("--save-baseline needs --baseline.")
+        try:
+            volumes = Volumes(
+                users=options["users"],
+                products=options["products"],
+                orders=options["orders"],
+                lines=options["lines"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"Seeding {volumes.users} users, {volumes.products} products, "
+            f"{volumes.orders} orders x {volumes.lines} lines (seed {options['seed']})"
+        )
+        dataset = seed(volumes, seed=options["seed"])
+        try:
+            report = self.run(dataset, options)
+        finally:
+            if not options["keep_data"]:
+                clear()
+
+        output = options["output"] or default_output()
+        results.save(report, output)
+        self.stdout.write(f"Wrote {output}")
+
+        if options["baseline"]:
+            if options["save_baseline"]:
+                results.save(report, options["baseline"])
+                self.stdout.write(f"Saved baseline {options['baseline']}")
+            elif options["baseline"].exists():
+                self.compare(report, options)
+            else:
+                raise CommandError(f"No baseline at {options['baseline']}.")
+
+    def run(self, dataset, options) -> dict:
+        prefixes = tuple(options["scenario"] or ())
+        selected = [
+            scenario
+            for scenario in scenarios.all_scenarios(dataset)
+            if not prefixes or scenario.name.startswith(prefixes)
+        ]
+        if not selected:
+            raise CommandError("No scenario matches --scenario.")
+
+        self.stdout.write(
+            f"{options['requests']} requests per scenario "
+            f"({options['warmup']} warm-up), {len(selected)} scenarios"
+        )
+        self.stdout.write(
+            f"{'scenario':<28} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'errors':>7}"
+        )
+        measured = {}
+        for scenario in selected:
+            run = scenarios.run(
+                scenario,
+                dataset,
+                requests=options["requests"],
+                warmup=options["warmup"],
+            )
+            summary = results.summarize(run.samples, run.errors, run.elapsed)
+            summary["statuses"] = {str(k): v for k, v in sorted(run.statuses.items())}
+            measured[scenario.name] = summary
+            self.stdout.write(
+                f"{scenario.name:<28} {summary['rps']:>8.0f} {summary['p50_ms']:>8.2f} "
+                f"{summary['p95_ms']:>8.2f} {summary['p99_ms']:>8.2f} "
+                f"{summary['errors']:>7}"
+            )
+            if "429" in summary["statuses"]:
+                self.stderr.write(
+                    f"{scenario.name} was throttled; use orderflow.settings.bench."
+                )
+
+        return {
+            "environment": results.environment(),
+            "parameters": {
+                "users": dataset.volumes.users,
+                "products": dataset.volumes.products,
+                "orders": dataset.volumes.orders,
+                "lines": dataset.volumes.lines,
+                "seed": options["seed"],
+                "requests": options["requests"],
+                "warmup": options["warmup"],
+            },
+            "results": measured,
+        }
+
+    def compare(self, report: dict, options) -> None:
+        baseline = results.load(options["baseline"])
+        if baseline["parameters"] != report["parameters"]:
+            self.stderr.write(
+                "Baseline was run with different parameters; deltas may not mean much."
+            )
+        changes = results.compare(report, baseline, options["tolerance"])
+        self.stdout.write(
+            f"\nvs {options['baseline']} (git {baseline['environment'].get('git')}), "
+            f"+ is worse, tolerance {options['tolerance']:.0f}%"
+        )
+        self.stdout.write(
+            f"{'scenario':<28} {'metric':<7} {'baseline':>9} {'current':>9} "
+            f"{'change':>8}"
+        )
+        for change in changes:
+            flag = "  REGRESSION" if change.regressed else ""
+            self.stdout.write(
+                f"{change.scenario:<28} {change.metric:<7} {change.baseline:>9.2f} "
+                f"{change.current:>9.2f} {change.pct:>+7.1f}%{flag}"
+            )
+        regressed = sorted({change.scenario for change in changes if change.regressed})
+        if regressed and options["fail_on_regression"]:
+            raise CommandError(f"Regressed: {', '.join(regressed)}")
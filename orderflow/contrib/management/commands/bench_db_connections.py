@@ -0,0 +1,104 @@
+import statistics
+import threading
+import time
+
+import psycopg
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from psycopg_pool import ConnectionPool
+
+from ...benchmarks.results import percentile
+
+MODES = ("per-request", "persistent", "pooled")
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test: latency of a request's database work when connecting per "
+        "request, reusing a per-thread connection, or borrowing from a pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument(
+            "--mode", choices=MODES, action="append", help="Repeatable; default: all."
+        )
+        parser.add_argument("--requests", type=int, default=500, help="Per thread.")
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--pool-size", type=int, default=4)
+        parser.add_argument(
+            "--query", default="SELECT 1", help="Statement run by each request."
+        )
+
+    def handle(self, *args, **options):
+        wrapper = connections[options["database"]]
+        if wrapper.vendor != "postgresql":
+            raise CommandError("Only the PostgreSQL backend can be benchmarked.")
+        params = wrapper.get_connection_params()
+        params.pop("cursor_factory", None)
+        params.pop("pool", None)
+        self.params = params
+        self.options = options
+
+        self.stdout.write(
+            f"{options['threads']} threads x {options['requests']} requests, "
+            f"query={options['query']!r}"
+        )
+        self.stdout.write(
+            f"{'mode':<12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>9}"
+        )
+        for mode in options["mode"] or MODES:
+            latencies, elapsed = self.run(mode)
+            ms = [s * 1000 for s in latencies]
+            self.stdout.write(
+                f"{mode:<12} {statistics.median(ms):>8.2f} "
+                f"{percentile(ms, 95):>8.2f} {percentile(ms, 99):>8.2f} "
+                f"{len(ms) / elapsed:>9.0f}"
+            )
+
+    def run(self, mode: str) -> tuple[list[float], float]:
+        query = self.options["query"]
+        pool = None
+        if mode == "pooled":
+            size = self.options["pool_size"]
+            pool = ConnectionPool(
+                kwargs=self.params, min_size=size, max_size=size, open=True
+            )
+            pool.wait()
+
+        latencies: list[float] = []
+        lock = threading.Lock()
+
+        def worker():
+            local: list[float] = []
+            persistent = None
+            if mode == "persistent":
+                persistent = psycopg.connect(**self.params, autocommit=True)
+            for _ in range(self.options["requests"]):
+                start = time.perf_counter()
+                if mode == "per-request":
+                    with psycopg.connect(**self.params, autocommit=True) as conn:
+                        conn.execute(query).fetchall()
+                elif mode == "persistent":
+                    persistent.execute(query).fetchall()
+                else:
+                    with pool.connection() as conn:
+                        conn.execute(query).fetchall()
+                local.append(time.perf_counter() - start)
+            if persistent is not None:
+                persistent.close()
+            with lock:
+                latencies.extend(local)
+
+        threads = [
+            threading.Thread(target=worker) for _ in range(self.options["threads"])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        if pool is not None:
+            pool.close()
+        return latencies, elapsed
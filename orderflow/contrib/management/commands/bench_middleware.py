@@ -0,0 +1,103 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.handlers.wsgi import WSGIHandler, WSGIRequest
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ...benchmarks.results import percentile
+from ...checks import BROWSER_MIDDLEWARE_PATH
+from .bench_workers import BENCH_USERNAME
+
+# Before BrowserOnlyMiddleware every request ran the whole stack, and DRF fell
+# back to SessionAuthentication when there was no bearer token.
+FLAT_AUTHENTICATION = (
+    "rest_framework_simplejwt.authentication.JWTAuthentication",
+    "rest_framework.authentication.SessionAuthentication",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Microbenchmark: per-request time through the middleware stack and DRF "
+        "authentication, flat (every layer on every path) vs path-scoped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--path", default="/api/v1/orders/")
+
+    def handle(self, *args, **options):
+        user, _ = get_user_model().objects.get_or_create(username=BENCH_USERNAME)
+        session = SessionStore()
+        session["_auth_user_id"] = str(user.pk)
+        session.create()
+
+        factory = RequestFactory()
+        cases = {
+            "anonymous": factory.get(options["path"]),
+            # e.g. a browser that is also logged in to the admin
+            "session cookie": factory.get(
+                options["path"],
+                headers={
+                    "cookie": f"{settings.SESSION_COOKIE_NAME}={session.session_key}"
+                },
+            ),
+            "bearer token": factory.get(
+                options["path"],
+                headers={"authorization": f"Bearer {AccessToken.for_user(user)}"},
+            ),
+        }
+        flat_middleware = []
+        for path in settings.MIDDLEWARE:
+            if path == BROWSER_MIDDLEWARE_PATH:
+                flat_middleware += settings.BROWSER_MIDDLEWARE
+            else:
+                flat_middleware.append(path)
+        stacks = {
+            "flat": {
+                "MIDDLEWARE": flat_middleware,
+                "REST_FRAMEWORK": {
+                    **settings.REST_FRAMEWORK,
+                    "DEFAULT_AUTHENTICATION_CLASSES": FLAT_AUTHENTICATION,
+                },
+            },
+            "scoped": {},
+        }
+
+        self.stdout.write(f"{options['requests']} requests per case, {options['path']}")
+        self.stdout.write(
+            f"{'stack':<8} {'request':<16} {'status':>6} {'p50 us':>8} "
+            f"{'p99 us':>8} {'mean us':>8}"
+        )
+        try:
+            for stack, overrides in stacks.items():
+                with override_settings(**overrides):
+                    handler = WSGIHandler()
+                    for case, request in cases.items():
+                        status, samples = self.run(
+                            handler, request.environ, options["requests"]
+                        )
+                        us = [s * 1e6 for s in samples]
+                        self.stdout.write(
+                            f"{stack:<8} {case:<16} {status:>6} "
+                            f"{statistics.median(us):>8.0f} {percentile(us, 99):>8.0f} "
+                            f"{statistics.fmean(us):>8.0f}"
+                        )
+        finally:
+            session.delete()
+
+    def run(self, handler, environ, count: int) -> tuple[int, list[float]]:
+        for _ in range(min(count // 10, 100)):  # warm up
+            handler.get_response(WSGIRequest(environ.copy()))
+        samples = []
+        for _ in range(count):
+            request = WSGIRequest(environ.copy())
+            start = time.perf_counter()
+            response = handler.get_response(request)
+            samples.append(time.perf_counter() - start)
+        return response.status_code, samples
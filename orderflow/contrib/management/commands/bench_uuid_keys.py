@@ -0,0 +1,146 @@
+import random
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from ...models import uuid7
+
+GENERATORS = {"4": uuid4, "7": uuid7}
+
+
+def megabytes(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert the same volume of orders and lines into scratch tables keyed by "
+        "uuid4 and by uuid7, then compare insert throughput, WAL written and the "
+        "sizes of the primary key, (customer, created_at) and (order, product) "
+        "indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument(
+            "--uuid", choices=GENERATORS, action="append", help="Repeatable."
+        )
+        parser.add_argument("--rows", type=int, default=100_000, help="Orders.")
+        parser.add_argument("--lines", type=int, default=3, help="Per order.")
+        parser.add_argument("--customers", type=int, default=10_000)
+        parser.add_argument("--products", type=int, default=1_000)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument(
+            "--keep-tables", action="store_true", help="Don't drop the tables after."
+        )
+
+    def handle(self, *args, **options):
+        self.connection = connections[options["database"]]
+        if self.connection.vendor != "postgresql":
+            raise CommandError("Only the PostgreSQL backend can be benchmarked.")
+        if options["lines"] > options["products"]:
+            raise CommandError("--lines can't exceed --products.")
+        self.options = options
+
+        self.stdout.write(
+            f"{options['rows']} orders x {options['lines']} lines, "
+            f"batches of {options['batch_size']}"
+        )
+        self.stdout.write(
+            f"{'uuid':<6} {'orders/s':>9} {'lines/s':>9} {'WAL MB':>8} "
+            f"{'order pk':>9} {'cust,created':>13} {'line pk':>8} {'order,product':>14}"
+        )
+        for version in options["uuid"] or sorted(GENERATORS):
+            orders, items = f"bench_uuid{version}_order", f"bench_uuid{version}_item"
+            self.create_tables(orders, items)
+            try:
+                result = self.run(GENERATORS[version], orders, items)
+            finally:
+                if not options["keep_tables"]:
+                    self.sql(f"DROP TABLE IF EXISTS {items}, {orders}")
+            self.stdout.write(
+                f"v{version:<5} {result['orders/s']:>9.0f} {result['lines/s']:>9.0f} "
+                f"{megabytes(result['wal']):>8} "
+                + " ".join(
+                    f"{megabytes(size):>{width}}"
+                    for size, width in zip(result["indexes"], (9, 13, 8, 14))
+                )
+            )
+        self.stdout.write("Index sizes in MB.")
+
+    def sql(self, statement: str, params=None):
+        with self.connection.cursor() as cursor:
+            cursor.execute(statement, params)
+            return cursor.fetchone() if cursor.description else None
+
+    def create_tables(self, orders: str, items: str) -> None:
+        # The shapes and indexes of orders_order and orders_orderitem.
+        self.sql(f"DROP TABLE IF EXISTS {items}, {orders}")
+        self.sql(
+            f"CREATE TABLE {orders} (id uuid PRIMARY KEY, customer_id uuid NOT NULL,"
+            " total_price numeric(12, 2) NOT NULL, created_at timestamptz NOT NULL)"
+        )
+        self.sql(f"CREATE INDEX {orders}_cust ON {orders} (customer_id, created_at)")
+        self.sql(
+            f"CREATE TABLE {items} (id uuid PRIMARY KEY,"
+            f" order_id uuid NOT NULL REFERENCES {orders},"
+            " product_id uuid NOT NULL, quantity integer NOT NULL,"
+            " UNIQUE (order_id, product_id))"
+        )
+
+    def run(self, generate, orders: str, items: str) -> dict:
+        options = self.options
+        rng = random.Random(0)
+        # Customers and products, like every other row, were keyed by `generate`.
+        customers = [generate() for _ in range(options["customers"])]
+        products = [generate() for _ in range(options["products"])]
+        order_time = line_time = 0.0
+        (start_lsn,) = self.sql("SELECT pg_current_wal_insert_lsn()")
+
+        done = 0
+        while done < options["rows"]:
+            size = min(options["batch_size"], options["rows"] - done)
+            now = datetime.now(timezone.utc)
+            order_rows = [
+                (generate(), rng.choice(customers), 10, now) for _ in range(size)
+            ]
+            line_rows = [
+                (generate(), order[0], product, 1)
+                for order in order_rows
+                for product in rng.sample(products, options["lines"])
+            ]
+            with transaction.atomic(using=self.connection.alias):
+                with self.connection.cursor() as cursor:
+                    started = time.perf_counter()
+                    cursor.executemany(
+                        f"INSERT INTO {orders} VALUES (%s, %s, %s, %s)", order_rows
+                    )
+                    order_time += time.perf_counter() - started
+                    started = time.perf_counter()
+                    cursor.executemany(
+                        f"INSERT INTO {items} VALUES (%s, %s, %s, %s)", line_rows
+                    )
+                    line_time += time.perf_counter() - started
+            done += size
+
+        (wal,) = self.sql(
+            "SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), %s)", [start_lsn]
+        )
+        indexes = [
+            f"{orders}_pkey",
+            f"{orders}_cust",
+            f"{items}_pkey",
+            f"{items}_order_id_product_id_key",
+        ]
+        return {
+            "orders/s": options["rows"] / order_time,
+            "lines/s": options["rows"] * options["lines"] / line_time,
+            "wal": int(wal),
+            "indexes": [
+                self.sql("SELECT pg_relation_size(%s::regclass)", [name])[0]
+                for name in indexes
+            ],
+        }
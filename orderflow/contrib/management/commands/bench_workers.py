@@ -0,0 +1,174 @@
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from orderflow.orders import services
+from orderflow.orders.models import Order, Product
+
+from ...benchmarks.results import percentile
+
+WORKER_CLASSES = ("sync", "gthread", "uvicorn_worker.UvicornWorker")
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+BENCH_USERNAME = "09000000000"
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test: requests/sec per core for the order list/detail endpoints under "
+        "each gunicorn worker class (orderflow/gunicorn_conf.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--worker-class",
+            action="append",
+            help=f"Repeatable; default: {', '.join(WORKER_CLASSES)}.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Worker processes, one per core (default: CPU count).",
+        )
+        parser.add_argument("--threads", type=int, default=4, help="gthread only.")
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument(
+            "--duration", type=float, default=10.0, help="Per endpoint."
+        )
+        parser.add_argument("--orders", type=int, default=50, help="Seeded orders.")
+        parser.add_argument("--port", type=int, default=8099)
+        parser.add_argument(
+            "--settings-module",
+            default="orderflow.settings.production",
+            help="DJANGO_SETTINGS_MODULE for the server processes.",
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        token = self.seed(options["orders"])
+        order_id = Order.objects.filter(customer__username=BENCH_USERNAME).first().id
+        endpoints = {
+            "list": "/api/v1/orders/",
+            "detail": f"/api/v1/orders/{order_id}/",
+        }
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+        self.stdout.write(
+            f"{options['workers']} workers, {options['concurrency']} clients, "
+            f"{options['duration']:.0f}s per endpoint"
+        )
+        self.stdout.write(
+            f"{'worker class':<30} {'endpoint':<8} {'req/s':>8} "
+            f"{'req/s/core':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}"
+        )
+        for worker_class in options["worker_class"] or WORKER_CLASSES:
+            server = self.start_server(worker_class)
+            try:
+                for name, path in endpoints.items():
+                    self.report(worker_class, name, *self.load(path))
+            finally:
+                server.terminate()
+                server.wait(timeout=60)
+
+    def seed(self, count: int) -> str:
+        User = get_user_model()
+        user, _ = User.objects.get_or_create(username=BENCH_USERNAME)
+        product, _ = Product.objects.get_or_create(
+            name="bench product", defaults={"unit_price": Decimal("9.99")}
+        )
+        existing = Order.objects.filter(customer=user).count()
+        for _ in range(count - existing):
+            services.create_order(
+                customer=user, items=[{"_product_instance": product, "quantity": 2}]
+            )
+        # Fresh token per run; the access token lifetime is short.
+        return str(AccessToken.for_user(user))
+
+    def start_server(self, worker_class: str) -> subprocess.Popen:
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": self.options["settings_module"],
+            "GUNICORN_BIND": f"127.0.0.1:{self.options['port']}",
+            "GUNICORN_WORKER_CLASS": worker_class,
+            "GUNICORN_WORKERS": str(self.options["workers"]),
+            "GUNICORN_THREADS": str(self.options["threads"]),
+            "GUNICORN_LOG_LEVEL": "warning",
+            "THROTTLE_RATE_ORDERS": "1000000/second",
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "orderflow/gunicorn_conf.py"],
+            cwd=PROJECT_ROOT,
+            env=env,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"gunicorn ({worker_class}) exited on startup.")
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", self.options["port"])
+                conn.request("GET", "/api/v1/orders/", headers=self.headers)
+                if conn.getresponse().status == 200:
+                    return server
+            except OSError:
+                pass
+            time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f"gunicorn ({worker_class}) did not become ready.")
+
+    def load(self, path: str) -> tuple[int, list[float], int, float]:
+        stop_at = time.monotonic() + self.options["duration"]
+        latencies: list[float] = []
+        errors = 0
+        lock = threading.Lock()
+
+        def client():
+            nonlocal errors
+            local, failed = [], 0
+            conn = http.client.HTTPConnection("127.0.0.1", self.options["port"])
+            while time.monotonic() < stop_at:
+                start = time.perf_counter()
+                try:
+                    conn.request("GET", path, headers=self.headers)
+                    response = conn.getresponse()
+                    response.read()
+                    ok = response.status == 200
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    ok = False
+                if ok:
+                    local.append(time.perf_counter() - start)
+                else:
+                    failed += 1
+            conn.close()
+            with lock:
+                latencies.extend(local)
+                errors += failed
+
+        clients = [
+            threading.Thread(target=client) for _ in range(self.options["concurrency"])
+        ]
+        started = time.perf_counter()
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        return len(latencies), latencies, errors, time.perf_counter() - started
+
+    def report(self, worker_class, endpoint, count, latencies, errors, elapsed):
+        rps = count / elapsed
+        ms = [s * 1000 for s in latencies] or [0.0]
+        self.stdout.write(
+            f"{worker_class:<30} {endpoint:<8} {rps:>8.0f} "
+            f"{rps / self.options['workers']:>10.1f} {statistics.median(ms):>8.1f} "
+            f"{percentile(ms, 99):>8.1f} {errors:>7}"
+        )
@@ -0,0 +1,53 @@
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def default_schema_path() -> Path:
+    version = settings.SPECTACULAR_SETTINGS["VERSION"]
+    return settings.BASE_DIR.parent / "build" / f"openapi-{version}.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI document once and write it to a versioned file "
+        "(default: API_SCHEMA_FILE, else build/openapi-<VERSION>.json) that /schema/ "
+        "serves as-is. Run at image build time, i.e. once per deploy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="Path to write the schema to.")
+        parser.add_argument(
+            "--validate",
+            action="store_true",
+            help="Validate the generated schema against the OpenAPI 3 spec.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.API_DOCS_ENABLED:
+            raise CommandError("Set API_DOCS_ENABLED=true to generate the schema.")
+        from drf_spectacular.renderers import OpenApiJsonRenderer
+        from drf_spectacular.settings import spectacular_settings
+
+        generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+        schema = generator.get_schema(request=None, public=True)
+        if options["validate"]:
+            from drf_spectacular.validation import validate_schema
+
+            validate_schema(schema)
+        body = OpenApiJsonRenderer().render(schema, renderer_context={})
+
+        output = Path(
+            options["output"] or settings.API_SCHEMA_FILE or default_schema_path()
+        )
+        output.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so a running server never reads a partial file.
+        fd, tmp = tempfile.mkstemp(dir=output.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, output)
+        self.stdout.write(f"Wrote {output} ({len(body) / 1024:.1f} KiB)")
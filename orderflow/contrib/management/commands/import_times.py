@@ -0,0 +1,101 @@
+import os
+import re
+import resource
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+PROJECT_ROOT = Path(__file__).resolve().parents[4]
+
+# What a worker does before serving its first request: build the app and load
+# the URLconf (which imports every view, serializer and schema module).
+BOOT_SCRIPT = (
+    "import orderflow.{entry}; "
+    "from django.urls import get_resolver; "
+    "get_resolver().url_patterns"
+)
+
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+class Command(BaseCommand):
+    help = (
+        "Boot the app in a fresh interpreter under `python -X importtime` and report "
+        "import time per module and package, wall time and peak memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--entry", choices=("wsgi", "asgi"), default="wsgi")
+        parser.add_argument(
+            "--settings-module",
+            default=os.environ.get("DJANGO_SETTINGS_MODULE"),
+            help="DJANGO_SETTINGS_MODULE for the measured process (default: current).",
+        )
+        parser.add_argument("--top", type=int, default=25, help="Modules to list.")
+        parser.add_argument(
+            "--sort", choices=("cumulative", "self"), default="cumulative"
+        )
+        parser.add_argument(
+            "--budget-ms",
+            type=float,
+            default=None,
+            help="Fail if the total import time exceeds this many milliseconds.",
+        )
+
+    def handle(self, *args, **options):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": options["settings_module"]}
+        script = BOOT_SCRIPT.format(entry=options["entry"])
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", script],
+            cwd=PROJECT_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        wall = time.perf_counter() - started
+        if result.returncode != 0:
+            raise CommandError(result.stderr[-2000:])
+        max_rss_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+        modules = []  # (name, self_us, cumulative_us, depth)
+        for line in result.stderr.splitlines():
+            match = LINE_RE.match(line)
+            if match:
+                self_us, cumulative_us, indent, name = match.groups()
+                modules.append((name, int(self_us), int(cumulative_us), len(indent)))
+
+        total_us = sum(self_us for _, self_us, _, _ in modules)
+        self.stdout.write(
+            f"{options['settings_module']} ({options['entry']}): "
+            f"{len(modules)} modules, imports {total_us / 1000:.0f} ms, "
+            f"boot {wall * 1000:.0f} ms, peak RSS {max_rss_mb:.1f} MB"
+        )
+
+        key = 2 if options["sort"] == "cumulative" else 1
+        self.stdout.write(f"\n{'self ms':>9} {'cumul ms':>9}  module")
+        for name, self_us, cumulative_us, depth in sorted(
+            modules, key=lambda m: m[key], reverse=True
+        )[: options["top"]]:
+            self.stdout.write(
+                f"{self_us / 1000:>9.1f} {cumulative_us / 1000:>9.1f}  {name}"
+            )
+
+        by_package = defaultdict(int)
+        for name, self_us, _, _ in modules:
+            by_package[name.split(".")[0]] += self_us
+        self.stdout.write(f"\n{'self ms':>9}  top-level package")
+        for package, self_us in sorted(
+            by_package.items(), key=lambda item: item[1], reverse=True
+        )[: options["top"]]:
+            self.stdout.write(f"{self_us / 1000:>9.1f}  {package}")
+
+        budget = options["budget_ms"]
+        if budget is not None and total_us / 1000 > budget:
+            raise CommandError(
+                f"Import time {total_us / 1000:.0f} ms is over the {budget:.0f} ms budget."
+            )
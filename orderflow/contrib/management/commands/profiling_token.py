@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...profiling import make_token
+
+
+class Command(BaseCommand):
+    help = (
+        "Print an `X-Profile` header value: a request carrying it is profiled "
+        "(see orderflow/contrib/profiling.py). Valid for PROFILING_TOKEN_MAX_AGE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--issued-by", default="cli", help="Recorded with each profile."
+        )
+
+    def handle(self, *args, **options):
+        if not settings.PROFILING_ENABLED:
+            self.stderr.write("PROFILING_ENABLED is off; the header will be ignored.")
+        self.stdout.write(make_token(options["issued_by"]))
@@ -0,0 +1,251 @@
+"""
+Prometheus metrics, scraped from `/internal/metrics/`.
+
+Metric families are created once at import; the hot path only looks up a
+labelled child (a dict hit) and bumps pre-aggregated counters/buckets. Labels
+are bounded: the route is the URL name (`v1-orders-list`), never the path, and
+methods outside `METHODS` are counted as "OTHER".
+
+Across worker processes: with `PROMETHEUS_MULTIPROC_DIR` set (gunicorn sets it,
+see `orderflow/gunicorn_conf.py`) every process writes its values to its own
+mmap'd file and a scrape sums them, so any worker can answer for all of them.
+
+Connection pool gauges (`orderflow_db_pool_*`) are the exception: `PoolCollector`
+reads them from the answering process's pools at scrape time, labelled with
+its pid.
+"""
+
+import functools
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from .db_pool import pool_stats
+from .query_budget import QueryRecorder
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+REQUESTS = Counter(
+    "orderflow_http_requests_total",
+    "Requests by route, method and response status.",
+    ("route", "method", "status"),
+)
+REQUEST_LATENCY = Histogram(
+    "orderflow_http_request_duration_seconds",
+    "Time spent producing the response.",
+    ("route", "method"),
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    "orderflow_http_db_queries",
+    "Database queries per request.",
+    ("route", "method"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_LATENCY = Histogram(
+    "orderflow_http_db_duration_seconds",
+    "Time per request spent in database queries.",
+    ("route", "method"),
+    buckets=LATENCY_BUCKETS,
+)
+THROTTLE_REJECTIONS = Counter(
+    "orderflow_throttle_rejections_total",
+    "Requests rejected by a throttle.",
+    ("scope",),
+)
+QUERY_BUDGET_VIOLATIONS = Counter(
+    "orderflow_query_budget_violations_total",
+    "Requests over their query budget or repeating a statement (N+1).",
+    ("route", "kind"),
+)
+LOG_RECORDS_DROPPED = Counter(
+    "orderflow_log_records_dropped_total",
+    "Log records dropped because the log queue was full.",
+)
+SERVICE_LATENCY = Histogram(
+    "orderflow_service_duration_seconds",
+    "Service-layer call time (transaction included).",
+    ("service",),
+    buckets=LATENCY_BUCKETS,
+)
+
+
+# pool_stats() key, metric name, help, divisor (ms to seconds)
+POOL_GAUGES = (
+    ("min_size", "orderflow_db_pool_min_size", "Connections the pool keeps open.", 1),
+    ("max_size", "orderflow_db_pool_max_size", "Connections the pool may open.", 1),
+    ("size", "orderflow_db_pool_size", "Connections open in the pool.", 1),
+    ("available", "orderflow_db_pool_available", "Idle connections in the pool.", 1),
+    ("in_use", "orderflow_db_pool_in_use", "Connections lent out.", 1),
+    ("waiting", "orderflow_db_pool_waiting", "Requests waiting for a connection.", 1),
+)
+POOL_COUNTERS = (
+    ("requests_total", "orderflow_db_pool_requests", "Connection requests.", 1),
+    (
+        "requests_queued_total",
+        "orderflow_db_pool_requests_queued",
+        "Connection requests that had to wait.",
+        1,
+    ),
+    (
+        "requests_errors_total",
+        "orderflow_db_pool_requests_errors",
+        "Connection requests that failed (timeout, queue full).",
+        1,
+    ),
+    (
+        "wait_ms_total",
+        "orderflow_db_pool_wait_seconds",
+        "Time spent waiting for a connection.",
+        1000,
+    ),
+    ("connections_total", "orderflow_db_pool_connections", "Connections opened.", 1),
+    (
+        "connect_ms_total",
+        "orderflow_db_pool_connect_seconds",
+        "Time spent opening connections.",
+        1000,
+    ),
+)
+
+
+class PoolCollector(Collector):
+    """
+    `pool_stats()` of this process's pools, by database alias, at scrape time.
+    """
+
+    labels = ("database", "pid")
+
+    def families(self):
+        return [
+            GaugeMetricFamily(name, doc, labels=self.labels)
+            for _, name, doc, _ in POOL_GAUGES
+        ] + [
+            CounterMetricFamily(name, doc, labels=self.labels)
+            for _, name, doc, _ in POOL_COUNTERS
+        ]
+
+    def describe(self):
+        # Registering must not call collect(): that would create the pools.
+        return self.families()
+
+    def collect(self):
+        families = self.families()
+        pid = str(os.getpid())
+        for alias in settings.DATABASES:
+            stats = pool_stats(alias)
+            if stats is None:
+                continue
+            for family, (key, _, _, divisor) in zip(
+                families, POOL_GAUGES + POOL_COUNTERS
+            ):
+                family.add_metric((alias, pid), stats[key] / divisor)
+        return families
+
+
+POOLS = PoolCollector()
+REGISTRY.register(POOLS)
+
+
+def route_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.url_name or match.view_name or "unnamed"
+
+
+def method_name(request) -> str:
+    # Clients pick the method token: don't let them mint new series.
+    return request.method if request.method in METHODS else "OTHER"
+
+
+def timed(service: str):
+    """
+    Record the decorated function's duration in `orderflow_service_duration_seconds`.
+    """
+    histogram = SERVICE_LATENCY.labels(service=service)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def render() -> tuple[bytes, str]:
+    """
+    Exposition text for every process (multi-process mode) or this one.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(POOLS)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    Per request: latency, status, query count and database time, by route.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with QueryRecorder(fingerprints=False) as recorder:
+            request.query_recorder = recorder  # read by RequestLogMiddleware
+            response = self.get_response(request)
+        self.observe(request, response, recorder, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        # Also sees the queries sync_to_async runs on the ORM thread (see query_budget).
+        with QueryRecorder(fingerprints=False) as recorder:
+            request.query_recorder = recorder
+            response = await self.get_response(request)
+        self.observe(request, response, recorder, time.perf_counter() - start)
+        return response
+
+    @staticmethod
+    def observe(request, response, recorder: QueryRecorder, elapsed: float):
+        route, method = route_name(request), method_name(request)
+        REQUESTS.labels(route, method, response.status_code).inc()
+        REQUEST_LATENCY.labels(route, method).observe(elapsed)
+        DB_QUERIES.labels(route, method).observe(recorder.count)
+        DB_LATENCY.labels(route, method).observe(recorder.duration)
@@ -0,0 +1,197 @@
+import zlib
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.module_loading import import_string
+
+try:
+    import zstandard
+except ImportError:  # optional: gzip only
+    zstandard = None
+
+
+class BrowserOnlyMiddleware:
+    """
+    Run `settings.BROWSER_MIDDLEWARE` (sessions, CSRF, auth, messages, ...) for
+    every path except those under `settings.BROWSER_MIDDLEWARE_EXCLUDE_PATHS`.
+
+    API requests authenticate with a bearer token, so the session lookup, CSRF
+    check and message storage only serve the admin. Excluded paths go straight
+    to the next middleware; the rest go through the inner stack, which is built
+    (and its `process_view` hooks called) the way Django builds `MIDDLEWARE`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.exclude_paths = tuple(settings.BROWSER_MIDDLEWARE_EXCLUDE_PATHS)
+
+        handler = get_response
+        view_hooks = []
+        for middleware_path in reversed(settings.BROWSER_MIDDLEWARE):
+            try:
+                mw_instance = import_string(middleware_path)(handler)
+            except MiddlewareNotUsed:
+                continue
+            if hasattr(mw_instance, "process_view"):
+                view_hooks.insert(0, mw_instance.process_view)
+            handler = convert_exception_to_response(mw_instance)
+        self.browser_handler = handler
+        self.view_hooks = view_hooks
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            self.process_view = self.aprocess_view
+
+    def skips(self, request) -> bool:
+        return request.path_info.startswith(self.exclude_paths)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.skips(request):
+            return self.get_response(request)
+        return self.browser_handler(request)
+
+    async def __acall__(self, request):
+        if self.skips(request):
+            return await self.get_response(request)
+        return await self.browser_handler(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.skips(request):
+            return None
+        for hook in self.view_hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if self.skips(request) or not self.view_hooks:
+            return None
+        return await sync_to_async(BrowserOnlyMiddleware.process_view)(
+            self, request, view_func, view_args, view_kwargs
+        )
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress API payloads with the best coding the client accepts: zstd (when
+    `zstandard` is installed) or gzip.
+
+    Only `COMPRESSION_CONTENT_TYPES` are touched, and buffered responses only
+    when they are at least `COMPRESSION_MIN_SIZE` bytes. Streaming responses are
+    compressed chunk by chunk, flushing after each one so clients can consume
+    rows as they arrive. CPU per byte is bounded by `COMPRESSION_*_LEVEL`.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = settings.COMPRESSION_MIN_SIZE
+        self.content_types = frozenset(settings.COMPRESSION_CONTENT_TYPES)
+        self.gzip_level = settings.COMPRESSION_GZIP_LEVEL
+        self.zstd_level = settings.COMPRESSION_ZSTD_LEVEL
+        self.codings = ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+    # ---------- negotiation ----------
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        """
+        The server's most preferred coding with a non-zero q in `Accept-Encoding`.
+        """
+        accepted = set()
+        for item in accept_encoding.split(","):
+            coding, _, params = item.partition(";")
+            q = 1.0
+            params = params.strip().replace(" ", "")
+            if params.startswith("q="):
+                try:
+                    q = float(params[2:])
+                except ValueError:
+                    continue
+            if q > 0:
+                accepted.add(coding.strip().lower())
+        for coding in self.codings:
+            if coding in accepted:
+                return coding
+        return None
+
+    # ---------- codecs ----------
+    def compressobj(self, coding: str):
+        if coding == "zstd":
+            return zstandard.ZstdCompressor(level=self.zstd_level).compressobj()
+        return zlib.compressobj(self.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def flush_modes(self, coding: str) -> tuple[int, int]:
+        """
+        (end the current block, end the stream) for `coding`.
+        """
+        if coding == "zstd":
+            return zstandard.COMPRESSOBJ_FLUSH_BLOCK, zstandard.COMPRESSOBJ_FLUSH_FINISH
+        return zlib.Z_SYNC_FLUSH, zlib.Z_FINISH
+
+    def compress(self, coding: str, content: bytes) -> bytes:
+        if coding == "zstd":  # one-shot frames record the content size
+            return zstandard.ZstdCompressor(level=self.zstd_level).compress(content)
+        obj = self.compressobj(coding)
+        return obj.compress(content) + obj.flush(zlib.Z_FINISH)
+
+    def compress_stream(self, coding: str, chunks):
+        obj = self.compressobj(coding)
+        block, finish = self.flush_modes(coding)
+        for chunk in chunks:
+            yield obj.compress(chunk) + obj.flush(block)
+        yield obj.flush(finish)
+
+    async def acompress_stream(self, coding: str, chunks):
+        obj = self.compressobj(coding)
+        block, finish = self.flush_modes(coding)
+        async for chunk in chunks:
+            yield obj.compress(chunk) + obj.flush(block)
+        yield obj.flush(finish)
+
+    # ---------- response ----------
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type not in self.content_types:
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = self.negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if coding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.acompress_stream(
+                    coding, response.streaming_content
+                )
+            else:
+                response.streaming_content = self.compress_stream(
+                    coding, response.streaming_content
+                )
+            del response.headers["Content-Length"]
+        else:
+            compressed = self.compress(coding, response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # The encoded body is a different representation: weaken strong ETags.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = coding
+        return response
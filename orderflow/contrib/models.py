@@ -1,10 +1,44 @@
-from uuid import uuid4
+import os
+import threading
+import time
+from uuid import UUID, uuid4
 
+from django.conf import settings
 from django.db import models
 
+_clock = threading.Lock()
+_last = 0  # last (ms << 12 | sub-ms) handed out by this process
+
+
+def uuid7() -> UUID:
+    """
+    Time-ordered UUID (RFC 9562 version 7): 48 bits of Unix milliseconds, then
+    12 bits of sub-millisecond time and 62 random bits. New rows land at the
+    right edge of the primary-key index instead of on a random page.
+
+    Ids from one process are strictly increasing: when the clock hasn't moved
+    past the previous id (or went back), the 60-bit time field of that id is
+    carried over plus one.
+    """
+    global _last
+    ms, ns = divmod(time.time_ns(), 1_000_000)
+    stamp = (ms & (1 << 48) - 1) << 12 | ns * 4096 // 1_000_000
+    with _clock:
+        _last = stamp = max(stamp, _last + 1)
+    value = stamp >> 12 << 80 | 7 << 76 | (stamp & 0xFFF) << 64
+    value |= 0b10 << 62 | int.from_bytes(os.urandom(8), "big") & (1 << 62) - 1
+    return UUID(int=value)
+
+
+def new_uuid() -> UUID:
+    """
+    Primary key for a new row: `uuid7()`, or `uuid4()` with UUID_PK_VERSION=4.
+    """
+    return uuid4() if settings.UUID_PK_VERSION == 4 else uuid7()
+
 
 class UUIDPKMixin(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=new_uuid, editable=False)
 
     class Meta:
         abstract = True
@@ -0,0 +1,348 @@
+"""
+On-demand request profiling.
+
+A request is profiled when it carries a signed `X-Profile` header (see
+`make_token` / `manage.py profiling_token`) or comes from a user an admin has
+switched profiling on for (User admin actions; kept in the cache with a TTL).
+A profile holds a cProfile report, every SQL statement with its time, and the
+plans of the slowest SELECTs. Profiles are JSON files in `PROFILING_DIR`, a ring
+buffer of the newest `PROFILING_MAX_PROFILES`, and are listed at
+/admin/profiles/.
+
+The middleware sits outside the metrics and query budget middleware, so the
+profiler's own EXPLAINs aren't counted against the request. With
+`PROFILING_ENABLED` off it isn't loaded; otherwise a request nobody asked to
+profile costs a header lookup and a check of the (locally cached) set of
+profiled users.
+
+A process profiles one request at a time: requests that should be profiled
+while another one is go through unprofiled.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connections
+
+from .query_budget import _SAVEPOINT_PREFIXES, QueryObserver
+
+logger = logging.getLogger(__name__)
+
+HEADER = "HTTP_X_PROFILE"
+SIGNING_SALT = "orderflow.profiling"
+USERS_CACHE_KEY = "profiling:users"
+USERS_REFRESH_SECONDS = 10
+MAX_STATEMENTS = 500  # per profile
+STATS_LINES = 40
+
+# cProfile can't run twice at once: since Python 3.12 a second enable() raises
+# ValueError, and before that a profile of the event loop thread picks up the
+# other request's frames too.
+_profiler_lock = threading.Lock()
+
+
+# ---------- triggers ----------
+def make_token(issued_by: str) -> str:
+    """
+    Value for the `X-Profile` header; valid for `PROFILING_TOKEN_MAX_AGE` seconds.
+    """
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign(issued_by)
+
+
+def check_token(value: str) -> Optional[str]:
+    try:
+        return signing.TimestampSigner(salt=SIGNING_SALT).unsign(
+            value, max_age=settings.PROFILING_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return None
+
+
+def _cache():
+    return caches[settings.PROFILING_CACHE_ALIAS]
+
+
+def profiled_users() -> dict[str, float]:
+    """
+    {user id: epoch seconds profiling stops}, expired entries dropped.
+    """
+    now = time.time()
+    users = _cache().get(USERS_CACHE_KEY) or {}
+    return {user_id: until for user_id, until in users.items() if until > now}
+
+
+def profile_user(user_id, seconds: int) -> None:
+    users = profiled_users()
+    users[str(user_id)] = time.time() + seconds
+    _cache().set(USERS_CACHE_KEY, users, timeout=max(users.values()) - time.time())
+
+
+def stop_profiling_user(user_id) -> None:
+    users = profiled_users()
+    users.pop(str(user_id), None)
+    if users:
+        _cache().set(USERS_CACHE_KEY, users, timeout=max(users.values()) - time.time())
+    else:
+        _cache().delete(USERS_CACHE_KEY)
+
+
+def request_user_id(request) -> Optional[str]:
+    """
+    The bearer token's user, without a query (or the session user, once the
+    inner middleware has set `request.user`).
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return str(user.pk)
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken
+    from rest_framework_simplejwt.settings import api_settings
+
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw = header and authentication.get_raw_token(header)
+    if not raw:
+        return None
+    try:
+        token = authentication.get_validated_token(raw)
+    except InvalidToken:
+        return None
+    return str(token.get(api_settings.USER_ID_CLAIM))
+
+
+# ---------- capture ----------
+class SQLCapture(QueryObserver):
+    """
+    Records each statement, its parameters and its time (on whichever thread the
+    request's queries run, see `QueryObserver`).
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.truncated = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.startswith(_SAVEPOINT_PREFIXES):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if len(self.statements) < MAX_STATEMENTS:
+                self.statements.append(
+                    {
+                        "alias": context["connection"].alias,
+                        "sql": sql,
+                        "params": None if many else params,
+                        "ms": (time.perf_counter() - start) * 1000,
+                    }
+                )
+            else:
+                self.truncated += 1
+
+
+def explain(statement: dict) -> str:
+    """
+    The plan of a captured SELECT, run again with EXPLAIN (ANALYZE if configured).
+    """
+    connection = connections[statement["alias"]]
+    if connection.vendor != "postgresql":
+        return f"(EXPLAIN is only collected on PostgreSQL, not {connection.vendor})"
+    options = "ANALYZE, BUFFERS" if settings.PROFILING_EXPLAIN_ANALYZE else "COSTS"
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"EXPLAIN ({options}) {statement['sql']}", statement["params"]
+            )
+            return "\n".join(row[0] for row in cursor.fetchall())
+    except DatabaseError as e:
+        return f"(EXPLAIN failed: {e})"
+
+
+def explain_slowest(statements: list[dict]) -> list[dict]:
+    seen, plans = set(), []
+    for statement in sorted(statements, key=lambda s: s["ms"], reverse=True):
+        sql = statement["sql"]
+        if (
+            len(plans) >= settings.PROFILING_EXPLAIN_LIMIT
+            or not sql.lstrip().upper().startswith("SELECT")
+            or sql.rstrip().upper().endswith(("FOR UPDATE", "NOWAIT", "SKIP LOCKED"))
+            or sql in seen
+        ):
+            continue
+        seen.add(sql)
+        plans.append({"sql": sql, "ms": statement["ms"], "plan": explain(statement)})
+    return plans
+
+
+def stats_report(profiler: cProfile.Profile) -> dict[str, str]:
+    report = {}
+    for sort in ("cumulative", "tottime"):
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).strip_dirs().sort_stats(sort).print_stats(
+            STATS_LINES
+        )
+        report[sort] = out.getvalue()
+    return report
+
+
+# ---------- ring buffer ----------
+def profile_dir() -> Path:
+    return Path(settings.PROFILING_DIR)
+
+
+def save_profile(record: dict) -> str:
+    """
+    Write `record` and drop the oldest profiles beyond `PROFILING_MAX_PROFILES`.
+    """
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    profile_id = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(record, f, default=str)
+    os.replace(tmp, directory / f"{profile_id}.json")
+    keep = settings.PROFILING_MAX_PROFILES
+    for stale in list_profiles()[keep:]:
+        (directory / f"{stale}.json").unlink(missing_ok=True)
+    return profile_id
+
+
+def list_profiles() -> list[str]:
+    """
+    Profile ids, newest first.
+    """
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    return sorted((path.stem for path in directory.glob("*.json")), reverse=True)
+
+
+def load_profile(profile_id: str) -> Optional[dict]:
+    if profile_id not in list_profiles():  # also rejects path tricks
+        return None
+    with open(profile_dir() / f"{profile_id}.json") as f:
+        return json.load(f)
+
+
+# ---------- middleware ----------
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.users: frozenset = frozenset()
+        self.users_checked_at = float("-inf")
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def trigger(self, request) -> Optional[str]:
+        """
+        Why this request is profiled, or None (the common case).
+        """
+        token = request.META.get(HEADER)
+        if token is not None:
+            issued_by = check_token(token)
+            return f"header ({issued_by})" if issued_by else None
+        now = time.monotonic()
+        if now - self.users_checked_at > USERS_REFRESH_SECONDS:
+            self.users_checked_at = now
+            try:
+                self.users = frozenset(profiled_users())
+            except Exception as e:  # never fail a request over profiling
+                logger.warning("profiling: can't read profiled users: %s", e)
+        if self.users and request_user_id(request) in self.users:
+            return "user"
+        return None
+
+    def busy(self, request) -> bool:
+        if _profiler_lock.acquire(blocking=False):
+            return False
+        logger.info("profiling: busy with another request, skipping %s", request.path)
+        return True
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        reason = self.trigger(request)
+        if reason is None or self.busy(request):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        try:
+            with SQLCapture() as sql:
+                start = time.perf_counter()
+                profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profiler.disable()
+                elapsed = time.perf_counter() - start
+        finally:
+            _profiler_lock.release()
+        self.record(request, response, reason, profiler, sql, elapsed)
+        return response
+
+    async def __acall__(self, request):
+        reason = self.trigger(request)
+        if reason is None or self.busy(request):
+            return await self.get_response(request)
+        # Only the event loop thread is profiled: what the view runs through
+        # sync_to_async (the ORM) shows up as time spent awaiting, though its
+        # queries are still captured.
+        profiler = cProfile.Profile()
+        try:
+            with SQLCapture() as sql:
+                start = time.perf_counter()
+                profiler.enable()
+                try:
+                    response = await self.get_response(request)
+                finally:
+                    profiler.disable()
+                elapsed = time.perf_counter() - start
+        finally:
+            _profiler_lock.release()
+        await sync_to_async(self.record)(
+            request, response, reason, profiler, sql, elapsed
+        )
+        return response
+
+    def record(self, request, response, reason, profiler, sql: SQLCapture, elapsed):
+        try:
+            record = {
+                "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "method": request.method,
+                "path": request.get_full_path(),
+                "status": response.status_code,
+                "reason": reason,
+                "user": request_user_id(request),
+                "ms": elapsed * 1000,
+                "db_ms": sum(s["ms"] for s in sql.statements),
+                "queries": len(sql.statements) + sql.truncated,
+                "statements": sql.statements,
+                "plans": explain_slowest(sql.statements),
+                "stats": stats_report(profiler),
+            }
+            profile_id = save_profile(record)
+        except Exception:
+            logger.exception("profiling: could not save the profile")
+            return
+        response["X-Profile-Id"] = profile_id
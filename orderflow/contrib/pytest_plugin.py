@@ -0,0 +1,22 @@
+"""
+pytest plugin (enabled in pytest.ini): every request made by a test runs under
+`QueryBudgetMiddleware` in "raise" mode, so exceeding a view's query budget or
+an N+1 pattern fails the test. `query_recorder` measures arbitrary code.
+"""
+
+import pytest
+
+from .query_budget import QueryRecorder
+
+
+@pytest.fixture(autouse=True)
+def _enforce_query_budgets(settings):
+    settings.QUERY_BUDGET_MODE = "raise"
+
+
+@pytest.fixture
+def query_recorder():
+    """
+    `with query_recorder() as recorder: ...` → `recorder.count`, `.duplicates()`.
+    """
+    return QueryRecorder
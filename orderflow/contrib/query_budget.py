@@ -0,0 +1,199 @@
+"""
+Per-request query accounting.
+
+`QueryRecorder` counts the queries run inside it, their total time and how often
+each statement shape (fingerprint) repeats. It is a `QueryObserver`: observers
+are active in the context that entered them (a `ContextVar`, which `sync_to_async`
+copies into the thread it runs the ORM on) and are fed by one execute wrapper that
+every connection gets when it is created. Under ASGI the queries of a request
+therefore reach the middleware observing it even though they run on another thread,
+with other connection objects, than the middleware itself.
+`QueryBudgetMiddleware` records each request and checks it against the view's
+declared budget (`query_budgets = {action: max_queries}` on a viewset, or
+`query_budget` on any view) and for N+1 patterns: the same fingerprint run
+`QUERY_BUDGET_DUPLICATE_THRESHOLD` times or more. `QUERY_BUDGET_MODE` decides
+what a violation does: "warn" logs it, "raise" fails the request (tests run
+this way, see `orderflow.contrib.pytest_plugin`), "off" removes the middleware.
+Violations are also counted in `orderflow_query_budget_violations_total`.
+"""
+
+import functools
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST_RE = re.compile(r"IN \((?:%s, )*%s\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SAVEPOINT_PREFIXES = ("SAVEPOINT ", "RELEASE SAVEPOINT ", "ROLLBACK TO SAVEPOINT ")
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Statement shape: literals and IN-list lengths don't make two queries differ.
+    """
+    sql = _LITERAL_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    return _WHITESPACE_RE.sub(" ", sql).strip()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+# ---------- observers ----------
+_observers: ContextVar[tuple] = ContextVar("query_observers", default=())
+
+
+def _observe(execute, sql, params, many, context):
+    """
+    Execute wrapper on every connection: runs the statement through the observers
+    active in the calling context.
+    """
+    for observer in reversed(_observers.get()):
+        execute = functools.partial(observer, execute)
+    return execute(sql, params, many, context)
+
+
+def install(sender=None, connection=None, **kwargs):
+    """
+    `connection_created` receiver (see `ContribConfig.ready`): put `_observe` on the
+    connection once. It goes first so `execute_wrapper()` blocks, which pop the
+    last wrapper, leave it alone.
+    """
+    if _observe not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _observe)
+
+
+class QueryObserver:
+    """
+    Base for execute_wrapper-style callables that see the queries run in the
+    current context while entered, on whichever thread and connection they run.
+    """
+
+    def __call__(self, execute, sql, params, many, context):
+        raise NotImplementedError
+
+    def __enter__(self):
+        # Connections opened before the receiver was connected.
+        for connection in connections.all(initialized_only=True):
+            install(connection=connection)
+        self._token = _observers.set((*_observers.get(), self))
+        return self
+
+    def __exit__(self, *exc_info):
+        _observers.reset(self._token)
+
+
+class QueryRecorder(QueryObserver):
+    """
+    `with QueryRecorder() as recorder: ...` → `count`, `duration`, `duplicates()`.
+    """
+
+    def __init__(self, fingerprints: bool = True):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints: Optional[Counter] = Counter() if fingerprints else None
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.startswith(_SAVEPOINT_PREFIXES):
+            # Nested-atomic bookkeeping; tests run inside a transaction and would
+            # otherwise count two more statements per atomic block than production.
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            if self.fingerprints is not None:
+                self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self, threshold: int = 2) -> dict[str, int]:
+        return {sql: n for sql, n in self.fingerprints.items() if n >= threshold}
+
+
+def budget_for(view_func, method: str) -> Optional[int]:
+    """
+    The query budget declared for the view (and action) handling `method`.
+    """
+    fallback = getattr(view_func, "view_initkwargs", {}).get("fallback")
+    if fallback is not None and method not in ("GET", "HEAD"):
+        return budget_for(fallback, method)  # AsyncAPIView delegating a write
+    view_class = getattr(view_func, "cls", None) or getattr(
+        view_func, "view_class", None
+    )
+    actions = getattr(view_func, "actions", None)
+    if view_class is not None and actions:
+        action = actions.get(method.lower())
+        budgets = getattr(view_class, "query_budgets", {})
+        if action in budgets:
+            return budgets[action]
+    owner = view_class if view_class is not None else view_func
+    return getattr(owner, "query_budget", None)
+
+
+class QueryBudgetMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.mode = settings.QUERY_BUDGET_MODE
+        if self.mode not in ("warn", "raise"):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.duplicate_threshold = settings.QUERY_BUDGET_DUPLICATE_THRESHOLD
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        self.check(request, recorder)
+        return response
+
+    async def __acall__(self, request):
+        with QueryRecorder() as recorder:
+            response = await self.get_response(request)
+        self.check(request, recorder)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = budget_for(view_func, request.method)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = budget_for(view_func, request.method)
+
+    def check(self, request, recorder: QueryRecorder):
+        from .metrics import QUERY_BUDGET_VIOLATIONS, route_name
+
+        problems = []
+        budget = getattr(request, "query_budget", None)
+        if budget is not None and recorder.count > budget:
+            problems.append(f"{recorder.count} queries, budget is {budget}")
+            QUERY_BUDGET_VIOLATIONS.labels(route_name(request), "budget").inc()
+        for sql, n in recorder.duplicates(self.duplicate_threshold).items():
+            problems.append(f"N+1: {n}x {sql[:200]}")
+            QUERY_BUDGET_VIOLATIONS.labels(route_name(request), "n_plus_one").inc()
+        if not problems:
+            return
+        message = (
+            f"{request.method} {request.path}: {'; '.join(problems)} "
+            f"({recorder.duration * 1000:.1f} ms in the database)"
+        )
+        if self.mode == "raise":
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -0,0 +1,210 @@
+"""
+Structured request log: one JSON line per (sampled) request.
+
+`RequestLogMiddleware` logs route, method, status, latency, query count and
+database time, user id and whatever the view added with `annotate()` (e.g. the
+order id) to the `orderflow.requests` logger. Errors (status >= 400) and
+requests slower than `REQUEST_LOG_SLOW_MS` are always logged; successful reads
+only for `REQUEST_LOG_SAMPLE_RATE` of requests.
+
+Records leave the request thread through `QueuedHandler`: the caller only puts
+the record on a bounded queue (dropping it, and counting the drop, when the
+queue is full) and a listener thread per process formats and writes JSON.
+"""
+
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .metrics import LOG_RECORDS_DROPPED, route_name
+
+logger = logging.getLogger("orderflow.requests")
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# LogRecord attributes that aren't `extra=` fields.
+_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None)).keys()
+) | {"message", "asctime", "taskName"}
+
+
+def annotate(request, **fields) -> None:
+    """
+    Add fields to this request's log line (DRF or Django request).
+    """
+    request = getattr(request, "_request", request)
+    if not hasattr(request, "log_fields"):
+        request.log_fields = {}
+    request.log_fields.update(fields)
+
+
+# ---------- output ----------
+class JsonFormatter(logging.Formatter):
+    """
+    {"ts", "level", "logger", "message", **extra}, one object per line.
+    """
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class QueuedHandler(logging.handlers.QueueHandler):
+    """
+    Non-blocking handler: enqueue in the caller, write from a listener thread.
+
+    The listener is started lazily in each process, so it also runs in workers
+    forked after the app was loaded in the master (gunicorn `preload_app`).
+    """
+
+    def __init__(self, stream=None, maxsize: int = 10_000):
+        super().__init__(queue.Queue(maxsize))
+        self.maxsize = maxsize
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.target.setFormatter(JsonFormatter())
+        self.listener = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.Queue(self.maxsize)  # don't inherit a parent's backlog
+            self.listener = logging.handlers.QueueListener(
+                self.queue, self.target, respect_handler_level=True
+            )
+            self.listener.start()
+            self._pid = os.getpid()
+
+    def prepare(self, record):
+        """
+        Like `QueueHandler.prepare` (message merged with its args, no live
+        `exc_info` handed to the listener thread), but the traceback stays in
+        `exc_text`, where `JsonFormatter` puts it in "exc", instead of being
+        folded into the message and dropped.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.target.formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+    def flush(self):
+        """
+        Wait until everything queued so far is written (tests, shutdown).
+        """
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+            self.listener.start()
+        self.target.flush()
+
+    def close(self):
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+            self._pid = None
+        super().close()
+
+
+# ---------- middleware ----------
+class RequestLogMiddleware:
+    """
+    Must sit outside `MetricsMiddleware`, which provides the query counts.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_LOG_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.sample_rate = settings.REQUEST_LOG_SAMPLE_RATE
+        self.slow = settings.REQUEST_LOG_SLOW_MS / 1000
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.log(request, response, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.log(request, response, time.perf_counter() - start)
+        return response
+
+    def sampled(self, request, status: int, elapsed: float) -> bool:
+        if status >= 400 or elapsed >= self.slow:
+            return True
+        if request.method not in SAFE_METHODS:
+            return True
+        return random.random() < self.sample_rate
+
+    def log(self, request, response, elapsed: float) -> None:
+        status = response.status_code
+        if not self.sampled(request, status, elapsed):
+            return
+        user = getattr(request, "user", None)
+        recorder = getattr(request, "query_recorder", None)
+        fields = {
+            "route": route_name(request),
+            "method": request.method,
+            "path": request.path,
+            "status": status,
+            "ms": round(elapsed * 1000, 2),
+            "queries": recorder.count if recorder else None,
+            "db_ms": round(recorder.duration * 1000, 2) if recorder else None,
+            "user_id": (
+                str(user.pk) if user is not None and user.is_authenticated else None
+            ),
+            "request_id": request.headers.get("X-Request-ID"),
+            **getattr(request, "log_fields", {}),
+        }
+        if status >= 500:
+            level = logging.ERROR
+        elif status >= 400:
+            level = logging.WARNING
+        else:
+            level = logging.INFO
+        logger.log(level, "request", extra=fields)
@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.urls import URLPattern
 from rest_framework import routers
 
 
@@ -5,6 +7,26 @@ class ExtendableRouter(routers.DefaultRouter):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.trailing_slash = "/?"
+        self.async_views = {}
 
-    def extend(self, router):
+    def extend(self, router, async_views=None):
+        """
+        `async_views` maps route names to `AsyncAPIView` classes that take over
+        those routes when `settings.ASYNC_VIEWS_ENABLED` (other methods still
+        reach the viewset).
+        """
         self.registry.extend(router.registry)
+        self.async_views.update(async_views or {})
+
+    def get_urls(self):
+        urls = super().get_urls()
+        if not settings.ASYNC_VIEWS_ENABLED:
+            return urls
+        return [self._with_async_view(url) for url in urls]
+
+    def _with_async_view(self, url):
+        view_class = self.async_views.get(url.name)
+        if view_class is None or "format" in url.pattern.regex.groupindex:
+            return url
+        view = view_class.as_view(fallback=url.callback)
+        return URLPattern(url.pattern, view, url.default_args, url.name)
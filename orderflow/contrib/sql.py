@@ -0,0 +1,68 @@
+"""
+Single-statement INSERT helpers the ORM doesn't expose (ON CONFLICT/EXISTS + RETURNING).
+
+Both build the row from the model instance exactly like `Model.save()` would
+(defaults, `auto_now_add`, db prep) and return whether a row was written.
+"""
+
+from django.db import connections, models, router
+
+
+def _insert_parts(obj: models.Model, using: str):
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    meta = obj._meta
+    columns, values = [], []
+    for field in meta.concrete_fields:
+        value = field.pre_save(obj, add=True)
+        columns.append(qn(field.column))
+        values.append(field.get_db_prep_save(value, connection))
+    return connection, qn(meta.db_table), columns, values, qn(meta.pk.column)
+
+
+def insert_ignore_conflicts(obj: models.Model, *, conflict_fields: list[str]) -> bool:
+    """
+    INSERT ... ON CONFLICT (<conflict_fields>) DO NOTHING RETURNING pk.
+    """
+    using = router.db_for_write(type(obj), instance=obj)
+    connection, table, columns, values, pk = _insert_parts(obj, using)
+    conflict = ", ".join(
+        connection.ops.quote_name(obj._meta.get_field(name).column)
+        for name in conflict_fields
+    )
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(values))}) "
+        f"ON CONFLICT ({conflict}) DO NOTHING RETURNING {pk}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, values)
+        inserted = cursor.fetchone() is not None
+    obj._state.adding = not inserted
+    obj._state.db = using if inserted else None
+    return inserted
+
+
+def insert_if_exists(obj: models.Model, *, queryset: models.QuerySet) -> bool:
+    """
+    INSERT ... SELECT <row> WHERE EXISTS (<queryset>) RETURNING pk.
+    """
+    using = router.db_for_write(type(obj), instance=obj)
+    connection, table, columns, values, pk = _insert_parts(obj, using)
+    exists_sql, exists_params = queryset.query.get_compiler(using).as_sql()
+    # Cast every placeholder to its column type: SELECT-list params are untyped.
+    placeholders = [
+        f"CAST(%s AS {field.cast_db_type(connection)})"
+        for field in obj._meta.concrete_fields
+    ]
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"SELECT {', '.join(placeholders)} WHERE EXISTS ({exists_sql}) "
+        f"RETURNING {pk}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*values, *exists_params])
+        inserted = cursor.fetchone() is not None
+    obj._state.adding = not inserted
+    obj._state.db = using if inserted else None
+    return inserted
@@ -0,0 +1,1086 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import runpy
+import time
+import uuid
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import CommandError, call_command
+from django.db import connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import AsyncClient, Client
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from orderflow.contrib import (
+    checks,
+    db_pool,
+    db_routers,
+    devtools,
+    docs,
+    metrics,
+    middleware,
+    profiling,
+    query_budget,
+    request_log,
+    throttling,
+    views,
+)
+from orderflow.contrib.benchmarks import results as bench_results
+from orderflow.contrib.benchmarks import seed as bench_seed
+from orderflow.contrib.models import new_uuid, uuid7
+from orderflow.orders import views as order_views
+from orderflow.orders.filters import OrderFilter
+from orderflow.orders.models import Order
+from orderflow.orders.tests.factories import OrderItemFactory, ProductFactory
+from orderflow.users.tests.factories import UserFactory
+
+factory = APIRequestFactory()
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    throttling._local_cache.clear()
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class View:
+    throttle_scope = "test"
+
+
+def make_throttle(clock, rate="3/minute"):
+    throttle = throttling.SlidingWindowScopedRateThrottle()
+    throttle.THROTTLE_RATES = {"test": rate}
+    throttle.timer = clock
+    return throttle
+
+
+def hit(clock, rate="3/minute", ip="10.0.0.1"):
+    request = factory.get("/", REMOTE_ADDR=ip)
+    request.user = None
+    throttle = make_throttle(clock, rate)
+    return throttle.allow_request(request, View()), throttle
+
+
+class TestSlidingWindowThrottle:
+    def test_allows_up_to_rate_then_rejects(self):
+        clock = Clock(999_980.0)  # 20s into a minute window
+        assert [hit(clock)[0] for _ in range(4)] == [True, True, True, False]
+
+    def test_keys_are_per_client(self):
+        clock = Clock()
+        for _ in range(3):
+            hit(clock)
+        assert hit(clock, ip="10.0.0.2")[0] is True
+
+    def test_previous_window_is_weighted(self):
+        clock = Clock(999_980.0)
+        for _ in range(3):
+            hit(clock)
+        # 45s into the next window: previous window still weighs 25% (0.75 req)
+        clock.now += 85
+        assert [hit(clock)[0] for _ in range(3)] == [True, True, False]
+
+    def test_rejections_are_not_counted_and_wait_is_reported(self):
+        clock = Clock(999_980.0)
+        for _ in range(5):
+            allowed, throttle = hit(clock)
+        assert allowed is False
+        assert throttle.current == 3
+        assert throttle.wait() == pytest.approx(40.0)
+
+    def test_falls_back_to_local_memory(self, monkeypatch):
+        class Broken:
+            def get(self, *args, **kwargs):
+                raise ConnectionError("down")
+
+        monkeypatch.setattr(
+            throttling.SlidingWindowRateThrottle, "get_cache", lambda self: Broken()
+        )
+        clock = Clock()
+        assert [hit(clock)[0] for _ in range(4)] == [True, True, True, False]
+
+
+class TestMobileNumberRateThrottle:
+    def test_limits_per_mobile(self):
+        def allowed(mobile):
+            request = factory.post("/", {"mobile": mobile}, format="json")
+            request.data = {"mobile": mobile}
+            throttle = throttling.MobileNumberRateThrottle()
+            throttle.rate = "2/hour"
+            throttle.num_requests, throttle.duration = 2, 3600
+            return throttle.allow_request(request, None)
+
+        assert [allowed("09121234567") for _ in range(3)] == [True, True, False]
+        assert allowed("09127654321") is True
+
+    def test_otp_step1_endpoint_is_throttled_per_mobile(self, db):
+        client = APIClient()
+        url = "/api/v1/auth/sign-up/mobile/step1/"
+        statuses = [
+            client.post(
+                url, {"mobile": "09121234567"}, format="json", REMOTE_ADDR=f"10.0.0.{n}"
+            ).status_code
+            for n in range(6)
+        ]
+        assert statuses == [200] * 5 + [429]
+
+
+class TestPoolStats:
+    def test_none_without_pool(self):
+        assert db_pool.pool_stats() is None
+
+    @pytest.fixture
+    def pool(self, monkeypatch):
+        class Pool:
+            min_size, max_size = 2, 10
+
+            def get_stats(self):
+                return {
+                    "pool_size": 5,
+                    "pool_available": 1,
+                    "requests_waiting": 3,
+                    "requests_num": 40,
+                    "requests_wait_ms": 120,
+                }
+
+        wrapper = type(connections["default"])
+        monkeypatch.setattr(
+            wrapper,
+            "pool",
+            property(lambda self: Pool() if self.alias == "default" else None),
+        )
+
+    def test_reports_in_use_and_waiting(self, pool):
+        stats = db_pool.pool_stats()
+        assert stats["in_use"] == 4
+        assert stats["waiting"] == 3
+        assert stats["requests_total"] == 40
+        assert stats["wait_ms_total"] == 120
+
+    def test_exported_to_prometheus(self, pool, monkeypatch, tmp_path):
+        labels = {"database": "default", "pid": str(os.getpid())}
+        assert sample("orderflow_db_pool_in_use", **labels) == 4
+        assert sample("orderflow_db_pool_waiting", **labels) == 3
+        assert sample("orderflow_db_pool_requests_total", **labels) == 40
+        assert sample("orderflow_db_pool_wait_seconds_total", **labels) == 0.12
+
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+        body = metrics.render()[0].decode()
+        assert f'orderflow_db_pool_in_use{{database="default",pid="{os.getpid()}"}} 4.0' in body
+
+    def test_endpoint_is_staff_only(self, db):
+        client = APIClient()
+        url = reverse("db-pool-stats")
+        user = UserFactory()
+        client.force_authenticate(user)
+        assert client.get(url).status_code == 403
+
+        user.is_staff = True
+        user.save()
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.json() == {"default": None}
+
+
+class TestReplicaRouter:
+    @pytest.fixture(autouse=True)
+    def replicas(self, settings):
+        settings.DATABASE_REPLICAS = ["replica_1"]
+
+    def test_reads_primary_by_default(self):
+        assert db_routers.ReplicaRouter().db_for_read(None) is None
+
+    def test_reads_replica_inside_use_replica(self):
+        router = db_routers.ReplicaRouter()
+        with db_routers.use_replica() as alias:
+            assert alias == "replica_1"
+            assert router.db_for_read(None) == "replica_1"
+            assert router.db_for_write(None) == "default"
+        assert router.db_for_read(None) is None
+
+    def test_transactions_read_primary(self, db):
+        # pytest-django wraps each test in a transaction on "default".
+        with db_routers.use_replica():
+            assert db_routers.ReplicaRouter().db_for_read(None) is None
+
+    def test_pin_is_per_user(self, settings):
+        settings.DATABASE_REPLICA_PIN_SECONDS = 5
+        db_routers.pin_to_primary(42)
+        assert db_routers.is_pinned_to_primary(42)
+        assert not db_routers.is_pinned_to_primary(43)
+
+    def test_no_replicas_no_routing(self, settings):
+        settings.DATABASE_REPLICAS = []
+        with db_routers.use_replica() as alias:
+            assert alias is None
+        db_routers.pin_to_primary(42)
+        assert not db_routers.is_pinned_to_primary(42)
+
+
+class TestAsyncThrottle:
+    def test_async_and_sync_share_counters(self):
+        clock = Clock(999_980.0)
+        request = factory.get("/", REMOTE_ADDR="10.0.0.1")
+        request.user = None
+
+        async def allowed():
+            return await make_throttle(clock).aallow_request(request, View())
+
+        assert [async_to_sync(allowed)() for _ in range(2)] == [True, True]
+        assert hit(clock)[0] is True
+        assert async_to_sync(allowed)() is False
+        assert hit(clock)[0] is False
+
+
+class TestGunicornConf:
+    path = str(Path(settings.BASE_DIR) / "gunicorn_conf.py")
+
+    @pytest.fixture(autouse=True)
+    def _metrics_dir(self, monkeypatch, tmp_path):
+        self.metrics_dir = tmp_path / "metrics"
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(self.metrics_dir))
+
+    def test_defaults(self, monkeypatch):
+        monkeypatch.delenv("GUNICORN_WORKER_CLASS", raising=False)
+        conf = runpy.run_path(self.path)
+        assert conf["worker_class"] == "gthread"
+        assert conf["wsgi_app"] == "orderflow.wsgi:application"
+        assert conf["preload_app"] is True
+        assert conf["max_requests"] > 0 and conf["max_requests_jitter"] > 0
+
+    def test_uvicorn_worker_serves_asgi_app(self, monkeypatch):
+        monkeypatch.setenv("GUNICORN_WORKER_CLASS", "uvicorn_worker.UvicornWorker")
+        monkeypatch.setenv("GUNICORN_WORKERS", "3")
+        conf = runpy.run_path(self.path)
+        assert conf["wsgi_app"] == "orderflow.asgi:application"
+        assert conf["workers"] == 3
+
+    def test_metrics_dir_is_emptied_once_on_start(self):
+        self.metrics_dir.mkdir()
+        (self.metrics_dir / "counter_123.db").write_bytes(b"live")
+
+        # Loading the config (again, on HUP) keeps the workers' files ...
+        conf = runpy.run_path(self.path)
+        assert any(self.metrics_dir.iterdir())
+        # ... and so does a USR2 re-exec, whose old workers are still running.
+        conf["on_starting"](SimpleNamespace(master_pid=1))
+        assert any(self.metrics_dir.iterdir())
+
+        conf["on_starting"](SimpleNamespace(master_pid=0))
+        assert self.metrics_dir.is_dir() and not any(self.metrics_dir.iterdir())
+
+    def test_master_closes_and_child_forgets_db_connections(self, monkeypatch):
+        raw, pool = Mock(), Mock()
+        connection = SimpleNamespace(
+            alias="default",
+            connection=raw,
+            _connection_pools={"default": pool},
+            close=Mock(),
+            close_pool=Mock(),
+        )
+        monkeypatch.setattr(
+            "django.db.connections.all", lambda initialized_only=False: [connection]
+        )
+        conf = runpy.run_path(self.path)
+
+        conf["pre_fork"](None, None)
+        assert connection.close.called and connection.close_pool.called
+
+        conf["post_fork"](None, None)
+        assert connection.connection is None
+        assert connection._connection_pools == {}
+        assert not raw.close.called and not pool.close.called
+
+
+class TestSchemasFor:
+    def test_disabled_docs_skip_schema_modules(self, settings):
+        settings.API_DOCS_ENABLED = False
+        schemas = docs.schemas_for("orderflow.orders")
+
+        def view():
+            pass
+
+        assert schemas.list_schema(view) is view
+
+    def test_enabled_docs_import_schema_module(self, settings):
+        settings.API_DOCS_ENABLED = True
+        assert (
+            docs.schemas_for("orderflow.orders").__name__ == "orderflow.orders.schemas"
+        )
+
+
+class TestPrebuiltSchema:
+    @pytest.fixture
+    def schema_file(self, tmp_path):
+        path = tmp_path / "openapi.json"
+        call_command("build_openapi_schema", output=str(path))
+        views._load_schema.cache_clear()
+        yield str(path)
+        views._load_schema.cache_clear()
+
+    def get(self, schema_file, **headers):
+        view = views.PrebuiltSchemaView.as_view(schema_file=schema_file)
+        return view(factory.get("/schema/", headers=headers))
+
+    def test_build_writes_openapi_document(self, schema_file):
+        schema = json.loads(Path(schema_file).read_text())
+        assert schema["info"]["version"] == settings.SPECTACULAR_SETTINGS["VERSION"]
+        assert "/api/v1/orders/" in schema["paths"]
+
+    def test_build_requires_docs(self, settings, tmp_path):
+        settings.API_DOCS_ENABLED = False
+        with pytest.raises(CommandError):
+            call_command("build_openapi_schema", output=str(tmp_path / "x.json"))
+
+    def test_serves_file_with_etag_and_revalidates(self, schema_file):
+        response = self.get(schema_file)
+        assert response.status_code == 200
+        assert response.content == Path(schema_file).read_bytes()
+        assert "public" in response["Cache-Control"]
+
+        response = self.get(schema_file, if_none_match=response["ETag"])
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_gzip_when_accepted(self, schema_file):
+        plain = self.get(schema_file)
+        response = self.get(schema_file, accept_encoding="br, gzip")
+        assert response["Content-Encoding"] == "gzip"
+        assert response["Vary"] == "Accept-Encoding"
+        assert response["ETag"] != plain["ETag"]
+        assert gzip.decompress(response.content) == plain.content
+
+
+class TestBrowserOnlyMiddleware:
+    def test_api_requests_skip_browser_middleware(self, db):
+        user = UserFactory(is_staff=True)
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(user)
+        # A session cookie neither authenticates nor CSRF-checks an API request.
+        response = client.post(reverse("v1-orders-list"), {})
+        assert response.status_code == 401
+        assert "X-Frame-Options" not in response
+        assert settings.SESSION_COOKIE_NAME not in response.cookies
+
+    def test_admin_keeps_sessions_and_csrf(self, db):
+        client = Client(enforce_csrf_checks=True)
+        response = client.get("/admin/login/")
+        assert response.status_code == 200
+        assert response["X-Frame-Options"] == "DENY"
+        assert client.post("/admin/login/", {}).status_code == 403
+
+        user = UserFactory(is_staff=True, is_superuser=True)
+        client.force_login(user)
+        assert client.get("/admin/").status_code == 200
+
+    def test_async_stack(self, db):
+        response = async_to_sync(AsyncClient().get)("/admin/login/")
+        assert response.status_code == 200
+        assert settings.CSRF_COOKIE_NAME in response.cookies
+        response = async_to_sync(AsyncClient().get)(reverse("v1-orders-list"))
+        assert response.status_code == 401
+        assert not response.cookies
+
+    def test_check_requires_admin_middleware(self, settings):
+        assert checks.check_browser_middleware(None) == []
+        settings.BROWSER_MIDDLEWARE = [
+            path for path in settings.BROWSER_MIDDLEWARE if "messages" not in path
+        ]
+        assert [e.id for e in checks.check_browser_middleware(None)] == ["contrib.E001"]
+
+    def test_check_replica_pins_need_a_shared_cache(self, settings):
+        settings.DATABASE_REPLICAS = []
+        assert checks.check_replica_pin_cache(None) == []
+        settings.DATABASE_REPLICAS = ["replica_1"]
+        assert [w.id for w in checks.check_replica_pin_cache(None)] == ["contrib.W001"]
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}
+        }
+        assert checks.check_replica_pin_cache(None) == []
+
+
+class TestCompressionMiddleware:
+    body = b'{"results": [' + b",".join([b'{"id": 1, "quantity": 2}'] * 200) + b"]}"
+
+    def respond(self, response, accept_encoding="gzip"):
+        request = factory.get("/api/v1/orders/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        return middleware.CompressionMiddleware(lambda r: response)(request)
+
+    def json(self, body=None):
+        return HttpResponse(body or self.body, content_type="application/json")
+
+    def test_gzips_large_json(self):
+        response = self.respond(self.json())
+        assert response["Content-Encoding"] == "gzip"
+        assert response["Vary"] == "Accept-Encoding"
+        assert int(response["Content-Length"]) == len(response.content)
+        assert gzip.decompress(response.content) == self.body
+
+    def test_prefers_zstd(self):
+        zstandard = pytest.importorskip("zstandard")
+        response = self.respond(self.json(), "gzip, deflate, br, zstd")
+        assert response["Content-Encoding"] == "zstd"
+        assert zstandard.ZstdDecompressor().decompress(response.content) == self.body
+
+    def test_respects_q_zero(self):
+        response = self.respond(self.json(), "gzip;q=0, identity")
+        assert not response.has_header("Content-Encoding")
+        assert response.content == self.body
+
+    def test_skips_small_and_non_api_responses(self):
+        assert not self.respond(self.json(b"{}")).has_header("Content-Encoding")
+        html = HttpResponse(self.body, content_type="text/html")
+        assert not self.respond(html).has_header("Content-Encoding")
+
+    def test_weakens_etag(self):
+        response = self.json()
+        response["ETag"] = '"abc"'
+        assert self.respond(response)["ETag"] == 'W/"abc"'
+
+    def test_streams_chunk_by_chunk(self):
+        rows = [b'{"id": %d}\n' % i for i in range(100)]
+        response = self.respond(
+            StreamingHttpResponse(iter(rows), content_type="application/x-ndjson")
+        )
+        assert response["Content-Encoding"] == "gzip"
+        chunks = list(response.streaming_content)
+        assert len(chunks) == len(rows) + 1
+        assert gzip.decompress(b"".join(chunks)) == b"".join(rows)
+
+    def test_streams_async_content(self):
+        rows = [b"id,total\n", b"1,9.99\n", b"2,19.98\n"]
+
+        async def stream():
+            for row in rows:
+                yield row
+
+        response = self.respond(
+            StreamingHttpResponse(stream(), content_type="text/csv; charset=utf-8")
+        )
+
+        async def consume():
+            return [chunk async for chunk in response.streaming_content]
+
+        assert gzip.decompress(b"".join(async_to_sync(consume)())) == b"".join(rows)
+
+    def test_order_list_is_compressed(self, db):
+        user = UserFactory()
+        OrderItemFactory.create_batch(10, order__customer=user)
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(reverse("v1-orders-list"), HTTP_ACCEPT_ENCODING="gzip")
+        assert response["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(response.content))["count"] == 10
+
+
+class TestQueryBudget:
+    def make(self, view):
+        mw = query_budget.QueryBudgetMiddleware(view)
+
+        def call(request):
+            mw.process_view(request, view, (), {})
+            return mw(request)
+
+        return call
+
+    def test_fingerprint_ignores_literals_and_in_list_length(self):
+        a = 'SELECT * FROM "t" WHERE "id" IN (%s, %s) AND "n" = 3 LIMIT 21'
+        b = 'SELECT *  FROM "t" WHERE "id" IN (%s) AND "n" = \'x\' LIMIT 21'
+        assert query_budget.fingerprint(a) == query_budget.fingerprint(b)
+
+    def test_recorder_counts_and_finds_duplicates(self, db):
+        users = UserFactory.create_batch(3)
+        with query_budget.QueryRecorder() as recorder:
+            for user in users:
+                type(user).objects.get(pk=user.pk)
+        assert recorder.count == 3
+        assert list(recorder.duplicates().values()) == [3]
+        assert recorder.duration > 0
+
+    def test_budget_for_viewset_actions(self):
+        view = order_views.OrderViewSetV1.as_view({"get": "list", "post": "create"})
+        budgets = order_views.OrderViewSetV1.query_budgets
+        assert query_budget.budget_for(view, "GET") == budgets["list"]
+        assert query_budget.budget_for(view, "POST") == budgets["create"]
+
+    def test_over_budget_raises(self, db):
+        def view(request):
+            list(UserFactory._meta.model.objects.all())
+            list(UserFactory._meta.model.objects.all())
+            return HttpResponse()
+
+        view.query_budget = 1
+        # tests run in "raise" mode (orderflow.contrib.pytest_plugin)
+        with pytest.raises(query_budget.QueryBudgetExceeded, match="2 queries"):
+            self.make(view)(factory.get("/"))
+
+    def test_n_plus_one_is_logged_in_warn_mode(self, db, caplog, settings):
+        settings.QUERY_BUDGET_MODE = "warn"
+        users = UserFactory.create_batch(3)
+
+        def view(request):
+            for user in users:
+                type(user).objects.get(pk=user.pk)
+            return HttpResponse()
+
+        response = self.make(view)(factory.get("/"))
+        assert response.status_code == 200
+        assert "N+1: 3x" in caplog.text
+
+    def async_get(self, user, name):
+        # AsyncClient turns extra kwargs into ASGI headers (HTTP_ would be doubled).
+        bearer = {"authorization": f"Bearer {AccessToken.for_user(user)}"}
+        return async_to_sync(AsyncClient().get)(reverse(name), **bearer)
+
+    def test_async_requests_are_recorded(self, db, monkeypatch):
+        # Under ASGI the ORM runs on another thread than the middleware.
+        user = UserFactory()
+        OrderItemFactory(order__customer=user)
+        counts = []
+        monkeypatch.setattr(
+            query_budget.QueryBudgetMiddleware,
+            "check",
+            lambda self, request, recorder: counts.append(recorder.count),
+        )
+
+        assert self.async_get(user, "v1-orders-list").status_code == 200
+        assert counts and counts[0] > 0
+
+    def test_async_request_over_budget_raises(self, db, monkeypatch):
+        monkeypatch.setitem(order_views.OrderViewSetV1.query_budgets, "list", 0)
+
+        with pytest.raises(query_budget.QueryBudgetExceeded, match="budget is 0"):
+            self.async_get(UserFactory(), "v1-orders-list")
+
+    def test_off_removes_middleware(self, settings):
+        settings.QUERY_BUDGET_MODE = "off"
+        with pytest.raises(MiddlewareNotUsed):
+            query_budget.QueryBudgetMiddleware(lambda request: None)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestMetrics:
+    def test_middleware_records_route_status_and_queries(self, db):
+        user = UserFactory()
+        OrderItemFactory.create_batch(2, order__customer=user)
+        client = APIClient()
+        client.force_authenticate(user)
+        labels = {"route": "v1-orders-list", "method": "GET"}
+        before = {
+            "requests": sample("orderflow_http_requests_total", status="200", **labels),
+            "queries": sample("orderflow_http_db_queries_sum", **labels),
+            "observed": sample(
+                "orderflow_http_request_duration_seconds_count", **labels
+            ),
+        }
+        assert client.get(reverse("v1-orders-list")).status_code == 200
+        assert (
+            sample("orderflow_http_requests_total", status="200", **labels)
+            == before["requests"] + 1
+        )
+        assert sample("orderflow_http_db_queries_sum", **labels) > before["queries"]
+        assert (
+            sample("orderflow_http_request_duration_seconds_count", **labels)
+            == before["observed"] + 1
+        )
+
+    def test_async_requests_record_db_queries_and_time(self, db):
+        user = UserFactory()
+        OrderItemFactory(order__customer=user)
+        labels = {"route": "v1-orders-list", "method": "GET"}
+        before = {
+            "queries": sample("orderflow_http_db_queries_sum", **labels),
+            "seconds": sample("orderflow_http_db_duration_seconds_sum", **labels),
+        }
+        bearer = {"authorization": f"Bearer {AccessToken.for_user(user)}"}
+
+        response = async_to_sync(AsyncClient().get)(reverse("v1-orders-list"), **bearer)
+
+        assert response.status_code == 200
+        assert sample("orderflow_http_db_queries_sum", **labels) > before["queries"]
+        assert (
+            sample("orderflow_http_db_duration_seconds_sum", **labels)
+            > before["seconds"]
+        )
+
+    def test_unmatched_paths_share_one_label(self, db):
+        labels = {"route": "unmatched", "method": "GET", "status": "404"}
+        before = sample("orderflow_http_requests_total", **labels)
+        Client().get("/no/such/path/")
+        Client().get("/another/missing/path/")
+        assert sample("orderflow_http_requests_total", **labels) == before + 2
+
+    def test_unknown_methods_share_one_label(self, db):
+        labels = {"route": "unmatched", "status": "404"}
+        before = sample("orderflow_http_requests_total", method="OTHER", **labels)
+        Client().generic("FOO", "/no/such/path/")
+        Client().generic("BAR", "/no/such/path/")
+        assert (
+            sample("orderflow_http_requests_total", method="OTHER", **labels)
+            == before + 2
+        )
+        assert not sample("orderflow_http_requests_total", method="FOO", **labels)
+
+    def test_timed(self):
+        @metrics.timed("test_service")
+        def service():
+            return 42
+
+        before = sample(
+            "orderflow_service_duration_seconds_count", service="test_service"
+        )
+        assert service() == 42
+        assert (
+            sample("orderflow_service_duration_seconds_count", service="test_service")
+            == before + 1
+        )
+
+    def test_throttle_rejections_are_counted(self):
+        before = sample("orderflow_throttle_rejections_total", scope="test")
+        clock = Clock()
+        for _ in range(5):
+            hit(clock)
+        assert sample("orderflow_throttle_rejections_total", scope="test") == before + 2
+
+    def test_query_budget_violations_are_counted(self, db, settings):
+        settings.QUERY_BUDGET_MODE = "warn"
+
+        def view(request):
+            list(UserFactory._meta.model.objects.all())
+            list(UserFactory._meta.model.objects.all())
+            return HttpResponse()
+
+        view.query_budget = 1
+        labels = {"route": "unmatched", "kind": "budget"}
+        before = sample("orderflow_query_budget_violations_total", **labels)
+        TestQueryBudget().make(view)(factory.get("/"))
+        assert sample("orderflow_query_budget_violations_total", **labels) == before + 1
+
+    def test_endpoint_requires_token(self, settings):
+        settings.METRICS_TOKEN = "s3cret"
+        client, url = Client(), reverse("metrics")
+        assert client.get(url).status_code == 401
+        assert (
+            client.get(url, headers={"authorization": "Bearer nope"}).status_code == 401
+        )
+        response = client.get(url, headers={"authorization": "Bearer s3cret"})
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain; version=")
+        assert b"# TYPE orderflow_http_requests_total counter" in response.content
+
+    def test_endpoint_hidden_without_token_unless_debug(self, settings):
+        settings.METRICS_TOKEN = None
+        settings.DEBUG = False
+        assert Client().get(reverse("metrics")).status_code == 404
+        settings.DEBUG = True
+        assert Client().get(reverse("metrics")).status_code == 200
+
+    def test_disabled(self, settings):
+        settings.METRICS_ENABLED = False
+        with pytest.raises(MiddlewareNotUsed):
+            metrics.MetricsMiddleware(lambda request: None)
+
+
+class TestBenchmarks:
+    def report(self, **results):
+        return {
+            "results": {
+                name: dict(zip(("p50_ms", "p95_ms", "p99_ms", "rps"), r))
+                for name, r in results.items()
+            }
+        }
+
+    def test_compare_flags_gated_regressions(self):
+        baseline = self.report(list=(10, 20, 30, 100), create=(10, 20, 30, 100))
+        current = self.report(list=(10.5, 25, 60, 100), create=(9, 18, 27, 80))
+        changes = {
+            (c.scenario, c.metric): c
+            for c in bench_results.compare(current, baseline, tolerance=10)
+        }
+        assert changes["list", "p95_ms"].pct == 25.0
+        assert changes["list", "p95_ms"].regressed
+        assert not changes["list", "p50_ms"].regressed
+        assert not changes["list", "p99_ms"].regressed  # reported, not gated
+        assert (
+            changes["create", "rps"].pct == 20.0 and changes["create", "rps"].regressed
+        )
+        assert not changes["create", "p50_ms"].regressed
+
+    def test_bench_api_seeds_runs_and_compares(self, db, tmp_path, settings):
+        # simplejwt's refresh (with rotation + blacklist) loads the user 3 times
+        settings.QUERY_BUDGET_MODE = "warn"
+        baseline, output = tmp_path / "baseline.json", tmp_path / "run.json"
+        volumes = {"users": 2, "products": 4, "orders": 6, "lines": 2}
+        call_command(
+            "bench_api",
+            **volumes,
+            requests=2,
+            warmup=0,
+            output=output,
+            baseline=baseline,
+            save_baseline=True,
+            stdout=StringIO(),
+        )
+        report = json.loads(output.read_text())
+        assert report["parameters"] == {
+            **volumes,
+            "seed": 0,
+            "requests": 2,
+            "warmup": 0,
+        }
+        filters = [f"orders.list[{name}]" for name in OrderFilter.base_filters]
+        assert set(report["results"]) == {
+            "orders.list",
+            *filters,
+            "orders.retrieve",
+            "orders.update",
+            "orders.create",
+            "auth.sign_in",
+            "auth.refresh",
+        }
+        assert all(r["errors"] == 0 for r in report["results"].values())
+        assert json.loads(baseline.read_text())["results"] == report["results"]
+        # seeded and created rows are removed afterwards
+        assert not UserFactory._meta.model.objects.filter(
+            username__startswith=bench_seed.USERNAME_PREFIX
+        ).exists()
+
+        stdout = StringIO()
+        call_command(
+            "bench_api",
+            **volumes,
+            requests=2,
+            warmup=0,
+            scenario=["orders.retrieve"],
+            output=output,
+            baseline=baseline,
+            stdout=stdout,
+        )
+        assert "orders.retrieve              p95_ms" in stdout.getvalue()
+
+    def test_seed_is_reproducible(self, db):
+        volumes = bench_seed.Volumes(users=2, products=5, orders=4, lines=3)
+
+        def shape():
+            dataset = bench_seed.seed(volumes, seed=7)
+            return sorted(
+                Order.objects.filter(customer=dataset.user).values_list(
+                    "total_price", flat=True
+                )
+            )
+
+        assert shape() == shape()
+
+
+class TestUUIDKeys:
+    def test_uuid7_is_time_ordered(self):
+        ids = [uuid7() for _ in range(1000)]
+
+        assert {(u.version, u.variant) for u in ids} == {(7, uuid.RFC_4122)}
+        assert all(a < b for a, b in zip(ids, ids[1:]))  # strictly, within a process
+        ms = int.from_bytes(ids[0].bytes[:6], "big")
+        assert abs(ms - time.time() * 1000) < 60_000
+
+    def test_uuid7_stays_ordered_when_the_clock_stalls(self, monkeypatch):
+        monkeypatch.setattr(time, "time_ns", lambda: 1_700_000_000_123_456_789)
+        monkeypatch.setattr("orderflow.contrib.models._last", 0)
+        first, *rest = [uuid7() for _ in range(5000)]  # more than 4096 per slot
+
+        ids = [first, *rest]
+        assert all(a < b for a, b in zip(ids, ids[1:]))
+        assert {u.version for u in ids} == {7}
+        assert int.from_bytes(first.bytes[:6], "big") == 1_700_000_000_123
+
+    def test_new_rows_follow_the_setting(self, db, settings):
+        assert ProductFactory().pk.version == 7
+        settings.UUID_PK_VERSION = 4
+        assert new_uuid().version == 4 and ProductFactory().pk.version == 4
+
+    def test_bench_uuid_keys(self, db):
+        if connections["default"].vendor != "postgresql":
+            pytest.skip("benchmarks PostgreSQL tables")
+        out = StringIO()
+
+        call_command("bench_uuid_keys", rows=50, batch_size=20, customers=5, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        assert [line.split()[0] for line in lines[2:4]] == ["v4", "v7"]
+        with connections["default"].cursor() as cursor:
+            cursor.execute("SELECT to_regclass('bench_uuid7_order')")
+            assert cursor.fetchone() == (None,)
+
+
+class TestProfiling:
+    @pytest.fixture(autouse=True)
+    def _profiling(self, settings, tmp_path):
+        settings.PROFILING_ENABLED = True
+        settings.PROFILING_DIR = str(tmp_path / "profiles")
+        settings.PROFILING_MAX_PROFILES = 3
+
+    def view(self, request):
+        list(UserFactory._meta.model.objects.filter(username__startswith="0912"))
+        return HttpResponse("ok")
+
+    def test_disabled(self, settings):
+        settings.PROFILING_ENABLED = False
+        with pytest.raises(MiddlewareNotUsed):
+            profiling.ProfilingMiddleware(self.view)
+
+    def test_token(self, settings):
+        token = profiling.make_token("admin")
+        assert profiling.check_token(token) == "admin"
+        assert profiling.check_token(token[:-1] + "x") is None
+        settings.PROFILING_TOKEN_MAX_AGE = -1
+        assert profiling.check_token(token) is None
+
+    def test_unprofiled_request_passes_through(self, db):
+        response = profiling.ProfilingMiddleware(self.view)(factory.get("/"))
+        assert "X-Profile-Id" not in response
+        assert profiling.list_profiles() == []
+
+    def test_signed_header_records_profile(self, db):
+        UserFactory()
+        request = factory.get(
+            "/api/v1/orders/?page=2",
+            HTTP_X_PROFILE=profiling.make_token("admin"),
+        )
+        response = profiling.ProfilingMiddleware(self.view)(request)
+        record = profiling.load_profile(response["X-Profile-Id"])
+        assert record["path"] == "/api/v1/orders/?page=2"
+        assert record["reason"] == "header (admin)"
+        assert record["queries"] == 1
+        assert record["statements"][0]["params"] == ["0912%"]
+        assert "Scan" in record["plans"][0]["plan"]
+        assert "view" in record["stats"]["cumulative"]
+
+    def test_async_request_captures_sql(self, db):
+        user = UserFactory()
+        OrderItemFactory(order__customer=user)
+        headers = {
+            "authorization": f"Bearer {AccessToken.for_user(user)}",
+            "x-profile": profiling.make_token("admin"),
+        }
+
+        response = async_to_sync(AsyncClient().get)(reverse("v1-orders-list"), **headers)
+
+        record = profiling.load_profile(response["X-Profile-Id"])
+        assert record["queries"] > 0
+        assert any("orders_order" in s["sql"] for s in record["statements"])
+        assert record["plans"]
+
+    def test_one_request_is_profiled_at_a_time(self, db):
+        async def view(request):
+            await asyncio.sleep(0.01)  # the other request arrives meanwhile
+            return HttpResponse("ok")
+
+        mw = profiling.ProfilingMiddleware(view)
+        token = profiling.make_token("admin")
+
+        async def requests(n):
+            return await asyncio.gather(
+                *(mw(factory.get("/", HTTP_X_PROFILE=token)) for _ in range(n))
+            )
+
+        responses = async_to_sync(requests)(2)
+        assert sorted("X-Profile-Id" in r for r in responses) == [False, True]
+        assert all(r.status_code == 200 for r in responses)
+        assert "X-Profile-Id" in async_to_sync(requests)(1)[0]  # released
+        assert len(profiling.list_profiles()) == 2
+
+    def test_bad_header_is_ignored(self, db):
+        request = factory.get("/", HTTP_X_PROFILE="forged")
+        response = profiling.ProfilingMiddleware(self.view)(request)
+        assert "X-Profile-Id" not in response
+
+    def test_ring_buffer_keeps_newest(self, db):
+        mw = profiling.ProfilingMiddleware(self.view)
+        token = profiling.make_token("admin")
+        ids = [
+            mw(factory.get("/", HTTP_X_PROFILE=token))["X-Profile-Id"] for _ in range(5)
+        ]
+        assert profiling.list_profiles() == ids[:1:-1]
+
+    def test_admin_toggle_profiles_a_users_api_requests(self, db):
+        user, other = UserFactory(), UserFactory()
+        profiling.profile_user(user.pk, 60)
+        url = reverse("v1-orders-list")
+
+        def get(who):
+            token = AccessToken.for_user(who)
+            return Client().get(url, headers={"authorization": f"Bearer {token}"})
+
+        assert "X-Profile-Id" not in get(other)
+        record = profiling.load_profile(get(user)["X-Profile-Id"])
+        assert record["reason"] == "user" and record["user"] == str(user.pk)
+
+        profiling.stop_profiling_user(user.pk)
+        assert profiling.profiled_users() == {}
+
+    def test_admin_pages_are_superuser_only(self, db):
+        mw = profiling.ProfilingMiddleware(self.view)
+        profile_id = mw(factory.get("/", HTTP_X_PROFILE=profiling.make_token("a")))[
+            "X-Profile-Id"
+        ]
+        client = Client()
+        client.force_login(UserFactory(is_staff=True))
+        assert client.get(reverse("profiles")).status_code == 403
+
+        client.force_login(UserFactory(is_staff=True, is_superuser=True))
+        response = client.get(reverse("profiles"))
+        assert response.status_code == 200
+        assert profile_id.encode() in response.content
+        response = client.get(reverse("profile-detail", args=[profile_id]))
+        assert response.status_code == 200
+        assert b"Slowest SELECTs" in response.content
+        assert client.get(reverse("profile-detail", args=["..%2Fx"])).status_code == 404
+
+
+class TestRequestLog:
+    @pytest.fixture(autouse=True)
+    def _caplog(self, caplog, settings):
+        settings.REQUEST_LOG_SAMPLE_RATE = 0.0
+        caplog.set_level(logging.INFO, logger="orderflow.requests")
+        self.caplog = caplog
+
+    def lines(self):
+        return [r for r in self.caplog.records if r.name == "orderflow.requests"]
+
+    def test_order_reads_and_writes(self, db, settings):
+        user = UserFactory()
+        order = OrderItemFactory(order__customer=user).order
+        client = APIClient()
+        client.force_authenticate(user)
+
+        client.get(reverse("v1-orders-list"))
+        assert self.lines() == []  # successful reads are sampled (rate 0 here)
+
+        settings.REQUEST_LOG_SAMPLE_RATE = 1.0
+        client = APIClient()  # middleware reads settings when the handler loads
+        client.force_authenticate(user)
+        client.get(reverse("v1-orders-detail", args=[order.pk]))
+        (line,) = self.lines()
+        assert line.route == "v1-orders-detail" and line.status == 200
+        assert line.order_id == str(order.pk) and line.user_id == str(user.pk)
+        assert line.queries > 0 and line.ms > 0
+
+    def test_writes_and_errors_are_always_logged(self, db):
+        user = UserFactory()
+        product = ProductFactory()
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post(
+            reverse("v1-orders-list"),
+            {"items": [{"product": str(product.pk), "quantity": 1}]},
+            format="json",
+        )
+        client.get("/api/v1/orders/not-an-order/", HTTP_X_REQUEST_ID="req-1")
+        created, missing = self.lines()
+        assert created.status == 201 and created.order_id == response.json()["id"]
+        assert created.levelno == logging.INFO
+        assert missing.status == 404 and missing.levelno == logging.WARNING
+        assert missing.request_id == "req-1"
+
+    def test_slow_reads_are_always_logged(self, settings):
+        settings.REQUEST_LOG_SLOW_MS = 0
+        request_log.RequestLogMiddleware(lambda request: HttpResponse())(
+            factory.get("/")
+        )
+        assert self.lines()[0].route == "unmatched"
+
+    def test_disabled(self, settings):
+        settings.REQUEST_LOG_ENABLED = False
+        with pytest.raises(MiddlewareNotUsed):
+            request_log.RequestLogMiddleware(lambda request: None)
+
+    def test_queued_handler_writes_json_lines(self):
+        stream = StringIO()
+        handler = request_log.QueuedHandler(stream)
+        log = logging.getLogger("orderflow.tests.request_log")
+        log.addHandler(handler)
+        try:
+            log.warning("hello %s", "there", extra={"route": "x", "ms": 1.5})
+            handler.flush()
+        finally:
+            log.removeHandler(handler)
+            handler.close()
+        entry = json.loads(stream.getvalue())
+        assert entry["message"] == "hello there" and entry["level"] == "WARNING"
+        assert entry["route"] == "x" and entry["ms"] == 1.5
+
+    def test_queued_handler_keeps_tracebacks(self):
+        stream = StringIO()
+        handler = request_log.QueuedHandler(stream)
+        log = logging.getLogger("orderflow.tests.request_log")
+        log.addHandler(handler)
+        try:
+            try:
+                1 / 0
+            except ZeroDivisionError:
+                log.exception("failed %s", "badly")
+            handler.flush()
+        finally:
+            log.removeHandler(handler)
+            handler.close()
+        entry = json.loads(stream.getvalue())
+        assert entry["message"] == "failed badly"
+        assert entry["exc"].startswith("Traceback") and "ZeroDivisionError" in entry["exc"]
+
+    def test_async_requests_log_queries(self, db, settings):
+        settings.REQUEST_LOG_SAMPLE_RATE = 1.0
+        user = UserFactory()
+        OrderItemFactory(order__customer=user)
+        bearer = {"authorization": f"Bearer {AccessToken.for_user(user)}"}
+
+        async_to_sync(AsyncClient().get)(reverse("v1-orders-list"), **bearer)
+
+        (line,) = self.lines()
+        assert line.status == 200 and line.queries > 0 and line.db_ms > 0
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = request_log.QueuedHandler(StringIO(), maxsize=1)
+        handler._pid = os.getpid()  # as if the listener ran, but nothing drains
+        record = logging.LogRecord("x", logging.INFO, "", 0, "m", None, None)
+        before = sample("orderflow_log_records_dropped_total")
+        handler.emit(record)
+        handler.emit(record)
+        assert sample("orderflow_log_records_dropped_total") == before + 1
+
+
+class TestShowToolbar:
+    def test_internal_and_docker_gateway_addresses(self, settings, monkeypatch):
+        settings.DEBUG = True
+        settings.INTERNAL_IPS = ["127.0.0.1"]
+        monkeypatch.setattr(devtools, "_docker_gateway_ips", lambda: ("172.18.0.1",))
+
+        def shown(addr):
+            return devtools.show_toolbar(factory.get("/", REMOTE_ADDR=addr))
+
+        assert shown("127.0.0.1") and shown("172.18.0.1")
+        assert not shown("10.0.0.9")
+        settings.DEBUG = False
+        assert not shown("127.0.0.1")
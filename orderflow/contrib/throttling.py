@@ -0,0 +1,164 @@
+"""
+Sliding-window counter throttles.
+
+DRF's `SimpleRateThrottle` keeps a list of timestamps per key and rewrites it on
+every request. These throttles keep two integer counters per key instead (the
+current and the previous fixed window) and estimate the sliding-window count as
+
+    previous * (1 - elapsed / duration) + current
+
+Each check is one GET and one atomic INCR, so memory and time are O(1) per key
+and counts stay consistent across workers when `THROTTLE_CACHE_ALIAS` points at a
+shared cache. If that cache is unreachable we fall back to per-process memory.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.throttling import ScopedRateThrottle, SimpleRateThrottle
+
+from .metrics import THROTTLE_REJECTIONS
+
+logger = logging.getLogger(__name__)
+
+_local_cache = LocMemCache("orderflow-throttling", {})
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    def get_cache(self):
+        return caches[settings.THROTTLE_CACHE_ALIAS]
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self._start_window()
+        try:
+            self.cache = self.get_cache()
+            self.previous, self.current = self._hit()
+        except Exception as e:  # shared store down: degrade to local limits
+            logger.warning("throttle cache unavailable, using local memory: %s", e)
+            self.cache = _local_cache
+            self.previous, self.current = self._hit()
+
+        if self._exceeded():
+            return self.throttle_failure()
+        return True
+
+    async def aallow_request(self, request, view):
+        """
+        `allow_request` for async views, using the cache's async API.
+        """
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self._start_window()
+        try:
+            self.cache = self.get_cache()
+            self.previous, self.current = await self._ahit()
+        except Exception as e:
+            logger.warning("throttle cache unavailable, using local memory: %s", e)
+            self.cache = _local_cache
+            self.previous, self.current = self._hit()
+
+        if self._exceeded():
+            THROTTLE_REJECTIONS.labels(self.scope).inc()
+            try:
+                await self.cache.adecr(self._window_key(self.window))
+                self.current -= 1
+            except Exception:
+                pass
+            return False
+        return True
+
+    def _start_window(self):
+        self.now = self.timer()
+        window, self.elapsed = divmod(self.now, self.duration)
+        self.window = int(window)
+
+    def _exceeded(self) -> bool:
+        weight = 1 - self.elapsed / self.duration
+        return self.previous * weight + self.current > self.num_requests
+
+    def _window_key(self, window: int) -> str:
+        return f"{self.key}:{window}"
+
+    def _hit(self) -> tuple[int, int]:
+        previous = self.cache.get(self._window_key(self.window - 1), 0)
+        current_key = self._window_key(self.window)
+        try:
+            current = self.cache.incr(current_key)
+        except ValueError:  # first hit in this window
+            if self.cache.add(current_key, 1, timeout=self.duration * 2):
+                current = 1
+            else:
+                current = self.cache.incr(current_key)
+        return previous, current
+
+    async def _ahit(self) -> tuple[int, int]:
+        previous = await self.cache.aget(self._window_key(self.window - 1), 0)
+        current_key = self._window_key(self.window)
+        try:
+            current = await self.cache.aincr(current_key)
+        except ValueError:
+            if await self.cache.aadd(current_key, 1, timeout=self.duration * 2):
+                current = 1
+            else:
+                current = await self.cache.aincr(current_key)
+        return previous, current
+
+    def throttle_failure(self):
+        THROTTLE_REJECTIONS.labels(self.scope).inc()
+        # Rejected requests don't count against the client.
+        try:
+            self.cache.decr(self._window_key(self.window))
+            self.current -= 1
+        except Exception:
+            pass
+        return False
+
+    def wait(self):
+        if self.current >= self.num_requests or not self.previous:
+            return self.duration - self.elapsed
+        # Time until the previous window's weight decays below the free capacity.
+        free = self.num_requests - self.current
+        return max(self.duration * (1 - free / self.previous) - self.elapsed, 0.0)
+
+
+class SlidingWindowScopedRateThrottle(ScopedRateThrottle, SlidingWindowRateThrottle):
+    """
+    Drop-in replacement for DRF's `ScopedRateThrottle` (uses `view.throttle_scope`).
+    """
+
+    async def aallow_request(self, request, view):
+        # Same scope resolution as ScopedRateThrottle.allow_request.
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return await SlidingWindowRateThrottle.aallow_request(self, request, view)
+
+
+class MobileNumberRateThrottle(SlidingWindowRateThrottle):
+    """
+    Limits OTP requests per target mobile number, whoever sends them.
+    """
+
+    scope = "otp_mobile"
+
+    def get_cache_key(self, request, view):
+        mobile = request.data.get("mobile") if hasattr(request.data, "get") else None
+        if not mobile:
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": str(mobile)[:32]}
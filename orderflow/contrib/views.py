@@ -1,7 +1,22 @@
-from functools import wraps
+import gzip
+import hashlib
+import hmac
+import re
+from functools import lru_cache, wraps
 
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from django.views import View
 from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .db_pool import pool_stats
+from .db_routers import is_pinned_to_primary, pin_to_primary, use_replica
+from .metrics import render as render_metrics
 
 
 def regular_post_action(func):
@@ -29,3 +44,135 @@ def regular_detailed_post_action(func):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     return func_wrapper
+
+
+class DatabasePoolStatsView(APIView):
+    """
+    Staff-only snapshot of the serving process's connection pool(s), for
+    debugging; scrapers read them from the `orderflow_db_pool_*` metrics.
+    """
+
+    permission_classes = (IsAdminUser,)
+    schema = None
+
+    def get(self, request):
+        data = {alias: pool_stats(alias) for alias in settings.DATABASES}
+        return Response(data, status=status.HTTP_200_OK)
+
+
+@lru_cache(maxsize=None)
+def _load_schema(path: str) -> dict[str, tuple[bytes, str]]:
+    """
+    {content coding: (body, ETag)}; each representation gets its own strong ETag.
+    """
+    with open(path, "rb") as f:
+        body = f.read()
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    return {
+        "identity": (body, f'"{digest}"'),
+        "gzip": (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gzip"'),
+    }
+
+
+class PrebuiltSchemaView(View):
+    """
+    Serve the OpenAPI document written by `build_openapi_schema`.
+
+    The file is read and gzipped once per process; clients revalidate with
+    `If-None-Match`, and the ETag only changes when a deploy ships a new schema.
+    """
+
+    schema_file: str = ""
+    content_type = "application/vnd.oai.openapi+json"
+    max_age = 300
+    accepts_gzip_re = re.compile(r"\bgzip\b")
+
+    def get(self, request):
+        coding = "identity"
+        if self.accepts_gzip_re.search(request.headers.get("Accept-Encoding", "")):
+            coding = "gzip"
+        body, etag = _load_schema(self.schema_file)[coding]
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type=self.content_type)
+            if coding != "identity":
+                response["Content-Encoding"] = coding
+        response["ETag"] = etag
+        patch_vary_headers(response, ("Accept-Encoding",))
+        patch_cache_control(response, public=True, max_age=self.max_age)
+        return response
+
+
+class MetricsView(View):
+    """
+    Prometheus exposition for the scraper.
+
+    Guarded by `METRICS_TOKEN` (`Authorization: Bearer <token>`); without a token
+    the endpoint only exists when DEBUG is on. No session or database access.
+    """
+
+    def get(self, request):
+        token = settings.METRICS_TOKEN
+        if not token:
+            if not settings.DEBUG:
+                raise Http404
+        else:
+            scheme, _, supplied = request.headers.get("Authorization", "").partition(
+                " "
+            )
+            if scheme.lower() != "bearer" or not hmac.compare_digest(
+                supplied.encode(), token.encode()
+            ):
+                response = HttpResponse(status=401)
+                response["WWW-Authenticate"] = 'Bearer realm="metrics"'
+                return response
+        body, content_type = render_metrics()
+        response = HttpResponse(body, content_type=content_type)
+        patch_cache_control(response, no_store=True)
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe-method requests (and `replica_actions`) from a read replica.
+
+    Routing starts after authentication and permission checks, so those read
+    the primary. Successful writes pin the user to the primary for a short while.
+    """
+
+    replica_actions: tuple[str, ...] = ()
+
+    def reads_from_replica(self, request) -> bool:
+        if not settings.DATABASE_REPLICAS:
+            return False
+        if (
+            request.method not in SAFE_METHODS
+            and self.action not in self.replica_actions
+        ):
+            return False
+        user = request.user
+        return not (user.is_authenticated and is_pinned_to_primary(user.pk))
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.reads_from_replica(request):
+            self._replica = use_replica()
+            self._replica.__enter__()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        replica = getattr(self, "_replica", None)
+        if replica is not None:
+            self._replica = None
+            replica.__exit__(None, None, None)
+        user = getattr(request, "user", None)
+        if (
+            request.method not in SAFE_METHODS
+            and self.action not in self.replica_actions
+            and response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+        ):
+            pin_to_primary(user.pk)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,119 @@
+"""
+Gunicorn configuration: `gunicorn -c orderflow/gunicorn_conf.py`.
+
+Every knob is read from the environment (GUNICORN_*). Worker classes:
+  - gthread (default): WSGI, `GUNICORN_THREADS` threads per process, each thread
+    keeps its own persistent DB connection.
+  - sync: WSGI, one request per process at a time.
+  - uvicorn_worker.UvicornWorker: ASGI (`orderflow.asgi`), native async order reads
+    and a shared connection pool per process.
+"""
+
+import gc
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+import environ
+
+env = environ.Env()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "orderflow.settings.production")
+
+ASGI_WORKERS = ("uvicorn_worker.UvicornWorker", "uvicorn.workers.UvicornWorker")
+
+# ---------- server socket ----------
+bind = env("GUNICORN_BIND", default="0.0.0.0:8000")
+backlog = env.int("GUNICORN_BACKLOG", default=2048)
+
+# ---------- worker processes ----------
+worker_class = env("GUNICORN_WORKER_CLASS", default="gthread")
+if worker_class in ASGI_WORKERS:
+    wsgi_app = "orderflow.asgi:application"
+else:
+    wsgi_app = "orderflow.wsgi:application"
+workers = env.int("GUNICORN_WORKERS", default=multiprocessing.cpu_count() * 2 + 1)
+threads = env.int("GUNICORN_THREADS", default=4)  # gthread only
+
+# Recycle workers to bound slow memory growth; jitter avoids restarting all at once.
+max_requests = env.int("GUNICORN_MAX_REQUESTS", default=1000)
+max_requests_jitter = env.int("GUNICORN_MAX_REQUESTS_JITTER", default=100)
+
+# Kill workers silent for `timeout` seconds; give in-flight requests
+# `graceful_timeout` seconds to finish on restart/shutdown.
+timeout = env.int("GUNICORN_TIMEOUT", default=30)
+graceful_timeout = env.int("GUNICORN_GRACEFUL_TIMEOUT", default=30)
+# Seconds to hold idle keep-alive connections; keep above the proxy's idle timeout
+# when gunicorn sits behind a load balancer that reuses connections.
+keepalive = env.int("GUNICORN_KEEPALIVE", default=5)
+
+# Import Django once in the master and fork: code and settings pages are shared
+# copy-on-write between workers, and startup errors fail fast.
+preload_app = env.bool("GUNICORN_PRELOAD", default=True)
+
+# Worker heartbeat files on tmpfs (Docker's /tmp may be disk-backed overlayfs).
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+# ---------- metrics ----------
+# prometheus_client multi-process mode: every worker writes its samples to mmap'd
+# files in this directory and a scrape of any worker sums them. It has to be set
+# before the app (and prometheus_client) is imported, and is emptied once when the
+# master starts (`on_starting`) so a previous run's files aren't counted again.
+# This module is read again on HUP, while workers are still writing there.
+_metrics_dir_default = os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+    "orderflow-metrics",
+)
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", _metrics_dir_default)
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+# ---------- logging ----------
+accesslog = env("GUNICORN_ACCESS_LOG", default=None)  # "-" for stdout
+errorlog = "-"
+loglevel = env("GUNICORN_LOG_LEVEL", default="info")
+
+
+# ---------- hooks ----------
+def on_starting(server):
+    # Once per master, not on HUP. A USR2 re-exec (master_pid set) starts next to
+    # the old master's live workers, so it keeps their files too.
+    if not server.master_pid:
+        metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir, exist_ok=True)
+
+
+def when_ready(server):
+    if preload_app:
+        # Move everything allocated while preloading to a permanent generation so
+        # the collector doesn't touch (and un-share) those pages in the workers.
+        gc.freeze()
+
+
+def pre_fork(server, worker):
+    # Fork without DB sockets: close whatever the master opened (e.g. while
+    # preloading), pools included, before the child inherits it.
+    from django.db import connections
+
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+        if connection.alias in getattr(connection, "_connection_pools", {}):
+            connection.close_pool()
+
+
+def post_fork(server, worker):
+    # Should a connection still have come across, forget it rather than close it:
+    # closing sends a Terminate on the socket the master still owns, whereas
+    # psycopg skips that when an inherited connection is garbage collected.
+    from django.db import connections
+
+    for connection in connections.all(initialized_only=True):
+        connection.connection = None
+        getattr(connection, "_connection_pools", {}).pop(connection.alias, None)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,147 @@
+"""
+Archival tier: orders older than `ORDER_ARCHIVE_AFTER_MONTHS` move out of the
+hot (partitioned) tables into `ArchivedOrder`, one compact row per order.
+
+Lists only ever read the hot tables. `retrieve` falls back to the archive for
+ids it doesn't find there, and renders an archived order exactly as before it
+was archived (product names are those at archiving time).
+"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.db import transaction
+
+from . import partitions
+from .models import ArchivedOrder, Order, OrderItem, Product
+from .selectors import CUSTOMER_COLUMNS, ascope_for_user, scope_for_user
+
+
+def cutoff(months: int) -> datetime:
+    """
+    Start of the month `months` months ago: orders created before it are archived,
+    so whole months (partitions) empty out at once.
+    """
+    month = partitions.add_months(partitions.current_month(), -months)
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+
+
+# ---------- writing ----------
+def _archived(order: Order, items) -> ArchivedOrder:
+    return ArchivedOrder(
+        id=order.pk,
+        customer_id=order.customer_id,
+        total_price=order.total_price,
+        created_at=order.created_at,
+        updated_at=order.updated_at,
+        items=[
+            {
+                "id": str(item.pk),
+                "product_id": str(item.product_id),
+                "product_name": item.product.name,
+                "quantity": item.quantity,
+                "unit_price": str(item.unit_price),
+                "created_at": item.created_at.isoformat(),
+                "updated_at": item.updated_at.isoformat(),
+            }
+            for item in items
+        ],
+    )
+
+
+@transaction.atomic
+def archive_batch(before: datetime, batch_size: int) -> int:
+    """
+    Move up to `batch_size` of the oldest orders created before `before` (and
+    their lines) into the archive; returns how many moved.
+    """
+    orders = list(
+        Order.objects.select_for_update(skip_locked=True)
+        .filter(created_at__lt=before)
+        .order_by("created_at")[:batch_size]
+    )
+    if not orders:
+        return 0
+    pks = [order.pk for order in orders]
+    lines = {}
+    for item in OrderItem.objects.filter(
+        order_id__in=pks, order_created_at__lt=before
+    ).select_related("product"):
+        lines.setdefault(item.order_id, []).append(item)
+    ArchivedOrder.objects.bulk_create(
+        [_archived(order, lines.get(order.pk, [])) for order in orders]
+    )
+    Order.objects.filter(pk__in=pks, created_at__lt=before).delete()  # lines cascade
+    return len(orders)
+
+
+def archive_orders(before: datetime, batch_size: int = 500) -> int:
+    """
+    Archive every order created before `before`, one transaction per batch.
+    """
+    total = 0
+    while moved := archive_batch(before, batch_size):
+        total += moved
+    return total
+
+
+# ---------- reading ----------
+def _order(archived: ArchivedOrder, fields) -> Order:
+    """
+    An unsaved `Order` with its lines loaded, for `OrderReadSerializer`.
+    """
+    order = Order(
+        id=archived.pk,
+        customer_id=archived.customer_id,
+        total_price=archived.total_price,
+        created_at=archived.created_at,
+        updated_at=archived.updated_at,
+    )
+    if "customer" in fields:
+        order.customer = archived.customer
+    if "items" not in fields:
+        return order
+    order._prefetched_objects_cache = {
+        "items": [
+            OrderItem(
+                id=line["id"],
+                order=order,
+                product=Product(id=line["product_id"], name=line["product_name"]),
+                quantity=line["quantity"],
+                unit_price=Decimal(line["unit_price"]),
+                created_at=datetime.fromisoformat(line["created_at"]),
+                updated_at=datetime.fromisoformat(line["updated_at"]),
+            )
+            for line in archived.items
+        ]
+    }
+    return order
+
+
+def archived_qs(fields):
+    """
+    Like `order_qs_for_fields`: one query, only what rendering `fields` needs.
+    """
+    qs = ArchivedOrder.objects.all()
+    columns = ["id", "customer_id", "total_price", "created_at", "updated_at"]
+    if "customer" in fields:
+        qs = qs.select_related("customer")
+        columns += CUSTOMER_COLUMNS
+    if "items" in fields:
+        columns.append("items")
+    return qs.only(*columns)
+
+
+def find(pk, user, fields) -> Order:
+    """
+    The archived order `pk` as `user` may see it, rendered as an `Order`
+    (`fields` as in `OrderReadSerializer.output_fields`). Raises
+    `ArchivedOrder.DoesNotExist`.
+    """
+    archived = scope_for_user(archived_qs(fields), user).get(pk=pk)
+    return _order(archived, fields)
+
+
+async def afind(pk, user, fields) -> Order:
+    archived = await (await ascope_for_user(archived_qs(fields), user)).aget(pk=pk)
+    return _order(archived, fields)
@@ -0,0 +1,73 @@
+from django.core.exceptions import ValidationError
+from django.http import Http404
+
+from orderflow.contrib.async_views import AsyncAPIView, AsyncPageNumberPagination
+from orderflow.contrib.request_log import annotate
+
+from . import archive
+from .filters import OrderFilter
+from .models import ArchivedOrder, Order
+from .selectors import ascope_for_user, order_qs_for_fields
+from .serializers import OrderReadSerializer
+from .views import OrderViewSetV1
+
+
+class OrderAsyncViewMixin:
+    throttle_scope = OrderViewSetV1.throttle_scope
+
+    async def get_queryset(self, request, fields, created_between=(None, None)):
+        qs = order_qs_for_fields(fields, created_between=created_between)
+        return await ascope_for_user(qs, request.user)
+
+    def get_output_fields(self, request) -> frozenset:
+        return OrderReadSerializer.fields_from_query(request.GET)
+
+
+class OrderListAsyncView(OrderAsyncViewMixin, AsyncAPIView):
+    """
+    GET /api/v1/orders/ (see `OrderViewSetV1.list`); POST falls back to the viewset.
+    """
+
+    query_budget = OrderViewSetV1.query_budgets["list"]
+    filterset_class = OrderFilter
+    ordering_fields = OrderViewSetV1.ordering_fields
+    ordering = OrderViewSetV1.ordering
+
+    async def get(self, request, *args, **kwargs):
+        annotate(request, **OrderFilter.log_fields(request.GET))
+        fields = self.get_output_fields(request)
+        created = OrderFilter.created_between(request.GET)
+        qs = await self.get_queryset(request, fields, created_between=created)
+        qs = self.filter_queryset(request, qs)
+        paginator = AsyncPageNumberPagination()
+        orders = await paginator.apaginate_queryset(qs, request)
+        context = {"request": request, "fields": fields}
+        data = OrderReadSerializer(orders, many=True, context=context).data
+        return self.render(paginator.get_paginated_data(data))
+
+
+class OrderDetailAsyncView(OrderAsyncViewMixin, AsyncAPIView):
+    """
+    GET /api/v1/orders/{id}/ (see `OrderViewSetV1.retrieve`); writes fall back.
+    """
+
+    query_budget = OrderViewSetV1.query_budgets["retrieve"]
+
+    async def get(self, request, pk=None, *args, **kwargs):
+        annotate(request, order_id=pk)
+        fields = self.get_output_fields(request)
+        qs = await self.get_queryset(request, fields)
+        try:
+            order = await qs.aget(pk=pk)
+        except Order.DoesNotExist:
+            order = await self.get_archived_object(request, pk, fields)
+        except (ValidationError, ValueError, TypeError):
+            raise Http404("No Order matches the given query.")
+        context = {"request": request, "fields": fields}
+        return self.render(OrderReadSerializer(order, context=context).data)
+
+    async def get_archived_object(self, request, pk, fields):
+        try:
+            return await archive.afind(pk, request.user, fields)
+        except ArchivedOrder.DoesNotExist:
+            raise Http404("No Order matches the given query.")
@@ -21,3 +21,25 @@ class OrderFilter(df.FilterSet):
             "min_total",
             "max_total",
         )
+
+    @classmethod
+    def created_between(cls, data) -> tuple:
+        """
+        (created_from, created_to) from the query string, None where missing or
+        invalid (the filter backend reports those).
+        """
+        form = cls(data, queryset=Order.objects.none()).form
+        form.is_valid()
+        cleaned = getattr(form, "cleaned_data", {})
+        return cleaned.get("created_from"), cleaned.get("created_to")
+
+    @classmethod
+    def log_fields(cls, data) -> dict:
+        """
+        The filters and ordering a list request used, for the request log (read
+        back by `manage.py advise_indexes`).
+        """
+        return {
+            "filters": sorted(name for name in cls.base_filters if data.get(name)),
+            "ordering": data.get("ordering") or None,
+        }
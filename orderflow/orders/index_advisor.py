@@ -0,0 +1,316 @@
+"""
+Index advisor for the order list (PostgreSQL only).
+
+Reads the request log for the filter/ordering combinations clients actually send
+to `GET /api/v1/orders/` (the list views log `filters` and `ordering`), replays
+each one as the list query with representative values under `EXPLAIN`, and tries
+composite and covering (`INCLUDE`) candidate indexes: each is built inside a
+transaction that is rolled back, so the report shows the plan cost with it and
+its real size. Building an index locks the table against writes while it runs:
+point this at a copy of production data, not at the primary.
+"""
+
+import hashlib
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.db.migrations import Migration, operations
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+from django.db.models import Count, Max, Min
+
+from .filters import OrderFilter
+from .models import Order
+from .selectors import ORDER_COLUMNS
+from .views import OrderViewSetV1
+
+LIST_ROUTE = "v1-orders-list"
+ORDERING_FIELDS = OrderViewSetV1.ordering_fields
+DEFAULT_ORDERING = tuple(OrderViewSetV1.ordering)
+
+
+@dataclass(frozen=True)
+class Combination:
+    filters: tuple[str, ...]  # OrderFilter names
+    ordering: tuple[str, ...] = DEFAULT_ORDERING
+
+    def __str__(self) -> str:
+        return f"{','.join(self.filters) or '-'} / {','.join(self.ordering)}"
+
+    @property
+    def columns(self) -> list[str]:
+        """
+        Field names filtered on, in filter order, without repeats.
+        """
+        names = (OrderFilter.base_filters[name].field_name for name in self.filters)
+        return list(dict.fromkeys(names))
+
+
+def parse_ordering(raw: Optional[str]) -> tuple[str, ...]:
+    terms = [term.strip() for term in (raw or "").split(",")]
+    valid = tuple(term for term in terms if term.lstrip("-") in ORDERING_FIELDS)
+    return valid or DEFAULT_ORDERING
+
+
+def read_log(lines: Iterable[str]) -> Counter:
+    """
+    {Combination: requests} over the successful order list requests in `lines`
+    (JSON request log lines; anything else is skipped).
+    """
+    counts = Counter()
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(entry, dict) or entry.get("route") != LIST_ROUTE:
+            continue
+        if entry.get("method") != "GET" or entry.get("status") != 200:
+            continue
+        filters = entry.get("filters") or ()
+        known = tuple(sorted(set(filters) & set(OrderFilter.base_filters)))
+        counts[Combination(known, parse_ordering(entry.get("ordering")))] += 1
+    return counts
+
+
+# ---------- replay ----------
+@dataclass
+class Plan:
+    cost: float
+    nodes: frozenset  # node types, e.g. {"Sort", "Index Scan"}
+
+    @property
+    def flags(self) -> str:
+        flags = [
+            name.lower()
+            for name in ("Sort", "Seq Scan", "Bitmap Heap Scan")
+            if name in self.nodes
+        ]
+        return ", ".join(flags)
+
+
+def _node_types(plan: dict) -> set:
+    types = {plan["Node Type"]}
+    for child in plan.get("Plans", ()):
+        types |= _node_types(child)
+    return types
+
+
+def explain(qs, analyze: bool = False) -> Plan:
+    """
+    Planner cost of `qs` (execution time in ms with `analyze`).
+    """
+    (result,) = json.loads(qs.explain(format="json", analyze=analyze))
+    cost = result["Execution Time"] if analyze else result["Plan"]["Total Cost"]
+    return Plan(cost, frozenset(_node_types(result["Plan"])))
+
+
+def busiest_customer():
+    row = (
+        Order.objects.values("customer_id")
+        .annotate(orders=Count("id"))
+        .order_by("-orders")
+        .first()
+    )
+    return row and row["customer_id"]
+
+
+def sample_values(customer_id=None) -> dict[str, str]:
+    """
+    A value for every `OrderFilter` filter: lower bounds a quarter into the
+    column's range, upper bounds three quarters, so a range keeps about half.
+    """
+    qs = Order.objects.all()
+    if customer_id is not None:
+        qs = qs.filter(customer_id=customer_id)
+    columns = {f.field_name for f in OrderFilter.base_filters.values()}
+    bounds = qs.aggregate(
+        **{f"{c}_min": Min(c) for c in columns},
+        **{f"{c}_max": Max(c) for c in columns},
+    )
+    values = {}
+    for name, filter_ in OrderFilter.base_filters.items():
+        low = bounds[f"{filter_.field_name}_min"]
+        high = bounds[f"{filter_.field_name}_max"]
+        if low is None:
+            continue
+        quarters = 1 if filter_.lookup_expr == "gte" else 3
+        value = low + (high - low) * quarters / 4
+        values[name] = value.isoformat() if hasattr(value, "isoformat") else str(value)
+    return values
+
+
+def list_query(combination: Combination, values: dict, customer_id=None):
+    """
+    The first page of the order list as `OrderViewSetV1` queries it.
+    """
+    qs = Order.objects.only(*ORDER_COLUMNS)
+    if customer_id is not None:
+        qs = qs.filter(customer_id=customer_id)
+    data = {name: values[name] for name in combination.filters if name in values}
+    qs = OrderFilter(data, queryset=qs).qs
+    return qs.order_by(*combination.ordering)[: settings.REST_FRAMEWORK["PAGE_SIZE"]]
+
+
+# ---------- candidates ----------
+def index_name(fields: list[str], include: list[str]) -> str:
+    digest = hashlib.md5(
+        ",".join(fields + ["+"] + include).encode(), usedforsecurity=False
+    ).hexdigest()
+    short = "_".join(name[:4] for name in fields)
+    return f"ord_{short}_{digest[:6]}"[:30]
+
+
+def existing_keys() -> set[tuple]:
+    keys = {tuple(index.fields) for index in Order._meta.indexes}
+    keys |= {(f.name,) for f in Order._meta.concrete_fields if f.db_index}
+    return keys
+
+
+def candidates(combination: Combination, scoped: bool) -> list[models.Index]:
+    """
+    Key orders worth trying: the equality column (the customer, when scoped),
+    then either the sort column (no sort step) or a range column (narrower
+    scan), each with two INCLUDE lists.
+    """
+    leading = ["customer"] if scoped else []
+    order = [term.lstrip("-") for term in combination.ordering]
+    ranges = combination.columns
+    read = [Order._meta.get_field(column).name for column in ORDER_COLUMNS]
+    keys = [leading + order] + [leading + [column] for column in ranges]
+    known, indexes = existing_keys(), []
+    for key in dict.fromkeys(tuple(key) for key in keys):
+        if not key or key in known:
+            continue
+        # Just what the WHERE and ORDER BY need, or every column the page reads
+        # (allows index-only scans, at a larger size).
+        for columns in (ranges + order, read):
+            include = [c for c in dict.fromkeys(columns) if c not in key]
+            name = index_name(list(key), include)
+            if name not in {index.name for index in indexes}:
+                indexes.append(
+                    models.Index(fields=list(key), include=include, name=name)
+                )
+    return indexes
+
+
+def index_size(name: str) -> int:
+    """
+    Bytes, over every partition of a partitioned index.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT coalesce(sum(pg_relation_size(relid)), 0)"
+            " FROM pg_partition_tree(%s::regclass)",
+            [name],
+        )
+        return int(cursor.fetchone()[0])
+
+
+def try_index(index: models.Index, qs, analyze: bool = False) -> tuple[Plan, int]:
+    """
+    The plan of `qs` with `index` built, and its size; the index is dropped again.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # CREATE INDEX refuses tables with deferred FK checks still pending.
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        with connection.schema_editor(atomic=False) as editor:
+            editor.add_index(Order, index)
+        result = explain(qs, analyze), index_size(index.name)
+        transaction.set_rollback(True)
+    return result
+
+
+@dataclass
+class Advice:
+    combination: Combination
+    requests: int
+    before: Plan
+    index: Optional[models.Index] = None
+    after: Optional[Plan] = None
+    size: int = 0
+    tried: list = field(default_factory=list)  # [(index, plan, size)]
+
+    @property
+    def gain(self) -> float:
+        """
+        Percent of the cost the best index saves.
+        """
+        if self.after is None or not self.before.cost:
+            return 0.0
+        return (self.before.cost - self.after.cost) / self.before.cost * 100
+
+
+def advise(
+    counts: Counter,
+    *,
+    customer_id=None,
+    analyze: bool = False,
+    top: Optional[int] = None,
+) -> list[Advice]:
+    """
+    Replay the `top` most requested combinations, scoped to `customer_id` (as a
+    customer's list is) or unscoped (as an admin's is) when None.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {Order._meta.db_table}")  # current statistics
+    values = sample_values(customer_id)
+    results = []
+    for combination, requests in counts.most_common(top):
+        qs = list_query(combination, values, customer_id)
+        advice = Advice(combination, requests, explain(qs, analyze))
+        for index in candidates(combination, scoped=customer_id is not None):
+            plan, size = try_index(index, qs, analyze)
+            advice.tried.append((index, plan, size))
+            if plan.cost < (advice.after or advice.before).cost:
+                advice.index, advice.after, advice.size = index, plan, size
+        results.append(advice)
+    return results
+
+
+def recommended(results: list[Advice], min_gain: float) -> list[models.Index]:
+    """
+    Distinct best indexes saving at least `min_gain` percent, most requested
+    combination first.
+    """
+    chosen = {}
+    for advice in sorted(results, key=lambda a: -a.requests):
+        if advice.index is not None and advice.gain >= min_gain:
+            chosen.setdefault(advice.index.name, advice.index)
+    return list(chosen.values())
+
+
+# ---------- output ----------
+def index_source(index: models.Index) -> str:
+    """
+    The `Order.Meta.indexes` entry for `index`.
+    """
+    include = f", include={index.include!r}" if index.include else ""
+    return f"models.Index(fields={index.fields!r}{include}, name={index.name!r})"
+
+
+def write_migration(indexes: list[models.Index], directory: Optional[Path] = None):
+    """
+    Write an `AddIndex` migration after the latest `orders` migration and return
+    its path. `Order.Meta.indexes` needs the same entries (see `index_source`).
+    """
+    app_label = Order._meta.app_label
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    (leaf,) = loader.graph.leaf_nodes(app_label)
+    number = int(leaf[1].split("_")[0]) + 1
+    migration = Migration(f"{number:04d}_advised_indexes", app_label)
+    migration.dependencies = [leaf]
+    migration.operations = [
+        operations.AddIndex(model_name=Order._meta.model_name, index=index)
+        for index in indexes
+    ]
+    writer = MigrationWriter(migration)
+    path = Path(directory or Path(writer.path).parent) / f"{migration.name}.py"
+    path.write_text(writer.as_string())
+    return path
@@ -0,0 +1,122 @@
+import sys
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from orderflow.orders import index_advisor as advisor
+
+
+def megabytes(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay the order list filter/ordering combinations found in request logs "
+        "under EXPLAIN, try composite/covering indexes for each (built and rolled "
+        "back) and report their benefit and size. Builds indexes: run it against a "
+        "copy of production data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "logs", nargs="+", help="Request log files (JSON lines); - for stdin."
+        )
+        scope = parser.add_mutually_exclusive_group()
+        scope.add_argument(
+            "--customer",
+            type=uuid.UUID,
+            help="Replay as this customer's list (default: the one with most orders).",
+        )
+        scope.add_argument(
+            "--unscoped",
+            action="store_true",
+            help="Replay as an admin's list (all customers).",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Compare EXPLAIN ANALYZE execution times instead of planner costs.",
+        )
+        parser.add_argument(
+            "--top", type=int, default=10, help="Combinations replayed (default: 10)."
+        )
+        parser.add_argument(
+            "--min-gain",
+            type=float,
+            default=20.0,
+            help="Percent an index must save to be recommended (default: 20).",
+        )
+        parser.add_argument(
+            "--write-migration",
+            action="store_true",
+            help="Write an AddIndex migration for the recommended indexes.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("The index advisor needs PostgreSQL.")
+        counts = advisor.read_log(self.read_lines(options["logs"]))
+        if not counts:
+            raise CommandError(f"No {advisor.LIST_ROUTE} requests in the logs.")
+
+        customer_id = None
+        if not options["unscoped"]:
+            customer_id = options["customer"] or advisor.busiest_customer()
+            if customer_id is None:
+                raise CommandError("No orders to replay against.")
+        results = advisor.advise(
+            counts,
+            customer_id=customer_id,
+            analyze=options["analyze"],
+            top=options["top"],
+        )
+
+        unit = "ms" if options["analyze"] else "cost"
+        self.stdout.write(
+            f"{sum(counts.values())} list requests, {len(counts)} combinations; "
+            f"replayed as {customer_id or 'an admin'}"
+        )
+        for advice in results:
+            self.stdout.write(
+                f"\n{advice.combination}  ({advice.requests} requests)\n"
+                f"  now: {advice.before.cost:.2f} {unit} {advice.before.flags}"
+            )
+            for index, plan, size in advice.tried:
+                marker = "*" if index is advice.index else " "
+                self.stdout.write(
+                    f" {marker} {advisor.index_source(index)}: {plan.cost:.2f} {unit} "
+                    f"{plan.flags}, {megabytes(size)}"
+                )
+
+        indexes = advisor.recommended(results, options["min_gain"])
+        if not indexes:
+            self.stdout.write(
+                f"\nNo index saves {options['min_gain']:.0f}% on any combination."
+            )
+            return
+        sizes = {i.name: s for a in results for i, _, s in a.tried}
+        self.stdout.write(
+            f"\nRecommended ({megabytes(sum(sizes[i.name] for i in indexes))} in total):"
+        )
+        for index in indexes:
+            self.stdout.write(f"  {advisor.index_source(index)},")
+        if options["write_migration"]:
+            path = advisor.write_migration(indexes)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Wrote {path}; add the indexes above to Order.Meta.indexes."
+                )
+            )
+
+    def read_lines(self, paths):
+        for path in paths:
+            if path == "-":
+                yield from sys.stdin
+                continue
+            try:
+                with open(path) as f:
+                    yield from f
+            except OSError as e:
+                raise CommandError(f"Can't read {path}: {e}")
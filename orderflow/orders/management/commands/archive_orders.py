@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from orderflow.orders import archive
+from orderflow.orders.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        "Move old orders and their lines into the archive tier in batches; "
+        "`retrieve` still finds them there."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            metavar="MONTHS",
+            default=None,
+            help="Archive orders created before the start of the month MONTHS ago "
+            "(default: ORDER_ARCHIVE_AFTER_MONTHS).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Orders moved per transaction (default: 500).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Count the orders that would move without moving them.",
+        )
+
+    def handle(self, *args, **options):
+        months = options["older_than"]
+        if months is None:
+            months = settings.ORDER_ARCHIVE_AFTER_MONTHS
+        if months < 1:
+            raise CommandError("--older-than must be at least 1.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        before = archive.cutoff(months)
+        if options["dry_run"]:
+            count = Order.objects.filter(created_at__lt=before).count()
+            self.stdout.write(
+                f"Would archive {count} order(s) created before {before:%Y-%m-%d}."
+            )
+            return
+        moved = archive.archive_orders(before, batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {moved} order(s) created before {before:%Y-%m-%d}."
+            )
+        )
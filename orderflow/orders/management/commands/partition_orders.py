@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from orderflow.orders import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the coming months' order partitions, move rows out of the DEFAULT "
+        "partitions into their months, and optionally detach old months into "
+        f"the {partitions.ARCHIVE_SCHEMA} schema (PostgreSQL only). Run it daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=partitions.AHEAD,
+            help="Months to create beyond the current one (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--detach-older-than",
+            type=int,
+            metavar="MONTHS",
+            help="Detach the partitions of months that ended more than MONTHS ago.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print what would change without changing it.",
+        )
+
+    def handle(self, *args, **options):
+        if not partitions.is_supported(connection):
+            raise CommandError("Order tables are only partitioned on PostgreSQL.")
+        if options["ahead"] < 0:
+            raise CommandError("--ahead can't be negative.")
+        retain = options["detach_older_than"]
+        if retain is not None and retain < 1:
+            raise CommandError("--detach-older-than must be at least 1.")
+
+        current = partitions.current_month()
+        existing = partitions.partitions(connection)
+        last = partitions.add_months(current, options["ahead"])
+        months = partitions.month_range(current, last)
+        # Months outside the window whose orders fell into the DEFAULT partition.
+        stray = [m for m in partitions.default_months(connection) if m not in months]
+        if options["dry_run"]:
+            created = [month for month in months if month not in existing] + stray
+        else:
+            created = partitions.create_partitions(connection, current, last)
+            for month in stray:
+                created += partitions.create_partitions(connection, month, month)
+        for month in created:
+            self.stdout.write(f"Created {month:%Y-%m}")
+
+        detached = []
+        if retain is not None:
+            cutoff = partitions.add_months(current, -retain)
+            detached = [month for month in existing if month < cutoff]
+            for month in detached:
+                if not options["dry_run"]:
+                    partitions.detach_partition(connection, month)
+                self.stdout.write(
+                    f"Detached {month:%Y-%m} into {partitions.ARCHIVE_SCHEMA}"
+                )
+
+        prefix = "Would have: " if options["dry_run"] else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}{len(created)} partition(s) created, "
+                f"{len(detached)} detached; partitions run through {last:%Y-%m}."
+            )
+        )
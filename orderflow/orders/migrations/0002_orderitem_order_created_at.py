@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:12
+
+import orderflow.orders.models
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def copy_order_created_at(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    OrderItem = apps.get_model("orders", "OrderItem")
+    OrderItem.objects.update(
+        order_created_at=Subquery(
+            Order.objects.filter(pk=OuterRef("order_id")).values("created_at")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="orderitem",
+            name="order_created_at",
+            field=orderflow.orders.models.OrderCreatedAtField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(copy_order_created_at, migrations.RunPython.noop),
+    ]
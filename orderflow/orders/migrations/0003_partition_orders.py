@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:12
+
+import django.db.models.deletion
+import orderflow.orders.models
+from django.db import migrations, models
+
+from orderflow.orders import partitions
+
+
+def partition(apps, schema_editor):
+    if partitions.is_supported(schema_editor.connection):
+        partitions.partition_tables(schema_editor.connection)
+
+
+def unpartition(apps, schema_editor):
+    if partitions.is_supported(schema_editor.connection):
+        partitions.unpartition_tables(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    """
+    Rewrites both tables: on a large database, run it in a maintenance window.
+    """
+
+    dependencies = [
+        ("orders", "0002_orderitem_order_created_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="orderitem",
+            name="order_created_at",
+            field=orderflow.orders.models.OrderCreatedAtField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name="orderitem",
+            name="order",
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="items",
+                to="orders.order",
+            ),
+        ),
+        migrations.RunPython(partition, unpartition),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:44
+
+import orderflow.contrib.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0004_archivedorder"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="order",
+            name="id",
+            field=models.UUIDField(
+                default=orderflow.contrib.models.new_uuid,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="orderitem",
+            name="id",
+            field=models.UUIDField(
+                default=orderflow.contrib.models.new_uuid,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="product",
+            name="id",
+            field=models.UUIDField(
+                default=orderflow.contrib.models.new_uuid,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+from orderflow.orders import partitions
+
+
+def create(apps, schema_editor):
+    if partitions.is_supported(schema_editor.connection):
+        partitions.create_default_partitions(schema_editor.connection)
+
+
+def drop(apps, schema_editor):
+    if partitions.is_supported(schema_editor.connection):
+        partitions.drop_default_partitions(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    """
+    Catch orders created past the last monthly partition instead of failing.
+    """
+
+    dependencies = [
+        ("orders", "0005_time_ordered_ids"),
+    ]
+
+    operations = [
+        migrations.RunPython(create, drop),
+    ]
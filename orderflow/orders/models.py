@@ -79,7 +79,8 @@ class Order(TimeStampedUUIDModel):
         Recompute and (optionally) persist the denormalized total_price from items.
         Intended to be called by the service layer within a transaction.
         """
-        total = self.items.aggregate(
+        items = self.items.filter(order_created_at=self.created_at)  # one partition
+        total = items.aggregate(
             s=models.Sum(
                 models.F("quantity") * models.F("unit_price"),
                 output_field=models.DecimalField(max_digits=14, decimal_places=2),
@@ -98,15 +99,35 @@ class Order(TimeStampedUUIDModel):
         )
 
 
+class OrderCreatedAtField(models.DateTimeField):
+    """
+    A copy of the order's `created_at`, filled in when the row is inserted
+    (`bulk_create` included).
+    """
+
+    def pre_save(self, model_instance, add):
+        if add and getattr(model_instance, self.attname) is None:
+            setattr(model_instance, self.attname, model_instance.order.created_at)
+        return super().pre_save(model_instance, add)
+
+
 class OrderItem(TimeStampedUUIDModel):
     """
     Line item for an Order. Stores a *price snapshot* at the time of addition.
     Enforces one row per (order, product) to avoid duplicate lines; adjust via services.
     """
 
+    # On PostgreSQL the database constraint is (order_id, order_created_at) →
+    # (id, created_at), since both tables are partitioned (see partitions.py).
     order = models.ForeignKey(
-        Order, on_delete=models.CASCADE, related_name="items", db_index=True
+        Order,
+        on_delete=models.CASCADE,
+        related_name="items",
+        db_index=True,
+        db_constraint=False,
     )
+    # Partition key: lines live in their order's month.
+    order_created_at = OrderCreatedAtField(editable=False)
     product = models.ForeignKey(
         Product, on_delete=models.PROTECT, related_name="order_items", db_index=True
     )
@@ -148,3 +169,33 @@ class OrderItem(TimeStampedUUIDModel):
     @property
     def line_total(self) -> Decimal:
         return (self.unit_price or Decimal("0.00")) * Decimal(self.quantity)
+
+
+class ArchivedOrder(models.Model):
+    """
+    An order moved out of the hot tables by `manage.py archive_orders`: one row
+    per order, its lines inlined as JSON, no index besides the primary key.
+    Read-only; `retrieve` falls back to it (see orderflow.orders.archive).
+    """
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    # No index: only consulted when a user is deleted.
+    customer = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        related_name="archived_orders",
+        db_index=False,
+    )
+    total_price = models.DecimalField(max_digits=14, decimal_places=2)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    # [{"id", "product_id", "product_name", "quantity", "unit_price", ...}, ...]
+    items = models.JSONField(default=list)
+
+    class Meta:
+        verbose_name = _("archived order")
+        verbose_name_plural = _("archived orders")
+
+    def __str__(self) -> str:
+        return f"Archived order {self.pk}"
@@ -0,0 +1,314 @@
+"""
+Monthly range partitions of the order tables (PostgreSQL only).
+
+`orders_order` is partitioned on `created_at` and `orders_orderitem` on
+`order_created_at`, a copy of its order's `created_at`. An order and its lines
+therefore always live in the same month: reads bounded by creation date only
+scan those months' partitions, and a month can be detached as a unit.
+
+PostgreSQL wants the partition key in every unique constraint, so in the
+database the primary keys are (id, created_at) and (id, order_created_at), the
+(order, product) constraint includes `order_created_at`, and lines reference
+their order through (order_id, order_created_at). Django still treats `id` as
+the primary key.
+
+Rows for a month without a partition land in each table's DEFAULT partition
+(`orders_order_default`, `orders_orderitem_default`), which every query then
+scans. `manage.py partition_orders`, run daily (the compose files do), creates
+the coming months, moves the rows the DEFAULT partitions hold into their
+months, and can detach old months into the `orders_archive` schema.
+"""
+
+import re
+from datetime import date, datetime, timezone
+
+from django.db import transaction
+
+ORDERS = "orders_order"
+ITEMS = "orders_orderitem"
+KEYS = {ORDERS: "created_at", ITEMS: "order_created_at"}
+ITEMS_ORDER_FK = "orders_orderitem_order_partition_fk"
+ARCHIVE_SCHEMA = "orders_archive"
+AHEAD = 3  # months created beyond the current one
+
+_NAME = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+# ---------- months ----------
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(first: date, last: date) -> list[date]:
+    months = []
+    while first <= last:
+        months.append(first)
+        first = add_months(first, 1)
+    return months
+
+
+def current_month() -> date:
+    return month_start(datetime.now(timezone.utc))
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def default_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def _bound(month: date) -> str:
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc).isoformat(" ")
+
+
+# ---------- partitions ----------
+def is_supported(connection) -> bool:
+    return connection.vendor == "postgresql"
+
+
+def partitions(connection, table: str = ORDERS) -> list[date]:
+    """
+    Months with a partition attached to `table`, oldest first.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits"
+            " JOIN pg_class child ON child.oid = pg_inherits.inhrelid"
+            " WHERE pg_inherits.inhparent = %s::regclass",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    return sorted(date(int(m[1]), int(m[2]), 1) for m in map(_NAME.search, names) if m)
+
+
+def detached_partitions(connection) -> list[date]:
+    """
+    Months whose order partition has been detached into the archive schema.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT tablename FROM pg_tables WHERE schemaname = %s", [ARCHIVE_SCHEMA])
+        names = [row[0] for row in cursor.fetchall() if row[0].startswith(f"{ORDERS}_y")]
+    return sorted(date(int(m[1]), int(m[2]), 1) for m in map(_NAME.search, names) if m)
+
+
+def default_months(connection) -> list[date]:
+    """
+    Months with orders in the DEFAULT partition, oldest first.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC')::date"
+            f" FROM {default_name(ORDERS)} ORDER BY 1"
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _values(month: date) -> str:
+    return f"FROM ('{_bound(month)}') TO ('{_bound(add_months(month, 1))}')"
+
+
+def _create_partition(cursor, table: str, month: date) -> None:
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)}"
+        f" PARTITION OF {table} FOR VALUES {_values(month)}"
+    )
+
+
+def _split_default(cursor, month: date) -> None:
+    """
+    Create `month`'s partitions out of the rows the DEFAULT partitions hold
+    for it (PostgreSQL refuses a new partition whose rows sit in DEFAULT).
+    """
+    # ALTER TABLE refuses tables with deferred FK checks still pending.
+    cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+    # Lines first: deleting their orders from DEFAULT would cascade to them.
+    for table in (ITEMS, ORDERS):
+        key, name = KEYS[table], partition_name(table, month)
+        cursor.execute(
+            f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {default_name(table)}"
+            f" WHERE {key} >= %s AND {key} < %s RETURNING *)"
+            f" INSERT INTO {name} SELECT * FROM moved",
+            [_bound(month), _bound(add_months(month, 1))],
+        )
+    # Attaching adds the parents' keys, indexes and foreign key, and checks them.
+    for table in (ORDERS, ITEMS):
+        cursor.execute(
+            f"ALTER TABLE {table} ATTACH PARTITION {partition_name(table, month)}"
+            f" FOR VALUES {_values(month)}"
+        )
+
+
+def create_partitions(connection, first: date, last: date) -> list[date]:
+    """
+    Create the missing order and line partitions for `first`..`last`, moving
+    in the rows the DEFAULT partitions hold for those months.
+    """
+    existing = set(partitions(connection))
+    missing = [month for month in month_range(first, last) if month not in existing]
+    stray = set(default_months(connection))
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for month in missing:
+            if month in stray:
+                _split_default(cursor, month)
+                continue
+            for table in (ORDERS, ITEMS):
+                _create_partition(cursor, table, month)
+    return missing
+
+
+def create_default_partitions(connection) -> None:
+    with connection.cursor() as cursor:
+        for table in (ORDERS, ITEMS):
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {default_name(table)}"
+                f" PARTITION OF {table} DEFAULT"
+            )
+
+
+def drop_default_partitions(connection) -> None:
+    """
+    Undo `create_default_partitions`, moving their rows into monthly ones.
+    """
+    for month in default_months(connection):
+        create_partitions(connection, month, month)
+    with connection.cursor() as cursor:
+        # The lines' foreign key depends on the orders' partitions until detached.
+        for table in (ITEMS, ORDERS):
+            cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {default_name(table)}")
+            cursor.execute(f"DROP TABLE {default_name(table)}")
+
+
+def detach_partition(connection, month: date) -> None:
+    """
+    Detach `month`'s order and line partitions and move them, still linked by
+    their foreign key, into the `orders_archive` schema.
+    """
+    orders, items = partition_name(ORDERS, month), partition_name(ITEMS, month)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        # ALTER TABLE refuses tables with deferred FK checks still pending.
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}")
+        # Lines first: the orders can't leave while attached lines reference them.
+        cursor.execute(f"ALTER TABLE {ITEMS} DETACH PARTITION {items}")
+        cursor.execute(f"ALTER TABLE {items} DROP CONSTRAINT {ITEMS_ORDER_FK}")
+        cursor.execute(f"ALTER TABLE {ORDERS} DETACH PARTITION {orders}")
+        for table in (orders, items):
+            cursor.execute(f"ALTER TABLE {table} SET SCHEMA {ARCHIVE_SCHEMA}")
+        cursor.execute(
+            f"ALTER TABLE {ARCHIVE_SCHEMA}.{items} ADD CONSTRAINT {ITEMS_ORDER_FK}"
+            " FOREIGN KEY (order_id, order_created_at)"
+            f" REFERENCES {ARCHIVE_SCHEMA}.{orders} (id, created_at) ON DELETE CASCADE"
+        )
+
+
+# ---------- conversion (migrations) ----------
+def _constraints(cursor, table: str) -> list[tuple[str, str, str]]:
+    cursor.execute(
+        "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint"
+        " WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f')"
+        " ORDER BY contype DESC, conname",
+        [table],
+    )
+    return cursor.fetchall()
+
+
+def _indexes(cursor, table: str) -> list[str]:
+    """
+    CREATE INDEX statements for the indexes not backing a constraint.
+    """
+    cursor.execute(
+        "SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i"
+        " WHERE i.indrelid = %s::regclass AND NOT EXISTS ("
+        "   SELECT 1 FROM pg_constraint c"
+        "   WHERE c.conrelid = i.indrelid AND c.conindid = i.indexrelid"
+        " )",
+        [table],
+    )
+    return [row[0].replace(" ON ONLY ", " ON ") for row in cursor.fetchall()]
+
+
+def _columns(definition: str, change) -> str:
+    """
+    `definition` ("PRIMARY KEY (id)", "UNIQUE (a, b)") with its column list
+    passed through `change`.
+    """
+    head, columns, tail = re.match(r"(.*?)\((.*?)\)(.*)", definition).groups()
+    return f"{head}({', '.join(change(columns.split(', ')))}){tail}"
+
+
+def _rebuild(cursor, table: str, partition_by: str, months, unique_columns) -> None:
+    """
+    Replace `table` by a copy with the same rows, constraints and indexes:
+    partitioned by `partition_by` into `months`, or plain if it's empty.
+    """
+    constraints, indexes = _constraints(cursor, table), _indexes(cursor, table)
+    old = f"{table}_old"
+    cursor.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    cursor.execute(
+        f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        + (f" PARTITION BY RANGE ({partition_by})" if partition_by else "")
+    )
+    for month in months:
+        _create_partition(cursor, table, month)
+    cursor.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    cursor.execute(f"DROP TABLE {old}")
+    for name, kind, definition in constraints:
+        if kind in "pu":
+            definition = _columns(definition, unique_columns)
+        cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+    for definition in indexes:
+        cursor.execute(definition)
+
+
+def partition_tables(connection) -> None:
+    """
+    Convert the plain order tables (with their rows) into partitioned ones,
+    with partitions from the oldest order's month to `AHEAD` months from now.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT min(created_at) FROM {ORDERS}")
+        oldest = cursor.fetchone()[0]
+        months = month_range(
+            month_start(oldest) if oldest else current_month(),
+            add_months(current_month(), AHEAD),
+        )
+        for table, key in KEYS.items():
+            _rebuild(
+                cursor,
+                table,
+                key,
+                months,
+                lambda columns, key=key: [*columns, key],
+            )
+        cursor.execute(
+            f"ALTER TABLE {ITEMS} ADD CONSTRAINT {ITEMS_ORDER_FK}"
+            " FOREIGN KEY (order_id, order_created_at)"
+            f" REFERENCES {ORDERS} (id, created_at) ON DELETE CASCADE"
+            " DEFERRABLE INITIALLY DEFERRED"
+        )
+
+
+def unpartition_tables(connection) -> None:
+    """
+    Undo `partition_tables`; partitions detached by now are left alone.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {ITEMS} DROP CONSTRAINT {ITEMS_ORDER_FK}")
+        for table, key in KEYS.items():
+            _rebuild(
+                cursor,
+                table,
+                None,
+                (),
+                lambda columns, key=key: [c for c in columns if c != key],
+            )
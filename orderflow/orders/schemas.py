@@ -212,6 +212,30 @@ ORDER_FILTER_PARAMETERS = [
     ),
 ]
 
+ORDER_EXPAND_PARAMETER = OpenApiParameter(
+    name="expand",
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY,
+    description=(
+        "Comma-separated relations to inline in the same query. "
+        "Allowed: customer (adds `customer` with id, username, first and last name), "
+        "items (included by default; needed with `fields` to keep them)."
+    ),
+    required=False,
+)
+
+ORDER_FIELDS_PARAMETER = OpenApiParameter(
+    name="fields",
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY,
+    description=(
+        "Comma-separated sparse fieldset, e.g. `id,total_price,created_at`. "
+        "Only these fields (plus `expand`ed relations) are returned and loaded; "
+        "without `items` the item lookup is skipped."
+    ),
+    required=False,
+)
+
 # ------------------------------------------------------------------------------
 # Endpoint schemas (method decorators)
 # ------------------------------------------------------------------------------
@@ -225,7 +249,7 @@ list_schema = extend_schema(
         "Non-admin users only see their own orders; users with the "
         "`orders.view_all_orders` permission see all."
     ),
-    parameters=ORDER_FILTER_PARAMETERS,
+    parameters=[*ORDER_FILTER_PARAMETERS, ORDER_FIELDS_PARAMETER, ORDER_EXPAND_PARAMETER],
     responses={
         200: OpenApiResponse(
             response=OrderReadSerializer(many=True),
@@ -246,6 +270,7 @@ retrieve_schema = extend_schema(
         "Object-level permissions: owners can view their own; admins or "
         "holders of `orders.view_all_orders` can view any."
     ),
+    parameters=[ORDER_FIELDS_PARAMETER, ORDER_EXPAND_PARAMETER],
     responses={
         200: OpenApiResponse(
             response=OrderReadSerializer,
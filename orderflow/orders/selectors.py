@@ -1,33 +1,78 @@
+from typing import Iterable
+
 from django.db.models import Prefetch
 
 from .models import Order, OrderItem
 
+ORDER_COLUMNS = ("id", "customer_id", "total_price", "created_at", "updated_at")
+CUSTOMER_COLUMNS = (
+    "customer__id",
+    "customer__username",
+    "customer__first_name",
+    "customer__last_name",
+)
+
 
-def order_base_qs():
+def order_base_qs(
+    *,
+    with_customer: bool = False,
+    with_items: bool = True,
+    columns: Iterable[str] = ORDER_COLUMNS,
+    created_between: tuple = (None, None),
+):
     """
     Minimal columns + eager loading to avoid N+1.
+    `with_customer` joins the customer's display fields into the same query,
+    `with_items=False` drops the items prefetch (and its product join), and
+    `columns` narrows the order columns loaded (the primary key always is).
+    `created_between` are bounds the orders' `created_at` is known to be within:
+    the items prefetch then only scans those months' partitions.
     """
-    return (
-        Order.objects.select_related("customer")
-        .only("id", "customer_id", "total_price", "created_at", "updated_at")
-        .prefetch_related(
-            Prefetch(
-                "items",
-                queryset=OrderItem.objects.select_related("product").only(
-                    "id",
-                    "order_id",
-                    "product_id",
-                    "quantity",
-                    "unit_price",
-                    "created_at",
-                    "updated_at",
-                    "product__name",
-                ),
-            )
+    qs = Order.objects.all()
+    columns = ("id", *columns)
+    if with_customer:
+        qs = qs.select_related("customer")
+        columns += ("customer_id", *CUSTOMER_COLUMNS)
+    qs = qs.only(*dict.fromkeys(columns))
+    if not with_items:
+        return qs
+    items = OrderItem.objects.all()
+    created_from, created_to = created_between
+    if created_from is not None:
+        items = items.filter(order_created_at__gte=created_from)
+    if created_to is not None:
+        items = items.filter(order_created_at__lte=created_to)
+    return qs.prefetch_related(
+        Prefetch(
+            "items",
+            queryset=items.select_related("product").only(
+                "id",
+                "order_id",
+                "product_id",
+                "quantity",
+                "unit_price",
+                "created_at",
+                "updated_at",
+                "product__name",
+            ),
         )
     )
 
 
+def order_qs_for_fields(fields: Iterable[str], created_between: tuple = (None, None)):
+    """
+    `order_base_qs` loading only what rendering `fields` needs (names as in
+    `OrderReadSerializer.output_fields`).
+    """
+    fields = set(fields)
+    return order_base_qs(
+        with_customer="customer" in fields,
+        with_items="items" in fields,
+        columns=[column for column in ORDER_COLUMNS if column in fields],
+        created_between=created_between,
+    )
+
+
 def scope_for_user(qs, user):
     """
     Admins (or holders of 'orders.view_all_orders') see all; others see their own.
@@ -35,3 +80,9 @@ def scope_for_user(qs, user):
     if user.has_perm("orders.view_all_orders"):
         return qs
     return qs.filter(customer_id=user.id)
+
+
+async def ascope_for_user(qs, user):
+    if await user.ahas_perm("orders.view_all_orders"):
+        return qs
+    return qs.filter(customer_id=user.id)
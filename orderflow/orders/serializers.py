@@ -1,3 +1,7 @@
+import uuid
+from typing import Optional
+
+from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 
@@ -26,8 +30,25 @@ class OrderItemReadSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+class CustomerSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = get_user_model()
+        fields = ("id", "username", "first_name", "last_name")
+        read_only_fields = fields
+
+
 class OrderReadSerializer(serializers.ModelSerializer):
+    """
+    Renders `context["fields"]` (see `output_fields`); without it, the default
+    fieldset plus the relations named in `context["expand"]`.
+    """
+
+    expandable_fields = ("customer", "items")
+    # Inlined unless the client picks a sparse fieldset with `?fields=`.
+    default_expand = ("items",)
+
     customer_id = serializers.UUIDField(read_only=True)
+    customer = CustomerSummarySerializer(read_only=True)
     items = OrderItemReadSerializer(many=True, read_only=True)
 
     class Meta:
@@ -35,6 +56,7 @@ class OrderReadSerializer(serializers.ModelSerializer):
         fields = (
             "id",
             "customer_id",
+            "customer",
             "total_price",
             "created_at",
             "updated_at",
@@ -42,8 +64,76 @@ class OrderReadSerializer(serializers.ModelSerializer):
         )
         read_only_fields = fields
 
+    @classmethod
+    def parse_expand(cls, raw: str) -> frozenset:
+        """
+        `?expand=customer` → relations to inline.
+        """
+        requested = {part.strip() for part in raw.split(",")}
+        return frozenset(requested & set(cls.expandable_fields))
+
+    @classmethod
+    def parse_fields(cls, raw: str) -> Optional[frozenset]:
+        """
+        `?fields=id,total_price` → requested fields; None when none are valid.
+        """
+        requested = {part.strip() for part in raw.split(",")}
+        return frozenset(requested & set(cls.Meta.fields)) or None
+
+    @classmethod
+    def output_fields(
+        cls, fields: Optional[frozenset] = None, expand: frozenset = frozenset()
+    ) -> frozenset:
+        """
+        `fields` (default: every non-relation field and `default_expand`) plus
+        the `expand`ed relations.
+        """
+        if fields is None:
+            fields = set(cls.Meta.fields) - set(cls.expandable_fields)
+            fields |= set(cls.default_expand)
+        return frozenset(fields) | expand
+
+    @classmethod
+    def fields_from_query(cls, params) -> frozenset:
+        """
+        `?fields=id,total_price&expand=customer,items` → fields to render.
+        """
+        return cls.output_fields(
+            cls.parse_fields(params.get("fields", "")),
+            cls.parse_expand(params.get("expand", "")),
+        )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        output = self.context.get("fields") or self.output_fields(
+            expand=self.context.get("expand", frozenset())
+        )
+        for name in list(self.fields):
+            if name not in output:
+                self.fields.pop(name)
+
 
 # ---------- Write side ----------
+class OrderItemListSerializer(serializers.ListSerializer):
+    """
+    Loads every referenced product in one query before the lines are validated.
+    """
+
+    def to_internal_value(self, data):
+        ids = set()
+        if isinstance(data, list):
+            for row in data:
+                try:
+                    ids.add(uuid.UUID(str(row["product"])))
+                except (TypeError, KeyError, ValueError, AttributeError):
+                    continue  # reported per line by the child
+        self.child.products = Product.objects.only("id", "is_active").in_bulk(ids)
+        try:
+            return super().to_internal_value(data)
+        finally:
+            self.child.products = None
+
+
 class OrderItemWriteSerializer(serializers.Serializer):
     """
     Write-contract for a line (upsert semantics):
@@ -54,11 +144,21 @@ class OrderItemWriteSerializer(serializers.Serializer):
     product = serializers.UUIDField()
     quantity = serializers.IntegerField(min_value=0)
 
+    # {id: Product} preloaded by OrderItemListSerializer
+    products = None
+
+    class Meta:
+        list_serializer_class = OrderItemListSerializer
+
+    def get_product(self, pid):
+        if self.products is not None:
+            return self.products.get(pid)
+        return Product.objects.only("id", "is_active").filter(id=pid).first()
+
     def validate(self, attrs):
         pid = attrs["product"]
-        try:
-            product = Product.objects.only("id", "is_active").get(id=pid)
-        except Product.DoesNotExist:
+        product = self.get_product(pid)
+        if product is None:
             raise serializers.ValidationError({"product": _("Product not found.")})
         if not product.is_active:
             raise serializers.ValidationError({"product": _("Product is inactive.")})
@@ -5,6 +5,9 @@ from typing import Dict, Iterable
 
 from django.db import transaction
 
+from orderflow.analytics import rollups
+from orderflow.contrib.metrics import timed
+
 from .models import Order, OrderItem, Product
 
 
@@ -50,10 +53,13 @@ def _bulk_update_quantities(lines: Iterable[OrderItem]):
 def _bulk_delete_ids(order: Order, ids: list):
     if not ids:
         return
-    OrderItem.objects.filter(order=order, id__in=ids).delete()
+    OrderItem.objects.filter(
+        order=order, order_created_at=order.created_at, id__in=ids
+    ).delete()
 
 
 # ---------- public API ----------
+@timed("create_order")
 @transaction.atomic
 def create_order(*, customer, items: Iterable[Dict]) -> Order:
     data = _normalize(items)
@@ -72,13 +78,18 @@ def create_order(*, customer, items: Iterable[Dict]) -> Order:
     _bulk_create_items(order, create_pairs)
 
     order.recalculate_totals(save=True)
+    lines = [(p.id, qty, p.unit_price) for p, qty in create_pairs]
+    rollups.record(None, rollups.snapshot(order, lines))
     return order
 
 
+@timed("update_order")
 @transaction.atomic
 def update_order(*, order: Order, items: Iterable[Dict]) -> Order:
-    # Lock order row
-    order = Order.objects.select_for_update().get(pk=order.pk)
+    # Lock order row (created_at narrows the lookup to its month's partition)
+    order = Order.objects.select_for_update().get(
+        pk=order.pk, created_at=order.created_at
+    )
 
     data = _normalize(items)
     product_ids = list(data.keys())
@@ -88,7 +99,11 @@ def update_order(*, order: Order, items: Iterable[Dict]) -> Order:
     locked_by_id = {p.id: p for p in locked}
 
     # Load existing lines once
-    existing = {li.product_id: li for li in order.items.select_related("product").all()}
+    lines = order.items.filter(order_created_at=order.created_at)
+    existing = {li.product_id: li for li in lines.select_related("product")}
+    before = rollups.snapshot(
+        order, [(pid, li.quantity, li.unit_price) for pid, li in existing.items()]
+    )
 
     to_delete_ids, to_update, to_create = [], [], []
 
@@ -114,10 +129,21 @@ def update_order(*, order: Order, items: Iterable[Dict]) -> Order:
     _bulk_create_items(order, to_create)
 
     order.recalculate_totals(save=True)
+    kept = [li for li in existing.values() if li.id not in to_delete_ids]
+    lines = [(li.product_id, li.quantity, li.unit_price) for li in kept]
+    lines += [(p.id, qty, p.unit_price) for p, qty in to_create]
+    rollups.record(before, rollups.snapshot(order, lines))
     return order
 
 
 @transaction.atomic
 def delete_order(*, order: Order) -> None:
-    order = Order.objects.select_for_update().get(pk=order.pk)
+    order = Order.objects.select_for_update().get(
+        pk=order.pk, created_at=order.created_at
+    )
+    lines = order.items.filter(order_created_at=order.created_at)
+    rollups.record(
+        rollups.snapshot(order, lines.values_list("product_id", "quantity", "unit_price")),
+        None,
+    )
     order.delete()
@@ -1,5 +1,6 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
 from .factories import ProductFactory, UserFactory
@@ -7,6 +8,12 @@ from .factories import ProductFactory, UserFactory
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    # Throttle counters live in the cache; don't let them leak between tests.
+    cache.clear()
+
+
 @pytest.fixture
 def user(db) -> User:  # type: ignore
     return UserFactory()
@@ -0,0 +1,140 @@
+from datetime import timedelta
+from io import StringIO
+from types import ModuleType
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import include, re_path, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from orderflow.contrib.routers import ExtendableRouter
+from orderflow.orders import archive, partitions
+from orderflow.orders import urls as orders_urls
+from orderflow.orders.models import ArchivedOrder, Order, OrderItem
+
+from .factories import OrderFactory, OrderItemFactory, ProductFactory, UserFactory
+from .test_views import grant_perm
+
+pytestmark = pytest.mark.django_db
+
+
+def detail_url(order) -> str:
+    return reverse("v1-orders-detail", args=[order.pk])
+
+
+@pytest.fixture
+def order(user):
+    order = OrderFactory(customer=user)
+    for price in ("2.50", "4.00"):
+        OrderItemFactory(order=order, product=ProductFactory(unit_price=price))
+    order.recalculate_totals()
+    return order
+
+
+def by_line(body: dict) -> dict:
+    # Lines have no defined order, in either tier.
+    return {**body, "items": sorted(body["items"], key=lambda line: line["id"])}
+
+
+def archive_now() -> int:
+    return archive.archive_orders(timezone.now() + timedelta(seconds=1), batch_size=1)
+
+
+class TestArchiveOrders:
+    def test_moves_orders_and_lines_out_of_the_hot_tables(self, order):
+        assert archive_now() == 1
+
+        assert not Order.objects.filter(pk=order.pk).exists()
+        assert not OrderItem.objects.filter(order_id=order.pk).exists()
+        archived = ArchivedOrder.objects.get(pk=order.pk)
+        assert archived.customer_id == order.customer_id
+        assert archived.total_price == order.total_price
+        assert sorted(line["unit_price"] for line in archived.items) == ["2.50", "4.00"]
+
+    def test_leaves_newer_orders(self, order):
+        assert archive.archive_orders(order.created_at) == 0
+        assert Order.objects.filter(pk=order.pk).exists()
+
+    def test_command(self, order):
+        month = partitions.add_months(partitions.current_month(), -3)
+        if partitions.is_supported(connection):
+            partitions.create_partitions(connection, month, month)
+        old = OrderFactory()
+        Order.objects.filter(pk=old.pk).update(
+            created_at=archive.cutoff(3) + timedelta(days=1)
+        )
+        out = StringIO()
+
+        call_command("archive_orders", "--older-than", "2", "--dry-run", stdout=out)
+        call_command("archive_orders", "--older-than", "2", stdout=out)
+
+        assert "Would archive 1 order(s)" in out.getvalue()
+        assert "Archived 1 order(s)" in out.getvalue()
+        assert list(ArchivedOrder.objects.values_list("pk", flat=True)) == [old.pk]
+
+
+class TestArchivedReads:
+    def test_retrieve_renders_the_archived_order_unchanged(self, user, order):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = detail_url(order) + "?expand=customer,items"
+        before = client.get(url).json()
+
+        archive_now()
+
+        response = client.get(url)
+        assert response.status_code == 200
+        assert by_line(response.json()) == by_line(before)
+
+    def test_sparse_fields(self, user, order):
+        archive_now()
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        body = client.get(detail_url(order) + "?fields=id,total_price").json()
+
+        assert body == {"id": str(order.pk), "total_price": str(order.total_price)}
+
+    def test_scoped_like_the_hot_tables(self, order, other_user):
+        archive_now()
+        client = APIClient()
+        client.force_authenticate(user=other_user)
+
+        assert client.get(detail_url(order)).status_code == 404
+        admin = grant_perm(UserFactory(), "view_all_orders")
+        client.force_authenticate(user=admin)
+        assert client.get(detail_url(order)).status_code == 200
+
+    def test_lists_and_writes_only_see_hot_orders(self, user, order, product):
+        archive_now()
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        assert client.get(reverse("v1-orders-list")).json()["count"] == 0
+        response = client.put(
+            detail_url(order),
+            {"items": [{"product": str(product.pk), "quantity": 1}]},
+            format="json",
+        )
+        assert response.status_code == 404
+        assert client.get(reverse("v1-orders-detail", args=["nope"])).status_code == 404
+
+    def test_async_retrieve(self, user, order, settings):
+        settings.ASYNC_VIEWS_ENABLED = True
+        router = ExtendableRouter()
+        router.extend(orders_urls.router, async_views=orders_urls.async_views)
+        urlconf = ModuleType("async_urls")
+        urlconf.urlpatterns = [re_path(r"^api/", include(router.urls))]
+        settings.ROOT_URLCONF = urlconf
+        url = f"/api/v1/orders/{order.pk}/?expand=customer"
+        bearer = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+        client = APIClient()
+        before = client.get(url, **bearer).json()
+
+        archive_now()
+
+        assert by_line(client.get(url, **bearer).json()) == by_line(before)
+        assert client.get("/api/v1/orders/nope/", **bearer).status_code == 404
@@ -0,0 +1,136 @@
+import json
+import logging
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from orderflow.orders import index_advisor as advisor
+from orderflow.orders.index_advisor import Combination
+
+from .factories import OrderItemFactory
+
+pytestmark = pytest.mark.django_db
+
+needs_postgres = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="the index advisor needs PostgreSQL"
+)
+
+
+def log_line(filters=(), ordering=None, **fields) -> str:
+    entry = {"route": advisor.LIST_ROUTE, "method": "GET", "status": 200}
+    entry.update(filters=list(filters), ordering=ordering, **fields)
+    return json.dumps(entry)
+
+
+def index_exists(name: str) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [name])
+        return cursor.fetchone()[0] is not None
+
+
+class TestReadLog:
+    def test_counts_list_combinations(self):
+        lines = [
+            log_line(["min_total"], "-updated_at"),
+            log_line(["min_total"], "-updated_at"),
+            log_line(),
+            log_line(["created_to", "bogus"], "nope,total_price"),
+            log_line(route="v1-orders-detail"),
+            log_line(status=400),
+            "Starting server...",
+        ]
+
+        counts = advisor.read_log(lines)
+
+        assert counts == {
+            Combination(("min_total",), ("-updated_at",)): 2,
+            Combination(()): 1,
+            Combination(("created_to",), ("total_price",)): 1,
+        }
+        assert Combination(("created_from", "created_to")).columns == ["created_at"]
+
+    def test_list_requests_log_their_filters_and_ordering(self, user, caplog, settings):
+        settings.REQUEST_LOG_SAMPLE_RATE = 1.0
+        caplog.set_level(logging.INFO, logger="orderflow.requests")
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        client.get(
+            reverse("v1-orders-list"), {"min_total": "5", "ordering": "-total_price"}
+        )
+
+        (line,) = [r for r in caplog.records if r.name == "orderflow.requests"]
+        assert line.filters == ["min_total"] and line.ordering == "-total_price"
+
+
+@needs_postgres
+class TestCandidates:
+    def test_skip_existing_keys(self):
+        # Order.Meta.indexes already has (customer, created_at).
+        assert advisor.candidates(Combination(("created_from",)), scoped=True) == []
+
+        indexes = advisor.candidates(Combination(("min_total",)), scoped=True)
+
+        assert {tuple(index.fields) for index in indexes} == {
+            ("customer", "total_price")
+        }
+        assert [index.include for index in indexes] == [
+            ("created_at",),
+            ("id", "created_at", "updated_at"),
+        ]
+
+    def test_tried_indexes_are_rolled_back(self, user):
+        OrderItemFactory(order__customer=user)
+        combination = Combination(("min_total",), ("-updated_at",))
+        qs = advisor.list_query(combination, advisor.sample_values(user.pk), user.pk)
+        (index, *_) = advisor.candidates(combination, scoped=True)
+
+        plan, size = advisor.try_index(index, qs)
+
+        assert plan.cost > 0 and size > 0
+        assert not index_exists(index.name)
+
+    def test_write_migration(self, tmp_path):
+        (index, *_) = advisor.candidates(Combination(("min_total",)), scoped=True)
+
+        path = advisor.write_migration([index], tmp_path)
+
+        source = path.read_text()
+        assert path.name.endswith("_advised_indexes.py")
+        assert "migrations.AddIndex(" in source and index.name in source
+
+
+@needs_postgres
+class TestAdviseIndexesCommand:
+    def test_reports_and_recommends(self, user, tmp_path):
+        for _ in range(3):
+            OrderItemFactory(order__customer=user)
+        logs = tmp_path / "requests.log"
+        logs.write_text("\n".join([log_line(["min_total"], "-updated_at")] * 2))
+        out = StringIO()
+
+        call_command(
+            "advise_indexes",
+            str(logs),
+            "--customer",
+            str(user.pk),
+            stdout=out,
+        )
+
+        output = out.getvalue()
+        assert "2 list requests, 1 combinations" in output
+        assert "min_total / -updated_at  (2 requests)" in output
+        assert "models.Index(fields=['customer', 'updated_at']" in output
+        # A few rows: a sequential scan beats any index.
+        assert "No index saves 20% on any combination." in output
+
+    def test_needs_list_requests(self, tmp_path):
+        logs = tmp_path / "requests.log"
+        logs.write_text(log_line(route="v1-orders-detail"))
+
+        with pytest.raises(CommandError, match="No v1-orders-list requests"):
+            call_command("advise_indexes", str(logs), "--unscoped")
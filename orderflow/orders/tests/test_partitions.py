@@ -0,0 +1,153 @@
+from datetime import datetime, timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from orderflow.orders import partitions as p
+from orderflow.orders.models import Order, OrderItem
+
+from .factories import OrderFactory, OrderItemFactory
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        not p.is_supported(connection), reason="partitioning needs PostgreSQL"
+    ),
+]
+
+
+def partition_of(table: str, pk) -> str:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT tableoid::regclass::text FROM {table} WHERE id = %s", [pk]
+        )
+        return cursor.fetchone()[0]
+
+
+def old_order(month):
+    """
+    An order with one line, created in `month` (in the DEFAULT partitions if the
+    month has none).
+    """
+    order = OrderFactory()
+    created = datetime(month.year, month.month, 15, tzinfo=timezone.utc)
+    Order.objects.filter(pk=order.pk).update(created_at=created)
+    order.refresh_from_db()
+    return order, OrderItemFactory(order=order)
+
+
+class TestMonths:
+    def test_add_months_crosses_years(self):
+        month = p.month_start(datetime(2026, 11, 30))
+        assert p.add_months(month, 2).isoformat() == "2027-01-01"
+        assert p.add_months(month, -11).isoformat() == "2025-12-01"
+        assert p.partition_name(p.ORDERS, month) == "orders_order_y2026m11"
+
+
+class TestPartitions:
+    def test_migration_creates_current_and_coming_months(self):
+        current = p.current_month()
+        expected = p.month_range(current, p.add_months(current, p.AHEAD))
+        for table in (p.ORDERS, p.ITEMS):
+            assert set(expected) <= set(p.partitions(connection, table))
+
+    def test_lines_live_in_their_orders_month(self):
+        month = p.add_months(p.current_month(), -5)
+        p.create_partitions(connection, month, month)
+        order, item = old_order(month)
+
+        assert item.order_created_at == order.created_at
+        assert partition_of(p.ORDERS, order.pk) == p.partition_name(p.ORDERS, month)
+        assert partition_of(p.ITEMS, item.pk) == p.partition_name(p.ITEMS, month)
+
+    def test_orders_beyond_the_last_partition_go_to_default(self):
+        month = p.add_months(p.partitions(connection)[-1], 2)
+        order, item = old_order(month)
+
+        assert partition_of(p.ORDERS, order.pk) == p.default_name(p.ORDERS)
+        assert partition_of(p.ITEMS, item.pk) == p.default_name(p.ITEMS)
+        assert p.default_months(connection) == [month]
+
+    def test_date_filters_prune_partitions(self):
+        current = p.current_month()
+        start = datetime(current.year, current.month, 1, tzinfo=timezone.utc)
+        plan = Order.objects.filter(created_at__gte=start).explain()
+        assert p.partition_name(p.ORDERS, current) in plan
+        assert p.partition_name(p.ORDERS, p.add_months(current, -1)) not in plan
+
+    def test_filtered_list_bounds_the_items_prefetch(self, user):
+        order = OrderItemFactory(order__customer=user).order
+        client = APIClient()
+        client.force_authenticate(user=user)
+        created = order.created_at.isoformat()
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(
+                reverse("v1-orders-list"),
+                {"created_from": created, "created_to": created},
+            )
+
+        assert [row["id"] for row in response.json()["results"]] == [str(order.pk)]
+        assert len(response.json()["results"][0]["items"]) == 1
+        items_sql = next(q["sql"] for q in ctx.captured_queries if p.ITEMS in q["sql"])
+        assert '"order_created_at" >=' in items_sql
+        assert '"order_created_at" <=' in items_sql
+
+
+class TestPartitionOrdersCommand:
+    def run(self, *args) -> str:
+        out = StringIO()
+        call_command("partition_orders", *args, stdout=out)
+        return out.getvalue()
+
+    def test_creates_missing_months_once(self):
+        last = p.add_months(p.current_month(), p.AHEAD + 2)
+
+        assert "Would have: 2 partition(s) created" in self.run(
+            "--ahead", str(p.AHEAD + 2), "--dry-run"
+        )
+        assert last not in p.partitions(connection)
+
+        out = self.run("--ahead", str(p.AHEAD + 2))
+        assert f"Created {last:%Y-%m}" in out
+        assert last in p.partitions(connection, p.ITEMS)
+        assert "0 partition(s) created" in self.run("--ahead", str(p.AHEAD + 2))
+
+    def test_moves_rows_out_of_the_default_partitions(self):
+        month = p.add_months(p.current_month(), p.AHEAD + 5)
+        order, item = old_order(month)
+
+        assert "Would have: 1 partition(s) created" in self.run("--dry-run")
+        out = self.run()
+
+        assert f"Created {month:%Y-%m}" in out
+        assert partition_of(p.ORDERS, order.pk) == p.partition_name(p.ORDERS, month)
+        assert partition_of(p.ITEMS, item.pk) == p.partition_name(p.ITEMS, month)
+        assert p.default_months(connection) == []
+        order.delete()  # the lines' foreign key still cascades
+        assert not OrderItem.objects.filter(pk=item.pk).exists()
+
+    def test_detaches_old_months_into_the_archive_schema(self):
+        month = p.add_months(p.current_month(), -14)
+        p.create_partitions(connection, month, month)
+        order, item = old_order(month)
+        recent = OrderFactory()
+
+        out = self.run("--detach-older-than", "12")
+
+        assert f"Detached {month:%Y-%m}" in out
+        assert not Order.objects.filter(pk=order.pk).exists()
+        assert Order.objects.filter(pk=recent.pk).exists()
+        assert month not in p.partitions(connection, p.ITEMS)
+        orders = f"{p.ARCHIVE_SCHEMA}.{p.partition_name(p.ORDERS, month)}"
+        items = f"{p.ARCHIVE_SCHEMA}.{p.partition_name(p.ITEMS, month)}"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT o.id, i.id FROM {orders} o JOIN {items} i ON i.order_id = o.id"
+            )
+            assert cursor.fetchall() == [(order.pk, item.pk)]
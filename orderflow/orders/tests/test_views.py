@@ -1,13 +1,23 @@
 from decimal import Decimal
+from types import ModuleType
 
 import pytest
 from django.contrib.auth.models import Permission
-from django.urls import reverse
+from django.test import override_settings
+from django.urls import include, re_path, resolve, reverse
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
+from orderflow.contrib import db_routers
+from orderflow.contrib.routers import ExtendableRouter
+from orderflow.orders import urls as orders_urls
+from orderflow.orders import views as order_views
+from orderflow.orders.async_views import OrderListAsyncView
 from orderflow.orders.models import Order, OrderItem
+from orderflow.orders.selectors import scope_for_user
 
-from .factories import OrderFactory, ProductFactory
+from .factories import OrderFactory, OrderItemFactory, ProductFactory
 
 pytestmark = pytest.mark.django_db
 
@@ -52,6 +62,34 @@ class TestListAndRetrieve:
         ids = {r["id"] for r in rows}
         assert {str(o1.id), str(o2.id)}.issubset(ids)
 
+    def test_list_without_expand_has_no_customer(self, user, client: APIClient):
+        OrderFactory(customer=user)
+        client.force_authenticate(user=user)
+        row = client.get(self.list_url).json()["results"][0]
+        assert "customer" not in row
+
+    def test_list_expand_customer_joins_display_fields(
+        self, user, other_user, client: APIClient, django_assert_num_queries
+    ):
+        grant_perm(user, "view_all_orders")
+        for customer in (user, other_user, other_user):
+            OrderFactory(customer=customer)
+        client.force_authenticate(user=user)
+
+        # perms, count, orders joined with customers, items prefetch
+        with django_assert_num_queries(5):
+            resp = client.get(self.list_url + "?expand=customer")
+
+        rows = resp.json()["results"]
+        assert len(rows) == 3
+        by_customer = {r["customer"]["id"]: r["customer"] for r in rows}
+        assert by_customer[str(other_user.id)] == {
+            "id": str(other_user.id),
+            "username": other_user.username,
+            "first_name": other_user.first_name,
+            "last_name": other_user.last_name,
+        }
+
     def test_retrieve_own_ok(self, user, client: APIClient):
         order = OrderFactory(customer=user)
         client.force_authenticate(user=user)
@@ -67,6 +105,52 @@ class TestListAndRetrieve:
         resp = client.get(f"/api/v1/orders/{order.id}/")
         assert resp.status_code == 404
 
+    def test_list_queries_do_not_grow_with_page_size(
+        self, user, client: APIClient, monkeypatch, query_recorder
+    ):
+        for _ in range(25):
+            OrderItemFactory.create_batch(3, order=OrderFactory(customer=user))
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+
+        counts = []
+        for page_size in (2, 20):
+            monkeypatch.setattr(PageNumberPagination, "page_size", page_size)
+            with query_recorder() as recorder:
+                resp = client.get(self.list_url, **headers)
+            assert len(resp.json()["results"]) == page_size
+            counts.append(recorder.count)
+        assert counts[0] == counts[1] <= order_views.OrderViewSetV1.query_budgets["list"]
+
+    def test_sparse_fields_skip_items_and_narrow_columns(
+        self, user, client: APIClient, django_assert_num_queries
+    ):
+        grant_perm(user, "view_all_orders")
+        OrderItemFactory(order=OrderFactory(customer=user))
+        client.force_authenticate(user=user)
+
+        # perms, count, orders (no items prefetch)
+        with django_assert_num_queries(4) as ctx:
+            resp = client.get(self.list_url + "?fields=id,total_price,created_at")
+
+        assert set(resp.json()["results"][0]) == {"id", "total_price", "created_at"}
+        orders_sql = ctx.captured_queries[-1]["sql"]
+        assert '"total_price"' in orders_sql
+        assert '"updated_at"' not in orders_sql
+        assert "orders_orderitem" not in orders_sql
+
+    def test_sparse_fields_with_expanded_items(self, user, client: APIClient):
+        item = OrderItemFactory(order=OrderFactory(customer=user))
+        client.force_authenticate(user=user)
+        row = client.get(self.list_url + "?fields=id&expand=items").json()["results"][0]
+        assert set(row) == {"id", "items"}
+        assert row["items"][0]["product_name"] == item.product.name
+
+    def test_unknown_fields_fall_back_to_default(self, user, client: APIClient):
+        order = OrderFactory(customer=user)
+        client.force_authenticate(user=user)
+        data = client.get(f"/api/v1/orders/{order.id}/?fields=nope").json()
+        assert "items" in data and "total_price" in data and "customer" not in data
+
 
 class TestCreate:
     url = reverse("v1-orders-list")
@@ -102,6 +186,32 @@ class TestCreate:
         body = resp.json()
         assert "product" in body["items"][0]
 
+    def test_create_looks_up_products_once(self, user, client: APIClient, query_recorder):
+        products = ProductFactory.create_batch(5)
+        client.force_authenticate(user=user)
+        payload = {"items": [{"product": str(p.id), "quantity": 1} for p in products]}
+        with query_recorder() as recorder:
+            resp = client.post(self.url, payload, format="json")
+        assert resp.status_code == 201
+        assert len(resp.json()["items"]) == 5
+        assert recorder.duplicates() == {}
+
+    def test_create_reports_errors_per_line(self, user, client: APIClient):
+        product = ProductFactory()
+        client.force_authenticate(user=user)
+        payload = {
+            "items": [
+                {"product": str(product.id), "quantity": 1},
+                {"product": "3f4c9b4c-4a8e-4c6d-9b8a-8e9a3a6a2f10", "quantity": 1},
+                {"product": "not-a-uuid", "quantity": 1},
+            ]
+        }
+        resp = client.post(self.url, payload, format="json")
+        assert resp.status_code == 400
+        items = resp.json()["items"]
+        assert items[0] == {}
+        assert "product" in items[1] and "product" in items[2]
+
 
 class TestUpdateAndDelete:
     def test_owner_can_update(self, user, client: APIClient):
@@ -218,3 +328,133 @@ class TestFilteringAndOrdering:
 
         totals = [D(r["total_price"]) for r in rows]
         assert totals == sorted(totals)
+
+
+class TestReplicaRouting:
+    list_url = reverse("v1-orders-list")
+
+    @pytest.fixture(autouse=True)
+    def read_aliases(self, settings, monkeypatch):
+        # "default" stands in for a replica; record where each list request reads.
+        settings.DATABASE_REPLICAS = ["default"]
+        seen = []
+
+        def spy(qs, user):
+            seen.append(db_routers.current_read_alias())
+            return scope_for_user(qs, user)
+
+        monkeypatch.setattr(order_views, "scope_for_user", spy)
+        return seen
+
+    def test_reads_use_replica_until_user_writes(self, user, other_user, product, read_aliases):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        client.get(self.list_url)
+        assert read_aliases == ["default"]
+
+        resp = client.post(
+            self.list_url,
+            {"items": [{"product": str(product.id), "quantity": 1}]},
+            format="json",
+        )
+        assert resp.status_code == 201
+        client.get(self.list_url)
+        assert read_aliases[-1] is None  # pinned to the primary
+
+        other = APIClient()
+        other.force_authenticate(user=other_user)
+        other.get(self.list_url)
+        assert read_aliases[-1] == "default"
+
+        assert db_routers.current_read_alias() is None
+
+
+class TestAsyncReads:
+    """
+    The ASGI routes: GET served by async views, other methods by the viewset.
+    """
+
+    list_url = "/api/v1/orders/"
+
+    @pytest.fixture(autouse=True)
+    def async_urls(self, settings):
+        settings.ASYNC_VIEWS_ENABLED = True
+        router = ExtendableRouter()
+        router.extend(orders_urls.router, async_views=orders_urls.async_views)
+        urlconf = ModuleType("async_urls")
+        urlconf.urlpatterns = [re_path(r"^api/", include(router.urls))]
+        settings.ROOT_URLCONF = urlconf
+
+    def bearer(self, user):
+        return {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+
+    def test_routes_use_async_views(self):
+        assert resolve(self.list_url).func.view_class is OrderListAsyncView
+
+    def test_list_matches_sync_viewset(self, user, other_user, client):
+        for customer in (user, user, other_user):
+            OrderFactory(customer=customer)
+        url = self.list_url + "?expand=customer&ordering=total_price"
+
+        async_body = client.get(url, **self.bearer(user)).json()
+
+        sync_client = APIClient()
+        sync_client.force_authenticate(user=user)
+        with override_settings(ROOT_URLCONF="orderflow.urls"):
+            sync_body = sync_client.get(url).json()
+        assert async_body["count"] == 2
+        assert async_body == sync_body
+
+    def test_sparse_fields_match_sync_viewset(self, user, client):
+        OrderItemFactory(order=OrderFactory(customer=user))
+        url = self.list_url + "?fields=id,total_price&expand=items"
+
+        async_body = client.get(url, **self.bearer(user)).json()
+
+        sync_client = APIClient()
+        sync_client.force_authenticate(user=user)
+        with override_settings(ROOT_URLCONF="orderflow.urls"):
+            sync_body = sync_client.get(url).json()
+        assert set(async_body["results"][0]) == {"id", "total_price", "items"}
+        assert async_body == sync_body
+
+    def test_list_filters_and_paginates(self, user, client, settings):
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "PAGE_SIZE": 2}
+        for total in ("5.00", "15.00", "25.00", "35.00"):
+            OrderFactory(customer=user, total_price=total)
+
+        body = client.get(
+            self.list_url + "?min_total=10&ordering=-total_price", **self.bearer(user)
+        ).json()
+        assert body["count"] == 3
+        assert [r["total_price"] for r in body["results"]] == ["35.00", "25.00"]
+        assert "page=2" in body["next"] and body["previous"] is None
+
+        resp = client.get(self.list_url + "?page=9", **self.bearer(user))
+        assert resp.status_code == 404
+
+    def test_anonymous_gets_401_with_challenge(self, client):
+        resp = client.get(self.list_url)
+        assert resp.status_code == 401
+        assert resp["WWW-Authenticate"].startswith("Bearer")
+
+    def test_retrieve_is_scoped(self, user, other_user, client):
+        own = OrderFactory(customer=user)
+        other = OrderFactory(customer=other_user)
+
+        resp = client.get(f"{self.list_url}{own.id}/", **self.bearer(user))
+        assert resp.status_code == 200
+        assert resp.json()["id"] == str(own.id)
+        for pk in (other.id, "not-a-uuid"):
+            resp = client.get(f"{self.list_url}{pk}/", **self.bearer(user))
+            assert resp.status_code == 404
+
+    def test_writes_fall_back_to_viewset(self, user, product, client):
+        resp = client.post(
+            self.list_url,
+            {"items": [{"product": str(product.id), "quantity": 2}]},
+            content_type="application/json",
+            **self.bearer(user),
+        )
+        assert resp.status_code == 201
+        assert resp.json()["total_price"] == "20.00"
@@ -1,5 +1,6 @@
 from rest_framework.routers import DefaultRouter
 
+from .async_views import OrderDetailAsyncView, OrderListAsyncView
 from .views import OrderViewSetV1
 
 app_name = "orders"
@@ -7,4 +8,10 @@ app_name = "orders"
 router = DefaultRouter()
 router.register("v1/orders", OrderViewSetV1, basename="v1-orders")
 
+# GET handlers used instead of the viewset's when serving over ASGI
+async_views = {
+    "v1-orders-list": OrderListAsyncView,
+    "v1-orders-detail": OrderDetailAsyncView,
+}
+
 urlpatterns = []
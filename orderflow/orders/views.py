@@ -1,17 +1,26 @@
+from django.core.exceptions import ValidationError
+from django.http import Http404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.filters import OrderingFilter
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from . import schemas  # method-level docs live here
+from orderflow.contrib.docs import schemas_for
+from orderflow.contrib.request_log import annotate
+from orderflow.contrib.views import ReplicaReadMixin
+
+from . import archive, services
 from .filters import OrderFilter
+from .models import ArchivedOrder
 from .permissions import IsOwnerOrHasOrderPerms
-from .selectors import order_base_qs, scope_for_user
+from .selectors import order_base_qs, order_qs_for_fields, scope_for_user
 from .serializers import OrderCreateSerializer, OrderReadSerializer, OrderUpdateSerializer
 
+schemas = schemas_for(__package__)  # method-level docs live here
+
 
-class OrderViewSetV1(viewsets.ModelViewSet):
+class OrderViewSetV1(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     CRUD with RBAC and filtering:
       - list/retrieve: customer → own orders; admin → all
@@ -27,9 +36,53 @@ class OrderViewSetV1(viewsets.ModelViewSet):
     ordering_fields = ("created_at", "updated_at", "total_price")
     ordering = ("-created_at",)
 
+    # Max queries per request, JWT auth and permission lookups included; enforced
+    # in tests and logged in production by QueryBudgetMiddleware.
+    query_budgets = {
+        "list": 6,
+        "retrieve": 5,
+        "create": 12,
+        "update": 17,
+        "partial_update": 17,
+        "destroy": 10,
+    }
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if "pk" in kwargs:
+            annotate(request, order_id=kwargs["pk"])
+
+    def get_output_fields(self) -> frozenset:
+        """
+        `?fields=` / `?expand=` → fields to render (see OrderReadSerializer).
+        """
+        return OrderReadSerializer.fields_from_query(self.request.query_params)
+
     def get_queryset(self):
-        # Tiny and clear: base → scope
-        return scope_for_user(order_base_qs(), self.request.user)
+        # Tiny and clear: base (narrowed to the rendered fields on reads) → scope
+        if self.action == "list":
+            created = OrderFilter.created_between(self.request.query_params)
+            qs = order_qs_for_fields(self.get_output_fields(), created_between=created)
+        elif self.action == "retrieve":
+            qs = order_qs_for_fields(self.get_output_fields())
+        else:
+            qs = order_base_qs(with_items=False)
+        return scope_for_user(qs, self.request.user)
+
+    def read_back(self, order):
+        """
+        The written order with its items loaded in one go (not one query per line),
+        both lookups pinned to the partitions of its month.
+        """
+        created = (order.created_at, order.created_at)
+        return order_base_qs(created_between=created).get(
+            pk=order.pk, created_at=order.created_at
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.get_output_fields()
+        return context
 
     def get_serializer_class(self):
         return {
@@ -45,19 +98,38 @@ class OrderViewSetV1(viewsets.ModelViewSet):
 
     @schemas.list_schema
     def list(self, request, *args, **kwargs):
+        annotate(request, **OrderFilter.log_fields(request.query_params))
         return super().list(request, *args, **kwargs)
 
     @schemas.retrieve_schema
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        try:
+            instance = self.get_object()
+        except Http404:
+            instance = self.get_archived_object()
+        return Response(self.get_serializer(instance).data)
+
+    def get_archived_object(self):
+        """
+        The order from the archive tier, for ids no longer in the hot tables.
+        """
+        try:
+            order = archive.find(
+                self.kwargs["pk"], self.request.user, self.get_output_fields()
+            )
+        except (ArchivedOrder.DoesNotExist, ValidationError):
+            raise Http404("No Order matches the given query.")
+        self.check_object_permissions(self.request, order)
+        return order
 
     @schemas.create_schema
     def create(self, request, *args, **kwargs):
         ser = self.get_serializer(data=request.data, context={"request": request})
         ser.is_valid(raise_exception=True)
         order = ser.save()
+        annotate(request, order_id=str(order.pk))
         return Response(
-            OrderReadSerializer(order, context={"request": request}).data,
+            OrderReadSerializer(self.read_back(order), context={"request": request}).data,
             status=status.HTTP_201_CREATED,
         )
 
@@ -70,7 +142,7 @@ class OrderViewSetV1(viewsets.ModelViewSet):
         ser.is_valid(raise_exception=True)
         order = ser.save()
         return Response(
-            OrderReadSerializer(order, context={"request": request}).data,
+            OrderReadSerializer(self.read_back(order), context={"request": request}).data,
             status=status.HTTP_200_OK,
         )
 
@@ -82,3 +154,6 @@ class OrderViewSetV1(viewsets.ModelViewSet):
     @schemas.destroy_schema
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
+
+    def perform_destroy(self, instance):
+        services.delete_order(order=instance)  # keeps the analytics rollups in step
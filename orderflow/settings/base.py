@@ -2,6 +2,7 @@
 Base settings to build other settings files upon.
 """
 
+import copy
 from datetime import timedelta
 from pathlib import Path
 
@@ -29,6 +30,9 @@ USE_I18N = True
 USE_TZ = True
 # https://docs.djangoproject.com/en/dev/ref/settings/#locale-paths
 # LOCALE_PATHS = [str(BASE_DIR / "locale")]
+# Primary keys of new rows: 7 (time-ordered, see orderflow.contrib.models.uuid7) or 4
+# (random). Either kind can already be in a table; only new rows follow the setting.
+UUID_PK_VERSION = env.int("UUID_PK_VERSION", default=7)
 
 
 # DATABASES
@@ -43,9 +47,61 @@ DATABASES = {
         "PASSWORD": env("POSTGRES_PASSWORD"),
         "HOST": env("POSTGRES_HOST"),
         "PORT": env("POSTGRES_PORT"),
+        # Reuse a connection across requests instead of reconnecting every time.
+        "CONN_MAX_AGE": env.int("DB_CONN_MAX_AGE", default=60),
+        # Ping reused/pooled connections before handing them out.
+        "CONN_HEALTH_CHECKS": env.bool("DB_CONN_HEALTH_CHECKS", default=True),
+        "OPTIONS": {},
     }
 }
 
+# https://docs.djangoproject.com/en/dev/ref/databases/#connection-pool
+# Process-wide psycopg pool shared by all threads (WSGI gthread workers and ASGI).
+# Mutually exclusive with persistent connections, so CONN_MAX_AGE drops to 0.
+if env.bool("DB_POOL_ENABLED", default=False):
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": env.int("DB_POOL_MIN_SIZE", default=2),
+        "max_size": env.int("DB_POOL_MAX_SIZE", default=10),
+        # seconds a request waits for a free connection before failing
+        "timeout": env.float("DB_POOL_TIMEOUT", default=10.0),
+        # seconds an idle connection above min_size is kept
+        "max_idle": env.float("DB_POOL_MAX_IDLE", default=300.0),
+        # recycle connections periodically (server-side memory, failover)
+        "max_lifetime": env.float("DB_POOL_MAX_LIFETIME", default=3600.0),
+    }
+
+# Read replicas: POSTGRES_REPLICA_HOSTS=replica1,replica2:5433 adds "replica_1", ...
+# with the primary's credentials. Safe-method requests to views using
+# `ReplicaReadMixin` read from a random replica; see orderflow.contrib.db_routers.
+DATABASE_REPLICAS = []
+for number, address in enumerate(env.list("POSTGRES_REPLICA_HOSTS", default=[]), 1):
+    host, _, port = address.partition(":")
+    alias = f"replica_{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "OPTIONS": copy.deepcopy(DATABASES["default"]["OPTIONS"]),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+# https://docs.djangoproject.com/en/dev/topics/db/multi-db/#database-routers
+DATABASE_ROUTERS = ["orderflow.contrib.db_routers.ReplicaRouter"]
+# Seconds a user's reads stay on the primary after they write (read-your-writes).
+# The pins live in the default cache, which must be shared (CACHE_URL) with more
+# than one worker process (check contrib.W001).
+DATABASE_REPLICA_PIN_SECONDS = env.int("DB_REPLICA_PIN_SECONDS", default=5)
+
+# CACHES
+# ------------------------------------------------------------------------------
+# https://docs.djangoproject.com/en/dev/ref/settings/#caches
+# e.g. CACHE_URL=redis://redis:6379/1 to share state between worker processes
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
 
 # URLS
 # ------------------------------------------------------------------------------
@@ -54,6 +110,12 @@ ROOT_URLCONF = "orderflow.urls"
 # https://docs.djangoproject.com/en/dev/ref/settings/#wsgi-application
 WSGI_APPLICATION = "orderflow.wsgi.application"
 
+# API DOCS
+# ------------------------------------------------------------------------------
+# Swagger/Redoc, drf_spectacular and the per-app `schemas` modules are only
+# imported when enabled (see orderflow.contrib.docs); production.py disables them.
+API_DOCS_ENABLED = env.bool("API_DOCS_ENABLED", default=True)
+
 # APPS
 # ------------------------------------------------------------------------------
 DJANGO_APPS = [
@@ -67,16 +129,18 @@ DJANGO_APPS = [
 ]
 THIRD_PARTY_APPS = [
     "rest_framework",
-    "drf_spectacular",
     "django_filters",
     "rest_framework_simplejwt",
     "rest_framework_simplejwt.token_blacklist",
 ]
+if API_DOCS_ENABLED:
+    THIRD_PARTY_APPS += ["drf_spectacular"]
 
 LOCAL_APPS = [
     "orderflow.contrib",
     "orderflow.users",
     "orderflow.orders",
+    "orderflow.analytics",
 ]
 
 # https://docs.djangoproject.com/en/dev/ref/settings/#installed-apps
@@ -103,13 +167,104 @@ AUTH_PASSWORD_VALIDATORS = [
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "orderflow.contrib.profiling.ProfilingMiddleware",
+    "orderflow.contrib.request_log.RequestLogMiddleware",
+    "orderflow.contrib.metrics.MetricsMiddleware",
+    "orderflow.contrib.query_budget.QueryBudgetMiddleware",
+    "orderflow.contrib.middleware.CompressionMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "orderflow.contrib.middleware.BrowserOnlyMiddleware",
+]
+# Only the admin (and other browser pages) use sessions, CSRF and messages; token
+# authenticated paths below skip these layers entirely.
+BROWSER_MIDDLEWARE = [
+    "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
+BROWSER_MIDDLEWARE_EXCLUDE_PATHS = ["/api/", "/internal/"]
+# The admin's own middleware checks only look at MIDDLEWARE; contrib.E001 checks
+# BROWSER_MIDDLEWARE instead.
+SILENCED_SYSTEM_CHECKS = ["admin.E408", "admin.E409", "admin.E410"]
+
+
+# COMPRESSION
+# ------------------------------------------------------------------------------
+# gzip, or zstd when `zstandard` is installed and the client accepts it. Levels
+# trade CPU per request for bytes on the wire (gzip 1-9, zstd 1-22).
+COMPRESSION_MIN_SIZE = env.int("COMPRESSION_MIN_SIZE", default=1024)
+COMPRESSION_GZIP_LEVEL = env.int("COMPRESSION_GZIP_LEVEL", default=6)
+COMPRESSION_ZSTD_LEVEL = env.int("COMPRESSION_ZSTD_LEVEL", default=3)
+COMPRESSION_CONTENT_TYPES = [
+    "application/json",
+    "application/vnd.oai.openapi+json",
+    "application/x-ndjson",
+    "text/csv",
+]
+
+
+# QUERY BUDGETS
+# ------------------------------------------------------------------------------
+# Per-request query counting against views' declared budgets, plus N+1 detection
+# (see orderflow/contrib/query_budget.py): "off", "warn" (log) or "raise".
+QUERY_BUDGET_MODE = env("QUERY_BUDGET_MODE", default="off")
+QUERY_BUDGET_DUPLICATE_THRESHOLD = env.int("QUERY_BUDGET_DUPLICATE_THRESHOLD", default=3)
+
+
+# METRICS
+# ------------------------------------------------------------------------------
+# Prometheus metrics at /internal/metrics/ (see orderflow/contrib/metrics.py).
+# Scrapers send `Authorization: Bearer $METRICS_TOKEN`; with no token set the
+# endpoint is only served when DEBUG is on.
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=True)
+METRICS_TOKEN = env("METRICS_TOKEN", default=None)
+
+
+# LOGGING
+# ------------------------------------------------------------------------------
+# https://docs.djangoproject.com/en/dev/topics/logging/
+# Application logs are JSON lines on stdout, written by a listener thread so a
+# request never waits on I/O (see orderflow/contrib/request_log.py).
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "json": {
+            "()": "orderflow.contrib.request_log.QueuedHandler",
+            "maxsize": env.int("LOG_QUEUE_SIZE", default=10_000),
+        },
+    },
+    "loggers": {
+        "orderflow": {
+            "handlers": ["json"],
+            "level": env("LOG_LEVEL", default="INFO"),
+        },
+    },
+}
+# One line per request in `orderflow.requests`: every error (>= 400), write and
+# request slower than REQUEST_LOG_SLOW_MS, and this fraction of successful reads.
+REQUEST_LOG_ENABLED = env.bool("REQUEST_LOG_ENABLED", default=True)
+REQUEST_LOG_SAMPLE_RATE = env.float("REQUEST_LOG_SAMPLE_RATE", default=0.1)
+REQUEST_LOG_SLOW_MS = env.int("REQUEST_LOG_SLOW_MS", default=500)
+
+
+# PROFILING
+# ------------------------------------------------------------------------------
+# On-demand profiles (cProfile + SQL + EXPLAIN) of requests carrying a signed
+# `X-Profile` header (`manage.py profiling_token`) or made by users an admin
+# switched profiling on for; browse them at /admin/profiles/.
+# See orderflow/contrib/profiling.py.
+PROFILING_ENABLED = env.bool("PROFILING_ENABLED", default=False)
+PROFILING_DIR = env("PROFILING_DIR", default=str(BASE_DIR.parent / "build" / "profiles"))
+PROFILING_MAX_PROFILES = env.int("PROFILING_MAX_PROFILES", default=50)
+PROFILING_TOKEN_MAX_AGE = env.int("PROFILING_TOKEN_MAX_AGE", default=3600)
+# Plans of the N slowest distinct SELECTs; ANALYZE runs each of them again.
+PROFILING_EXPLAIN_LIMIT = env.int("PROFILING_EXPLAIN_LIMIT", default=10)
+PROFILING_EXPLAIN_ANALYZE = env.bool("PROFILING_EXPLAIN_ANALYZE", default=False)
+# Must be shared (CACHE_URL) for the admin toggle to reach every worker.
+PROFILING_CACHE_ALIAS = env("PROFILING_CACHE_ALIAS", default="default")
 
 
 # STATIC FILES
@@ -153,15 +308,12 @@ AUTH_USER_MODEL = "users.User"
 
 # REST_FRAMEWORK CONFIGS
 REST_FRAMEWORK = {
-    # SCHEMA_CLASS
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_RENDERER_CLASSES": [
         "rest_framework.renderers.JSONRenderer",
     ],
     # AUTHENTICATION_CLASSES with JWT
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
-        "rest_framework.authentication.SessionAuthentication",
     ),
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
@@ -172,14 +324,27 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
-    "DEFAULT_THROTTLE_CLASSES": ["rest_framework.throttling.ScopedRateThrottle"],
+    "DEFAULT_THROTTLE_CLASSES": [
+        "orderflow.contrib.throttling.SlidingWindowScopedRateThrottle"
+    ],
+    # THROTTLE_RATE_<SCOPE> overrides a rate (e.g. for load tests)
     "DEFAULT_THROTTLE_RATES": {
-        "users": "120/minute",
-        "authentication": "6/minute",
-        "orders": "50/minute",
+        "users": env("THROTTLE_RATE_USERS", default="120/minute"),
+        "authentication": env("THROTTLE_RATE_AUTHENTICATION", default="6/minute"),
+        "orders": env("THROTTLE_RATE_ORDERS", default="50/minute"),
+        "analytics": env("THROTTLE_RATE_ANALYTICS", default="30/minute"),
+        "analytics_reports": env("THROTTLE_RATE_ANALYTICS_REPORTS", default="6/minute"),
+        "otp_mobile": env("THROTTLE_RATE_OTP_MOBILE", default="5/hour"),
     },
     "EXCEPTION_HANDLER": "orderflow.contrib.exception_handlers.error_handler",
 }
+if API_DOCS_ENABLED:
+    # SCHEMA_CLASS
+    REST_FRAMEWORK["DEFAULT_SCHEMA_CLASS"] = "drf_spectacular.openapi.AutoSchema"
+
+# Serve the order/user GET endpoints with async views (see orderflow.contrib.async_views).
+# orderflow/asgi.py turns this on; under WSGI the DRF viewsets handle everything.
+ASYNC_VIEWS_ENABLED = env.bool("ASYNC_VIEWS_ENABLED", default=False)
 
 # JWT Settings
 SIMPLE_JWT = {
@@ -190,8 +355,54 @@ SIMPLE_JWT = {
 }
 
 
+# Cache holding throttle counters; must be shared (CACHE_URL) for limits to hold
+# across worker processes.
+THROTTLE_CACHE_ALIAS = env("THROTTLE_CACHE_ALIAS", default="default")
+
+
+# USERS
+# ------------------------------------------------------------------------------
+# Max ids + mobiles accepted by POST /api/v1/users/batch
+USERS_BATCH_LOOKUP_MAX_SIZE = env.int("USERS_BATCH_LOOKUP_MAX_SIZE", default=200)
+
+
+# ORDERS
+# ------------------------------------------------------------------------------
+# `manage.py archive_orders` moves orders created before the start of the month this
+# many months ago into the archive tier (see orderflow.orders.archive).
+ORDER_ARCHIVE_AFTER_MONTHS = env.int("ORDER_ARCHIVE_AFTER_MONTHS", default=24)
+
+
+# ANALYTICS
+# ------------------------------------------------------------------------------
+# Rows fetched per round trip (and reduced per NumPy pass) by the ad-hoc reports in
+# orderflow.analytics.reports; bounds their memory use.
+ANALYTICS_REPORT_CHUNK_SIZE = env.int("ANALYTICS_REPORT_CHUNK_SIZE", default=20000)
+
+
+# OTP
+# ------------------------------------------------------------------------------
+# Backend that issues and consumes one-time passwords (see orderflow.users.otp_stores):
+#   - orderflow.users.otp_stores.DatabaseOTPStore (rows in users_otp)
+#   - orderflow.users.otp_stores.CacheOTPStore (TTL entries in OTP_CACHE_ALIAS)
+OTP_STORE = env("OTP_STORE", default="orderflow.users.otp_stores.DatabaseOTPStore")
+OTP_CACHE_ALIAS = env("OTP_CACHE_ALIAS", default="default")
+# Outbound delivery (drained by `manage.py deliver_otps`, see orderflow.users.delivery)
+OTP_TRANSPORT = env("OTP_TRANSPORT", default="orderflow.users.delivery.LoggingTransport")
+OTP_DELIVERY_BATCH_SIZE = env.int("OTP_DELIVERY_BATCH_SIZE", default=100)
+OTP_DELIVERY_MAX_ATTEMPTS = env.int("OTP_DELIVERY_MAX_ATTEMPTS", default=5)
+OTP_DELIVERY_RETRY_BASE_SECONDS = env.int("OTP_DELIVERY_RETRY_BASE_SECONDS", default=2)
+OTP_DELIVERY_RETRY_MAX_SECONDS = env.int("OTP_DELIVERY_RETRY_MAX_SECONDS", default=300)
+# Outbox rows (sent, failed or expired) are deleted by `deliver_otps` after this many days
+OTP_OUTBOX_RETENTION_DAYS = env.int("OTP_OUTBOX_RETENTION_DAYS", default=7)
+
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "orderflow API",
     "DESCRIPTION": "Documentation",
     "VERSION": "1.0.0",
 }
+
+# Serve /schema/ from this file (written by `manage.py build_openapi_schema`, e.g. at
+# image build time) instead of introspecting every view on each request.
+API_SCHEMA_FILE = env("API_SCHEMA_FILE", default=None)
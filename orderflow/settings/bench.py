@@ -0,0 +1,32 @@
+"""
+Settings for `manage.py bench_api`: the production request path (no debug
+toolbar, no browsable API) with throttling disabled, on Postgres or, with
+BENCH_DATABASE=sqlite, a local SQLite file.
+"""
+
+from .base import *  # noqa
+from .base import REST_FRAMEWORK, env
+
+DEBUG = False
+ALLOWED_HOSTS = ["*"]
+
+# Benchmarks replay hundreds of requests per user and client address.
+REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] = {
+    scope: None for scope in REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]
+}
+
+if env("BENCH_DATABASE", default="postgres") == "sqlite":
+    # Run `migrate` with these settings first.
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": env(
+                "BENCH_SQLITE_PATH",
+                default=str(BASE_DIR.parent / "build" / "bench.sqlite3"),  # noqa F405
+            ),
+        }
+    }
+    DATABASE_REPLICAS = []
+
+# One JSON line per write would bury the results table.
+REQUEST_LOG_ENABLED = False
@@ -1,7 +1,5 @@
-import socket
-
 from .base import *  # noqa F403
-from .base import REST_FRAMEWORK
+from .base import REST_FRAMEWORK, env
 
 # GENERAL
 # ------------------------------------------------------------------------------
@@ -14,8 +12,8 @@ ALLOWED_HOSTS = ["*"]
 
 # Django Debug Toolbar
 # https://docs.djangoproject.com/en/4.2/intro/tutorial08/#installing-django-debug-toolbar
-hostname, _, ips = socket.gethostbyname_ex(socket.gethostname())
-INTERNAL_IPS = [ip[:-1] + "1" for ip in ips] + ["127.0.0.1"]
+# Docker host addresses are added lazily by the callback (no DNS lookups at import).
+INTERNAL_IPS = ["127.0.0.1"]
 
 # django-debug-toolbar
 INSTALLED_APPS += ["debug_toolbar"]  # noqa F405
@@ -26,13 +24,20 @@ MIDDLEWARE += [  # noqa F405
 DEBUG_TOOLBAR_CONFIG = {
     "DISABLE_PANELS": ["debug_toolbar.panels.redirects.RedirectsPanel"],
     "SHOW_TEMPLATE_CONTEXT": True,
+    "SHOW_TOOLBAR_CALLBACK": "orderflow.contrib.devtools.show_toolbar",
 }
 
+# Log requests over their query budget (and N+1 patterns) while developing
+QUERY_BUDGET_MODE = env("QUERY_BUDGET_MODE", default="warn")
+
 # Enable Browsable API Renderer for local development
 REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] += [
     "rest_framework.renderers.BrowsableAPIRenderer",
 ]
 
+# Print OTP codes to the worker log instead of sending them
+OTP_TRANSPORT = env("OTP_TRANSPORT", default="orderflow.users.delivery.ConsoleTransport")
+
 
 # Serve static locally in DEBUG
 STORAGES = {
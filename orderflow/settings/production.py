@@ -1,5 +1,5 @@
 from .base import *  # noqa
-from .base import env
+from .base import REST_FRAMEWORK, env
 
 # ------------------------------------------------------------------------------
 # GENERAL
@@ -7,6 +7,25 @@ from .base import env
 DEBUG = False
 ALLOWED_HOSTS = ["*"]  # Consider setting real domains in production
 
+# ------------------------------------------------------------------------------
+# API DOCS
+# ------------------------------------------------------------------------------
+# Lean profile: workers don't import drf_spectacular or the schema modules unless
+# API_DOCS_ENABLED is set explicitly.
+API_DOCS_ENABLED = env.bool("API_DOCS_ENABLED", default=False)
+if not API_DOCS_ENABLED:
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app != "drf_spectacular"]
+    REST_FRAMEWORK.pop("DEFAULT_SCHEMA_CLASS", None)
+
+# Schema built into the image by `build_openapi_schema` (see the production
+# Dockerfile); /schema/ serves it without importing drf_spectacular.
+API_SCHEMA_FILE = env(
+    "API_SCHEMA_FILE",
+    default=str(
+        BASE_DIR.parent / "build" / f"openapi-{SPECTACULAR_SETTINGS['VERSION']}.json"
+    ),
+)
+
 # ------------------------------------------------------------------------------
 # CORSHEADERS
 # ------------------------------------------------------------------------------
@@ -1,25 +1,30 @@
 import os
+from pathlib import Path
 
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path, re_path
-from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 
+from orderflow.analytics import urls as analytics_urls
+from orderflow.contrib import admin as contrib_admin
 from orderflow.contrib.routers import ExtendableRouter
-from orderflow.orders.urls import router as orders_router
-from orderflow.users.urls import router as users_router
+from orderflow.contrib.views import DatabasePoolStatsView, MetricsView, PrebuiltSchemaView
+from orderflow.orders import urls as orders_urls
+from orderflow.users import urls as users_urls
 
 root_router = ExtendableRouter()
-for r in [
-    users_router,
-    orders_router,
+for app_urls in [
+    users_urls,
+    orders_urls,
+    analytics_urls,
 ]:
-    root_router.extend(r)
+    root_router.extend(app_urls.router, async_views=app_urls.async_views)
 
 
 # Admin URLs
 admin_urlpatterns = [
+    path("admin/profiles/", include(contrib_admin.urlpatterns)),
     path("admin/", admin.site.urls),
 ]
 
@@ -30,22 +35,50 @@ apps_urlpatterns = [
 ]
 
 
-# Schema URLs
-schema_urlpatterns = [
-    path("schema/", SpectacularAPIView.as_view(), name="schema"),
-    path(
-        "schema/swagger-ui/",
-        SpectacularSwaggerView.as_view(url_name="schema"),
-        name="swagger-ui",
-    ),
-    path(
-        "schema/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"
-    ),
+# Internal (operations) URLs
+internal_urlpatterns = [
+    path("internal/db-pool/", DatabasePoolStatsView.as_view(), name="db-pool-stats"),
+    path("internal/metrics/", MetricsView.as_view(), name="metrics"),
 ]
 
 
+# Schema URLs (documentation machinery is only imported when enabled; a schema
+# prebuilt by `build_openapi_schema` is served as a static document)
+schema_urlpatterns = []
+if settings.API_SCHEMA_FILE and Path(settings.API_SCHEMA_FILE).is_file():
+    schema_urlpatterns = [
+        path(
+            "schema/",
+            PrebuiltSchemaView.as_view(schema_file=settings.API_SCHEMA_FILE),
+            name="schema",
+        ),
+    ]
+if settings.API_DOCS_ENABLED:
+    from drf_spectacular.views import (
+        SpectacularAPIView,
+        SpectacularRedocView,
+        SpectacularSwaggerView,
+    )
+
+    schema_urlpatterns = schema_urlpatterns or [
+        path("schema/", SpectacularAPIView.as_view(), name="schema"),
+    ]
+    schema_urlpatterns += [
+        path(
+            "schema/swagger-ui/",
+            SpectacularSwaggerView.as_view(url_name="schema"),
+            name="swagger-ui",
+        ),
+        path(
+            "schema/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"
+        ),
+    ]
+
+
 # Combine all URL patterns
-urlpatterns = admin_urlpatterns + apps_urlpatterns + schema_urlpatterns
+urlpatterns = (
+    admin_urlpatterns + apps_urlpatterns + internal_urlpatterns + schema_urlpatterns
+)
 
 
 if os.environ.get("DJANGO_SETTINGS_MODULE") == "orderflow.settings.local":
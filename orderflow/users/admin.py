@@ -5,7 +5,9 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from django.utils.translation import gettext_lazy as _
 
-from .models import OTP
+from orderflow.contrib import profiling
+
+from .models import OTP, OutboundMessage
 
 User = get_user_model()
 
@@ -133,6 +135,23 @@ class UserAdmin(auth_admin.UserAdmin):
     search_fields = ["id", "username", "first_name", "last_name"]
     list_filter = ["role", "is_active", "is_staff", "is_superuser"]
     readonly_fields = ["id", "date_joined", "last_login"]
+    actions = ["start_profiling", "stop_profiling"]
+
+    # Request profiling (orderflow.contrib.profiling); results in /admin/profiles/
+    @admin.action(description=_("Profile their requests for an hour"))
+    def start_profiling(self, request, queryset):
+        if not request.user.is_superuser:
+            self.message_user(request, _("Only superusers can profile requests."), "error")
+            return
+        for user_id in queryset.values_list("id", flat=True):
+            profiling.profile_user(user_id, 3600)
+        self.message_user(request, _("Profiling %d user(s) for an hour.") % queryset.count())
+
+    @admin.action(description=_("Stop profiling their requests"))
+    def stop_profiling(self, request, queryset):
+        for user_id in queryset.values_list("id", flat=True):
+            profiling.stop_profiling_user(user_id)
+        self.message_user(request, _("Profiling stopped."))
 
 
 @admin.register(OTP)
@@ -171,3 +190,40 @@ class OTPAdmin(admin.ModelAdmin):
     def has_delete_permission(self, request, obj=None) -> bool:
         # Allow deletes if you explicitly want to purge old OTPs from the admin.
         return True
+
+
+@admin.register(OutboundMessage)
+class OutboundMessageAdmin(admin.ModelAdmin):
+    """
+    Read-only view of the OTP outbox, mainly to inspect delivery failures.
+    """
+
+    list_display = (
+        "id",
+        "destination",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "sent_at",
+        "created_at",
+    )
+    ordering = ["-created_at"]
+    search_fields = ["id", "destination"]
+    list_filter = ["status", "created_at"]
+    exclude = ("body",)
+    readonly_fields = (
+        "id",
+        "destination",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "sent_at",
+        "last_error",
+        "created_at",
+    )
+
+    def has_add_permission(self, request, obj=None) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
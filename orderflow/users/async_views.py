@@ -0,0 +1,15 @@
+from orderflow.contrib.async_views import AsyncAPIView
+
+from .serializers import UserSerializer
+from .views import UserViewSetV1
+
+
+class UserMeAsyncView(AsyncAPIView):
+    """
+    GET /api/v1/users/i/ (see `UserViewSetV1.me`).
+    """
+
+    throttle_scope = UserViewSetV1.throttle_scope
+
+    async def get(self, request, *args, **kwargs):
+        return self.render(UserSerializer(request.user).data)
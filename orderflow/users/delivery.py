@@ -0,0 +1,184 @@
+"""
+Outbound OTP delivery.
+
+`send_otp` only writes an `OutboundMessage`; the `deliver_otps` worker drains the
+outbox in batches through `settings.OTP_TRANSPORT`, retrying failures with
+exponential backoff until `OTP_DELIVERY_MAX_ATTEMPTS` is reached. Messages whose
+code has expired are dropped instead of sent, the code is blanked once a message
+is done with (sent, failed or expired), and `purge_messages` deletes rows after
+`OTP_OUTBOX_RETENTION_DAYS`.
+"""
+
+import logging
+import random
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from orderflow.users.models import OTP, OutboundMessage
+
+logger = logging.getLogger(__name__)
+
+# Messages "sent" through LocMemTransport, for tests (like django.core.mail.outbox).
+outbox: list[OutboundMessage] = []
+
+
+def mask_destination(destination: str) -> str:
+    if len(destination) <= 6:
+        return "*" * len(destination)
+    return destination[:2] + "*" * (len(destination) - 6) + destination[-4:]
+
+
+# ---------- transports ----------
+class BaseTransport:
+    """
+    A provider integration. `send_messages` receives at most `max_batch_size`
+    messages and returns `{message_id: error}` for the ones that failed.
+    Raising marks the whole batch as failed.
+    """
+
+    max_batch_size = 100
+
+    def send_messages(self, messages: list[OutboundMessage]) -> dict:
+        raise NotImplementedError
+
+
+class LoggingTransport(BaseTransport):
+    """
+    Default no-op gateway: records that a message went out, never its body.
+    """
+
+    def send_messages(self, messages: list[OutboundMessage]) -> dict:
+        for message in messages:
+            logger.info(
+                "delivered OTP message %s to %s",
+                message.id,
+                mask_destination(message.destination),
+            )
+        return {}
+
+
+class ConsoleTransport(BaseTransport):
+    """
+    Local development only: logs the full message, including the code.
+    """
+
+    def send_messages(self, messages: list[OutboundMessage]) -> dict:
+        for message in messages:
+            logger.info("OTP message to %s: %s", message.destination, message.body)
+        return {}
+
+
+class LocMemTransport(BaseTransport):
+    def send_messages(self, messages: list[OutboundMessage]) -> dict:
+        outbox.extend(messages)
+        return {}
+
+
+def get_transport() -> BaseTransport:
+    return import_string(settings.OTP_TRANSPORT)()
+
+
+# ---------- outbox ----------
+def enqueue(destination: str, body: str) -> OutboundMessage:
+    return OutboundMessage.objects.create(destination=destination, body=body)
+
+
+def _backoff(attempts: int) -> timedelta:
+    base = settings.OTP_DELIVERY_RETRY_BASE_SECONDS
+    delay = min(base * 2 ** (attempts - 1), settings.OTP_DELIVERY_RETRY_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(1.0, 1.25))
+
+
+def _send(transport: BaseTransport, messages: list[OutboundMessage]) -> dict:
+    try:
+        return transport.send_messages(messages)
+    except Exception as e:  # provider down, timeout, ...
+        logger.warning("OTP transport failed for %d message(s): %s", len(messages), e)
+        return {m.id: str(e) for m in messages}
+
+
+@transaction.atomic
+def deliver_pending(
+    *, batch_size: Optional[int] = None, transport: Optional[BaseTransport] = None
+) -> int:
+    """
+    Deliver one batch of due messages; returns how many were attempted.
+    Rows are locked with SKIP LOCKED so several workers can run side by side.
+    """
+    transport = transport or get_transport()
+    batch_size = batch_size or settings.OTP_DELIVERY_BATCH_SIZE
+    now = timezone.now()
+    messages = list(
+        OutboundMessage.objects.select_for_update(skip_locked=True)
+        .filter(status=OutboundMessage.Status.PENDING, next_attempt_at__lte=now)
+        .order_by("next_attempt_at")[:batch_size]
+    )
+
+    # A code past its lifetime can't be used any more: don't send it.
+    expired_before = now - OTP.expiration_time
+    due = []
+    for message in messages:
+        if message.created_at < expired_before:
+            message.status = OutboundMessage.Status.FAILED
+            message.body = ""
+            message.last_error = "OTP expired before delivery."
+        else:
+            due.append(message)
+
+    step = transport.max_batch_size
+    for start in range(0, len(due), step):
+        end = start + step
+        chunk = due[start:end]
+        errors = _send(transport, chunk)
+        for message in chunk:
+            message.attempts += 1
+            error = errors.get(message.id)
+            if error is None:
+                message.status = OutboundMessage.Status.SENT
+                message.sent_at = now
+                message.body = ""
+                message.last_error = ""
+            elif message.attempts >= settings.OTP_DELIVERY_MAX_ATTEMPTS:
+                message.status = OutboundMessage.Status.FAILED
+                message.body = ""
+                message.last_error = error
+            else:
+                message.next_attempt_at = now + _backoff(message.attempts)
+                message.last_error = error
+
+    OutboundMessage.objects.bulk_update(
+        messages,
+        fields=[
+            "status",
+            "attempts",
+            "next_attempt_at",
+            "sent_at",
+            "body",
+            "last_error",
+        ],
+    )
+    return len(messages)
+
+
+def purge_messages(*, batch_size: int = 1000) -> int:
+    """
+    Delete outbox rows older than `OTP_OUTBOX_RETENTION_DAYS` in batches of
+    `batch_size`; returns the number deleted.
+    """
+    cutoff = timezone.now() - timedelta(days=settings.OTP_OUTBOX_RETENTION_DAYS)
+    deleted = 0
+    while True:
+        ids = list(
+            OutboundMessage.objects.filter(created_at__lt=cutoff)
+            .order_by("created_at")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        count, _ = OutboundMessage.objects.filter(id__in=ids).delete()
+        deleted += count
@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from orderflow.users import delivery
+
+PURGE_INTERVAL = 3600  # seconds between outbox purges while idle
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker that drains the OTP outbox through settings.OTP_TRANSPORT and "
+        "deletes rows older than OTP_OUTBOX_RETENTION_DAYS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Messages claimed per round (default: OTP_DELIVERY_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the outbox is empty (default: 1).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain what is currently due, then exit.",
+        )
+
+    def handle(self, *args, **options):
+        transport = delivery.get_transport()
+        total = purged = 0
+        last_purge = None
+        try:
+            while True:
+                handled = delivery.deliver_pending(
+                    batch_size=options["batch_size"], transport=transport
+                )
+                total += handled
+                if handled:
+                    continue
+                # Idle: purge old rows now and then.
+                if last_purge is None or time.monotonic() - last_purge >= PURGE_INTERVAL:
+                    purged += delivery.purge_messages()
+                    last_purge = time.monotonic()
+                if options["once"]:
+                    break
+                # Drop a dead/stale connection before the next poll.
+                close_old_connections()
+                time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(
+            self.style.SUCCESS(f"Processed {total} message(s), purged {purged} old one(s).")
+        )
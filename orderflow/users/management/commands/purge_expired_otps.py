@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from orderflow.users import services
+
+
+class Command(BaseCommand):
+    help = "Delete expired OTP rows in batches (database OTP store only)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows deleted per DELETE statement (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        deleted = services.purge_expired_otps(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired OTP(s)."))
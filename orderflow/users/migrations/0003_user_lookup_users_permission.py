@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:39
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_outboundmessage"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="user",
+            options={
+                "permissions": [("lookup_users", "Can batch look up users")],
+                "verbose_name": "user",
+                "verbose_name_plural": "users",
+            },
+        ),
+    ]
@@ -122,6 +122,9 @@ class User(UUIDPKMixin, AbstractBaseUser, PermissionsMixin):
         verbose_name = _("user")
         verbose_name_plural = _("users")
         swappable = "AUTH_USER_MODEL"
+        permissions = [
+            ("lookup_users", "Can batch look up users"),
+        ]
         indexes = [
             models.Index(fields=["username"]),
             models.Index(fields=["role"]),
@@ -162,3 +165,33 @@ class OTP(UUIDPKMixin, CreatedAtMixin, models.Model):
             models.Index(fields=["destination", "is_used", "created_at"]),
             models.Index(fields=["created_at"]),
         ]
+
+
+# ---- Outbound OTP messages ----
+class OutboundMessage(UUIDPKMixin, CreatedAtMixin, models.Model):
+    """
+    Outbox row for an OTP text. Written in the request, delivered by `deliver_otps`.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        SENT = "SENT", "Sent"
+        FAILED = "FAILED", "Failed"
+
+    destination = models.CharField(max_length=128, editable=False)
+    body = models.TextField(blank=True)  # cleared once delivered
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return str(self.id)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
@@ -0,0 +1,163 @@
+"""
+Pluggable OTP storage.
+
+`settings.OTP_STORE` selects the backend. Every backend expires codes after
+`OTP.expiration_time` and implements `consume()` as an atomic check-and-use, so
+exactly one caller can redeem a given code.
+"""
+
+from typing import Any, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import connections, router
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.module_loading import import_string
+
+from orderflow.contrib.sql import insert_if_exists
+from orderflow.users.models import OTP
+
+
+def _invalid() -> ValidationError:
+    return ValidationError("OTP is invalid.", code="invalid_auth/otp")
+
+
+def _expired() -> ValidationError:
+    return ValidationError("OTP is expired.", code="invalid_auth/otp_expired")
+
+
+def _used() -> ValidationError:
+    return ValidationError("OTP already used.", code="invalid_auth/otp_used")
+
+
+class BaseOTPStore:
+    expiration_time = OTP.expiration_time
+
+    def issue(self, destination: str, password: str, extra: dict[str, Any]) -> OTP:
+        raise NotImplementedError
+
+    def issue_if_user_exists(
+        self, destination: str, password: str, extra: dict[str, Any]
+    ) -> Optional[OTP]:
+        """
+        Issue only when an account with `destination` as username exists.
+        """
+        User = get_user_model()
+        if not User.objects.filter(username=destination).exists():
+            return None
+        return self.issue(destination, password, extra)
+
+    def consume(self, otp_id: str, code: str) -> OTP:
+        """
+        Mark the OTP as used and return it, or raise `ValidationError`.
+        """
+        raise NotImplementedError
+
+
+class DatabaseOTPStore(BaseOTPStore):
+    """
+    Keeps one `OTP` row per code. Expired rows are removed by `purge_expired_otps`.
+    """
+
+    def issue(self, destination: str, password: str, extra: dict[str, Any]) -> OTP:
+        return OTP.objects.create(
+            password=password, destination=destination, extra=extra
+        )
+
+    def issue_if_user_exists(
+        self, destination: str, password: str, extra: dict[str, Any]
+    ) -> Optional[OTP]:
+        # One INSERT ... SELECT ... WHERE EXISTS instead of exists() + INSERT.
+        User = get_user_model()
+        otp = OTP(password=password, destination=destination, extra=extra)
+        users = User.objects.filter(username=destination).values("pk")
+        return otp if insert_if_exists(otp, queryset=users) else None
+
+    def consume(self, otp_id: str, code: str) -> OTP:
+        try:
+            otp_id = OTP._meta.pk.to_python(otp_id)
+        except ValidationError:
+            raise _invalid()
+        using = router.db_for_write(OTP)
+        meta = OTP._meta
+        qn = connections[using].ops.quote_name
+        columns = ", ".join(qn(f.column) for f in meta.concrete_fields)
+        # Check-and-use in a single conditional UPDATE; no row lock round trip.
+        rows = list(
+            OTP.objects.db_manager(using).raw(
+                f"UPDATE {qn(meta.db_table)} SET {qn('is_used')} = %s "
+                f"WHERE {qn('id')} = %s AND {qn('password')} = %s "
+                f"AND {qn('is_used')} = %s AND {qn('created_at')} >= %s "
+                f"RETURNING {columns}",
+                [True, otp_id, code, False, timezone.now() - self.expiration_time],
+            )
+        )
+        if rows:
+            return rows[0]
+        # Failure path only: find out why, for a precise error.
+        otp = OTP.objects.using(using).filter(id=otp_id, password=code).first()
+        if otp is None:
+            raise _invalid()
+        if otp.is_expired():
+            raise _expired()
+        raise _used()
+
+
+class CacheOTPStore(BaseOTPStore):
+    """
+    Keeps codes in `caches[settings.OTP_CACHE_ALIAS]` with a native TTL.
+
+    Use a shared cache (e.g. Redis) when running more than one worker process.
+    Expired and unknown codes are indistinguishable here: both are "invalid".
+    """
+
+    key_prefix = "otp"
+
+    def __init__(self):
+        self.cache = caches[settings.OTP_CACHE_ALIAS]
+
+    def _key(self, otp_id) -> str:
+        return f"{self.key_prefix}:{otp_id}"
+
+    def issue(self, destination: str, password: str, extra: dict[str, Any]) -> OTP:
+        otp = OTP(
+            password=password,
+            destination=destination,
+            extra=extra,
+            created_at=timezone.now(),
+        )
+        self.cache.set(
+            self._key(otp.id),
+            {
+                "password": password,
+                "destination": destination,
+                "extra": extra,
+                "created_at": otp.created_at,
+            },
+            timeout=int(self.expiration_time.total_seconds()),
+        )
+        return otp
+
+    def consume(self, otp_id: str, code: str) -> OTP:
+        key = self._key(otp_id)
+        data = self.cache.get(key)
+        if data is None or not constant_time_compare(data["password"], code):
+            raise _invalid()
+        # `delete()` reports whether this call removed the key: only one caller wins.
+        if not self.cache.delete(key):
+            raise _used()
+        return OTP(
+            id=otp_id,
+            password=data["password"],
+            destination=data["destination"],
+            extra=data["extra"],
+            created_at=data["created_at"],
+            is_used=True,
+        )
+
+
+def get_otp_store() -> BaseOTPStore:
+    return import_string(settings.OTP_STORE)()
@@ -0,0 +1,10 @@
+from rest_framework.permissions import BasePermission
+
+
+class CanLookupUsers(BasePermission):
+    """
+    Admin tooling only: requires 'users.lookup_users'.
+    """
+
+    def has_permission(self, request, view):
+        return request.user.has_perm("users.lookup_users")
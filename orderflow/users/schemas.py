@@ -26,6 +26,18 @@ class TokenPairOutSerializer(drf_serializers.Serializer):
     refresh = drf_serializers.CharField()
 
 
+class UserBatchNotFoundSerializer(drf_serializers.Serializer):
+    ids = drf_serializers.ListField(child=drf_serializers.UUIDField())
+    mobiles = drf_serializers.ListField(child=drf_serializers.CharField())
+
+
+class UserBatchLookupOutSerializer(drf_serializers.Serializer):
+    """Response shape for the batch user lookup."""
+
+    results = user_serializers.UserSerializer(many=True)
+    not_found = UserBatchNotFoundSerializer()
+
+
 class OTPIdOutSerializer(drf_serializers.Serializer):
     """Response shape for OTP step1 endpoints."""
 
@@ -126,6 +138,24 @@ EXAMPLE_ME_RES = OpenApiExample(
     response_only=True,
 )
 
+EXAMPLE_BATCH_LOOKUP_REQ = OpenApiExample(
+    name="Batch lookup (request)",
+    value={
+        "ids": ["7f33c9d4-3bc0-40e4-97b7-f7294dd6de31"],
+        "mobiles": ["09123456789"],
+    },
+    request_only=True,
+)
+
+EXAMPLE_BATCH_LOOKUP_RES = OpenApiExample(
+    name="Batch lookup (response)",
+    value={
+        "results": [EXAMPLE_ME_RES.value],
+        "not_found": {"ids": [], "mobiles": ["09120000000"]},
+    },
+    response_only=True,
+)
+
 # ------------------------------------------------------------------------------
 # Tags
 # ------------------------------------------------------------------------------
@@ -242,3 +272,22 @@ me_schema = extend_schema(
     responses={200: user_serializers.UserSerializer, 401: APIErrorSerializer},
     examples=[EXAMPLE_ME_RES],
 )
+
+batch_lookup_schema = extend_schema(
+    tags=TAGS_USERS,
+    operation_id="users_batch_lookup",
+    summary="Look up many users at once (admin)",
+    description=(
+        "Resolve up to `USERS_BATCH_LOOKUP_MAX_SIZE` user ids and/or mobiles in a "
+        "single query. Requires the `users.lookup_users` permission. "
+        "Unknown ids/mobiles are listed under `not_found`."
+    ),
+    request=user_serializers.UserBatchLookupSerializer,
+    responses={
+        200: UserBatchLookupOutSerializer,
+        400: APIErrorSerializer,
+        401: APIErrorSerializer,
+        403: APIErrorSerializer,
+    },
+    examples=[EXAMPLE_BATCH_LOOKUP_REQ, EXAMPLE_BATCH_LOOKUP_RES],
+)
@@ -0,0 +1,11 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+
+User = get_user_model()
+
+
+def users_by_ids_or_mobiles(*, ids=(), mobiles=()):
+    """
+    One query for any mix of user ids and mobiles (usernames).
+    """
+    return User.objects.filter(Q(id__in=ids) | Q(username__in=mobiles))
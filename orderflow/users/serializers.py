@@ -1,10 +1,10 @@
-from uuid import uuid4
-
+from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model
 from rest_framework import serializers
 from rest_framework_simplejwt import serializers as jwt_serializers
 
 from orderflow.users import services
+from orderflow.users.models import OTP
 
 User = get_user_model()
 
@@ -44,11 +44,10 @@ class MobileSignInStep1Serializer(serializers.Serializer):
     otp_id = serializers.CharField(read_only=True)
 
     def create(self, validated_data):
-        username = validated_data["mobile"]
-        if User.objects.filter(username=username).exists():
-            otp = services.send_otp(username)
-            return {"otp_id": str(otp.id)}
-        return {"otp_id": str(uuid4())}
+        otp = services.send_sign_in_otp(validated_data["mobile"])
+        # Unknown mobiles get a decoy id of the same kind as a real OTP's, so
+        # neither the response nor the id's version reveals whether they exist.
+        return {"otp_id": str(otp.id if otp else OTP._meta.pk.default())}
 
 
 class SignInStep2Serializer(serializers.Serializer):
@@ -116,3 +115,26 @@ class UserSerializer(serializers.ModelSerializer):
             "date_joined",
             "last_login",
         ]
+
+
+# -------- Batch lookup (admin tooling) --------
+class UserBatchLookupSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.UUIDField(), required=False, default=list
+    )
+    mobiles = serializers.ListField(
+        child=serializers.RegexField(r"^09\d{9}$", max_length=11),
+        required=False,
+        default=list,
+    )
+
+    def validate(self, attrs):
+        total = len(attrs["ids"]) + len(attrs["mobiles"])
+        if not total:
+            raise serializers.ValidationError("Provide at least one id or mobile.")
+        limit = settings.USERS_BATCH_LOOKUP_MAX_SIZE
+        if total > limit:
+            raise serializers.ValidationError(
+                f"At most {limit} ids and mobiles per request."
+            )
+        return attrs
@@ -4,71 +4,115 @@ from typing import Any, Optional
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError, transaction
+from django.db import transaction
+from django.utils import timezone
 
+from orderflow.contrib.sql import insert_ignore_conflicts
+from orderflow.users import delivery
 from orderflow.users.models import OTP, Roles
+from orderflow.users.otp_stores import get_otp_store
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
+def _queue_otp_message(otp: OTP) -> None:
+    delivery.enqueue(
+        otp.destination, f"Your OrderFlow verification code: {otp.password}"
+    )
+    if logger.isEnabledFor(logging.INFO):  # skip masking when nobody listens
+        logger.info(
+            "queued OTP %s",
+            otp.id,
+            extra={"destination": delivery.mask_destination(otp.destination)},
+        )
+
+
+@transaction.atomic(savepoint=False)
 def send_otp(destination: str, extra: dict[str, Any] | None = None) -> OTP:
+    """
+    Persist the code and queue its text; delivery happens in the `deliver_otps` worker.
+    """
     code = str(randint(10_000, 99_999))
-    otp = OTP.objects.create(password=code, destination=destination, extra=extra or {})
-    logger.info("sent OTP to %s , code: %s, ID: %s", destination, code, otp.id)
+    otp = get_otp_store().issue(destination, code, extra or {})
+    _queue_otp_message(otp)
     return otp
 
 
 @transaction.atomic(savepoint=False)
-def _use_otp(otp_id: str, code: str) -> OTP:
-    otp = OTP.objects.filter(id=otp_id, password=code).select_for_update().first()
-    if otp is None:
-        raise ValidationError("OTP is invalid.", code="invalid_auth/otp")
-    if otp.is_expired():
-        raise ValidationError("OTP is expired.", code="invalid_auth/otp_expired")
-    if otp.is_used:
-        raise ValidationError("OTP already used.", code="invalid_auth/otp_used")
-    otp.is_used = True
-    otp.save()
+def send_sign_in_otp(username: str) -> Optional[OTP]:
+    """
+    Like `send_otp`, but only for existing accounts; returns None otherwise.
+    """
+    code = str(randint(10_000, 99_999))
+    otp = get_otp_store().issue_if_user_exists(username, code, {})
+    if otp is not None:
+        _queue_otp_message(otp)
     return otp
 
 
-@transaction.atomic(savepoint=False)
-def _create_customer(username: str, *, password: Optional[str] = None) -> User:  # type: ignore
-    try:
-        user = User(
-            username=username,
-            is_active=True,
-            first_name="",
-            last_name="",
-            role=Roles.CUSTOMER,
+def _use_otp(otp_id: str, code: str) -> OTP:
+    return get_otp_store().consume(otp_id, code)
+
+
+def purge_expired_otps(*, batch_size: int = 1000) -> int:
+    """
+    Delete expired `OTP` rows in batches of `batch_size`; returns the number deleted.
+    Only the database store keeps rows, cache-backed codes expire on their own.
+    """
+    cutoff = timezone.now() - OTP.expiration_time
+    deleted = 0
+    while True:
+        ids = list(
+            OTP.objects.filter(created_at__lt=cutoff)
+            .order_by("created_at")
+            .values_list("id", flat=True)[:batch_size]
         )
-        if password:
-            user.set_password(password)
-        else:
-            user.set_unusable_password()
-        user.save()
-        return user
-    except IntegrityError as e:
-        if "duplicate key value" in str(e) and "username" in str(e):
-            raise ValidationError(
-                "This mobile is already registered.", code="invalid_auth/duplicate"
-            )
-        raise
+        if not ids:
+            return deleted
+        count, _ = OTP.objects.filter(id__in=ids).delete()
+        deleted += count
+
+
+def _create_customer(
+    username: str, *, password: Optional[str] = None
+) -> Optional[User]:  # type: ignore
+    """
+    INSERT ... ON CONFLICT (username) DO NOTHING; returns None if the mobile is taken.
+    """
+    user = User(
+        username=username,
+        is_active=True,
+        first_name="",
+        last_name="",
+        role=Roles.CUSTOMER,
+    )
+    if password:
+        user.set_password(password)
+    else:
+        user.set_unusable_password()
+    if not insert_ignore_conflicts(user, conflict_fields=["username"]):
+        return None
+    return user
 
 
-@transaction.atomic(savepoint=False)
 def register_user_by_password(username: str, password: str) -> User:  # type: ignore
-    return _create_customer(username, password=password)
+    user = _create_customer(username, password=password)
+    if user is None:
+        raise ValidationError(
+            "This mobile is already registered.", code="invalid_auth/duplicate"
+        )
+    return user
 
 
 @transaction.atomic(savepoint=False)
 def register_user_by_otp(otp_id: str, code: str) -> User:  # type: ignore
     otp = _use_otp(otp_id, code)
-    user = User.objects.filter(username=otp.destination).first()
-    if user:
-        return user
-    return _create_customer(otp.destination)
+    # New mobiles take one INSERT; only a returning user needs the extra SELECT.
+    user = _create_customer(otp.destination)
+    if user is None:
+        user = User.objects.get(username=otp.destination)
+    return user
 
 
 @transaction.atomic(savepoint=False)
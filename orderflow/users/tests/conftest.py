@@ -1,10 +1,17 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
 from .factories import UserFactory
 
 
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    # Throttle counters live in the cache; don't let them leak between tests.
+    cache.clear()
+
+
 @pytest.fixture
 def user(db):
     return UserFactory()
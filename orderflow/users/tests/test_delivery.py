@@ -0,0 +1,132 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from orderflow.users import delivery
+from orderflow.users import services as s
+from orderflow.users.models import OTP, OutboundMessage
+
+pytestmark = pytest.mark.django_db
+
+
+class FlakyTransport(delivery.BaseTransport):
+    max_batch_size = 2
+
+    def __init__(self, fail_destinations=()):
+        self.fail_destinations = set(fail_destinations)
+        self.calls = []
+
+    def send_messages(self, messages):
+        self.calls.append([m.destination for m in messages])
+        return {
+            m.id: "boom" for m in messages if m.destination in self.fail_destinations
+        }
+
+
+@pytest.fixture(autouse=True)
+def locmem_transport(settings):
+    settings.OTP_TRANSPORT = "orderflow.users.delivery.LocMemTransport"
+    delivery.outbox.clear()
+    yield
+    delivery.outbox.clear()
+
+
+class TestSendOtpEnqueues:
+    def test_send_otp_only_writes_outbox(self):
+        otp = s.send_otp("09121234567")
+        message = OutboundMessage.objects.get()
+        assert message.status == OutboundMessage.Status.PENDING
+        assert message.destination == "09121234567"
+        assert otp.password in message.body
+        assert delivery.outbox == []
+
+
+class TestDeliverPending:
+    def test_delivers_and_clears_body(self):
+        s.send_otp("09121234567")
+        assert delivery.deliver_pending() == 1
+
+        message = OutboundMessage.objects.get()
+        assert message.status == OutboundMessage.Status.SENT
+        assert message.sent_at is not None
+        assert message.body == ""
+        assert [m.destination for m in delivery.outbox] == ["09121234567"]
+
+    def test_batches_per_transport_call(self):
+        for n in range(5):
+            delivery.enqueue(f"0912000000{n}", "code")
+        transport = FlakyTransport()
+        assert delivery.deliver_pending(transport=transport) == 5
+        assert [len(c) for c in transport.calls] == [2, 2, 1]
+
+    def test_failure_is_retried_with_backoff(self, settings):
+        settings.OTP_DELIVERY_RETRY_BASE_SECONDS = 10
+        delivery.enqueue("09121234567", "code")
+        delivery.enqueue("09127654321", "code")
+        transport = FlakyTransport(fail_destinations={"09121234567"})
+
+        delivery.deliver_pending(transport=transport)
+
+        failed = OutboundMessage.objects.get(destination="09121234567")
+        assert failed.status == OutboundMessage.Status.PENDING
+        assert failed.attempts == 1
+        assert failed.last_error == "boom"
+        assert failed.next_attempt_at >= timezone.now() + timedelta(seconds=9)
+        sent = OutboundMessage.objects.get(destination="09127654321")
+        assert sent.status == OutboundMessage.Status.SENT
+        # not due yet
+        assert delivery.deliver_pending(transport=transport) == 0
+
+    def test_gives_up_after_max_attempts(self, settings):
+        settings.OTP_DELIVERY_MAX_ATTEMPTS = 2
+        message = delivery.enqueue("09121234567", "code")
+        transport = FlakyTransport(fail_destinations={"09121234567"})
+
+        for _ in range(2):
+            OutboundMessage.objects.filter(id=message.id).update(
+                next_attempt_at=timezone.now()
+            )
+            delivery.deliver_pending(transport=transport)
+
+        message.refresh_from_db()
+        assert message.status == OutboundMessage.Status.FAILED
+        assert message.attempts == 2
+        assert message.body == ""
+
+    def test_expired_codes_are_not_sent(self):
+        stale = delivery.enqueue("09121234567", "code")
+        OutboundMessage.objects.filter(id=stale.id).update(
+            created_at=timezone.now() - OTP.expiration_time - timedelta(seconds=1)
+        )
+        delivery.enqueue("09127654321", "code")
+
+        assert delivery.deliver_pending() == 2
+
+        stale.refresh_from_db()
+        assert stale.status == OutboundMessage.Status.FAILED
+        assert (stale.attempts, stale.body) == (0, "")
+        assert [m.destination for m in delivery.outbox] == ["09127654321"]
+
+    def test_worker_command_once(self):
+        s.send_otp("09121234567")
+        call_command("deliver_otps", "--once")
+        assert len(delivery.outbox) == 1
+
+
+class TestPurgeMessages:
+    def test_deletes_rows_past_retention(self, settings):
+        settings.OTP_OUTBOX_RETENTION_DAYS = 7
+        old = delivery.enqueue("09121234567", "")
+        recent = delivery.enqueue("09127654321", "")
+        OutboundMessage.objects.filter(id=old.id).update(
+            created_at=timezone.now() - timedelta(days=8)
+        )
+        out = StringIO()
+
+        call_command("deliver_otps", "--once", stdout=out)
+
+        assert list(OutboundMessage.objects.values_list("id", flat=True)) == [recent.id]
+        assert "purged 1 old one(s)" in out.getvalue()
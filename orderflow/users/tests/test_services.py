@@ -1,9 +1,11 @@
 from datetime import timedelta
+from io import StringIO
 from uuid import uuid4
 
 import pytest
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
 
 from orderflow.users import services as s
 from orderflow.users.models import OTP
@@ -20,6 +22,11 @@ class Test_use_otp:
             s._use_otp(str(uuid4()), "000000")
         assert "OTP is invalid." in exc.value.messages
 
+    def test_malformed_id(self):
+        with pytest.raises(ValidationError) as exc:
+            s._use_otp("not-a-uuid", "000000")
+        assert "OTP is invalid." in exc.value.messages
+
     def test_wrong_code(self):
         otp = OTPFactory()
         with pytest.raises(ValidationError) as exc:
@@ -55,6 +62,27 @@ class Test_register_user_by_password:
         assert user.username == mobile
         assert user.is_active is True
         assert user.check_password("s3cret!")
+        assert User.objects.get(username=mobile).id == user.id
+
+    def test_duplicate_mobile(self, user, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            with pytest.raises(ValidationError) as exc:
+                s.register_user_by_password(user.username, "s3cret!")
+        assert exc.value.code == "invalid_auth/duplicate"
+
+
+class Test_send_sign_in_otp:
+    def test_existing_user_single_insert_plus_outbox(
+        self, user, django_assert_num_queries
+    ):
+        with django_assert_num_queries(2):
+            otp = s.send_sign_in_otp(user.username)
+        assert OTP.objects.get(id=otp.id).destination == user.username
+
+    def test_unknown_mobile_issues_nothing(self, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            assert s.send_sign_in_otp("09121234567") is None
+        assert not OTP.objects.exists()
 
 
 class Test_register_user_by_otp:
@@ -71,11 +99,17 @@ class Test_register_user_by_otp:
         got = s.register_user_by_otp(str(otp.id), "12345")
         assert got.id == user.id
 
+    def test_new_user_takes_two_statements(self, django_assert_num_queries):
+        otp = OTPFactory()
+        with django_assert_num_queries(2):
+            s.register_user_by_otp(str(otp.id), otp.password)
+
 
 class Test_get_user_by_otp:
-    def test_existing_active_user(self, user):
+    def test_existing_active_user(self, user, django_assert_num_queries):
         otp = OTP.objects.create(destination=user.username, password="123456")
-        got = s.get_user_by_otp(str(otp.id), "123456")
+        with django_assert_num_queries(2):
+            got = s.get_user_by_otp(str(otp.id), "123456")
         assert got.id == user.id
 
     def test_inactive_user(self, inactive_user):
@@ -90,3 +124,54 @@ class Test_get_user_by_otp:
         with pytest.raises(ValidationError) as exc:
             s.get_user_by_otp(str(otp.id), otp.password)
         assert "No account for this mobile. Please sign up first." in exc.value.messages
+
+
+class Test_cache_otp_store:
+    @pytest.fixture(autouse=True)
+    def _cache_store(self, settings):
+        settings.OTP_STORE = "orderflow.users.otp_stores.CacheOTPStore"
+
+    def test_send_does_not_touch_table(self):
+        otp = s.send_otp("09121234567")
+        assert not OTP.objects.exists()
+        got = s._use_otp(str(otp.id), otp.password)
+        assert got.destination == "09121234567"
+        assert got.is_used is True
+
+    def test_wrong_code(self):
+        otp = s.send_otp("09121234567")
+        with pytest.raises(ValidationError) as exc:
+            s._use_otp(str(otp.id), otp.password + "1")
+        assert "OTP is invalid." in exc.value.messages
+
+    def test_consumed_only_once(self):
+        otp = s.send_otp("09121234567")
+        s._use_otp(str(otp.id), otp.password)
+        with pytest.raises(ValidationError) as exc:
+            s._use_otp(str(otp.id), otp.password)
+        assert "OTP is invalid." in exc.value.messages
+
+    def test_register_user_by_otp(self):
+        otp = s.send_otp("09121234567")
+        user = s.register_user_by_otp(str(otp.id), otp.password)
+        assert user.username == "09121234567"
+
+
+class Test_purge_expired_otps:
+    def test_deletes_only_expired_rows_in_batches(self):
+        fresh = OTPFactory()
+        expired = [OTPFactory() for _ in range(3)]
+        OTP.objects.filter(id__in=[o.id for o in expired]).update(
+            created_at=fresh.created_at - OTP.expiration_time - timedelta(minutes=1)
+        )
+
+        assert s.purge_expired_otps(batch_size=2) == 3
+        assert list(OTP.objects.values_list("id", flat=True)) == [fresh.id]
+
+    def test_command(self):
+        otp = OTPFactory()
+        OTP.objects.filter(id=otp.id).update(
+            created_at=otp.created_at - timedelta(days=1)
+        )
+        call_command("purge_expired_otps", "--batch-size", "10", stdout=StringIO())
+        assert not OTP.objects.exists()
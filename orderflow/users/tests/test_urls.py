@@ -22,6 +22,13 @@ def test_user_me():
     assert resolve(url).view_name == name
 
 
+def test_user_batch():
+    name = "v1-user-batch"
+    url = "/api/v1/users/batch"
+    assert reverse(name) == url
+    assert resolve(url).view_name == name
+
+
 def test_authentication_refresh_token():
     name = "v1-authentication-refresh-token"
     url = "/api/v1/auth/refresh-jwt"
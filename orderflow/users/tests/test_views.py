@@ -1,7 +1,19 @@
+from types import ModuleType
+from uuid import UUID, uuid4
+
 import pytest
 from django.contrib.auth import get_user_model
-from django.urls import reverse
+from django.contrib.auth.models import Permission
+from django.urls import include, re_path, resolve, reverse
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from orderflow.contrib.routers import ExtendableRouter
+from orderflow.users import urls as users_urls
+from orderflow.users.async_views import UserMeAsyncView
+from orderflow.users.models import OTP
+
+from .factories import UserFactory
 
 User = get_user_model()
 pytestmark = pytest.mark.django_db
@@ -31,6 +43,38 @@ class TestUsersMe:
         assert resp.status_code == 401
 
 
+class TestUsersMeAsync:
+    url = "/api/v1/users/i/"
+
+    @pytest.fixture(autouse=True)
+    def async_urls(self, settings):
+        settings.ASYNC_VIEWS_ENABLED = True
+        router = ExtendableRouter()
+        router.extend(users_urls.router, async_views=users_urls.async_views)
+        urlconf = ModuleType("async_urls")
+        urlconf.urlpatterns = [re_path(r"^api/", include(router.urls))]
+        settings.ROOT_URLCONF = urlconf
+
+    def test_me_ok(self, user: User, client):  # type: ignore
+        assert resolve(self.url).func.view_class is UserMeAsyncView
+        token = AccessToken.for_user(user)
+        resp = client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {token}")
+        assert resp.status_code == 200
+        assert resp.json()["id"] == str(user.id)
+
+    def test_invalid_token_unauthorized(self, client):
+        resp = client.get(self.url, HTTP_AUTHORIZATION="Bearer nope")
+        assert resp.status_code == 401
+        assert resp.json()["code"] == "token_not_valid"
+
+    def test_inactive_user_unauthorized(self, user: User, client):  # type: ignore
+        token = AccessToken.for_user(user)
+        user.is_active = False
+        user.save()
+        resp = client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {token}")
+        assert resp.status_code == 401
+
+
 class TestUserRetrieve:
     def test_retrieve_self(self, user: User, client: APIClient):  # type: ignore
         client.force_authenticate(user=user)
@@ -47,3 +91,70 @@ class TestUserRetrieve:
         client.force_authenticate(user=user)
         resp = client.get("/api/v1/users/99999999/")
         assert resp.status_code == 404
+
+
+class TestSignInMobileStep1:
+    url = reverse("v1-authentication-sign-in-mobile-step1")
+
+    def test_unknown_mobile_gets_decoy_otp_id(self, client: APIClient):
+        resp = client.post(self.url, {"mobile": "09121234567"}, format="json")
+        assert resp.status_code == 200
+        assert resp.json()["otp_id"]
+
+    def test_existing_user_gets_real_otp(self, user: User, client: APIClient):  # type: ignore
+        resp = client.post(self.url, {"mobile": user.username}, format="json")
+        assert resp.status_code == 200
+        otp_id = resp.json()["otp_id"]
+        assert OTP.objects.filter(id=otp_id, destination=user.username).exists()
+
+    @pytest.mark.parametrize("version", [4, 7])
+    def test_decoy_looks_like_a_real_otp_id(
+        self, user: User, client: APIClient, settings, version  # type: ignore
+    ):
+        settings.UUID_PK_VERSION = version
+        ids = [
+            UUID(client.post(self.url, {"mobile": mobile}, format="json").json()["otp_id"])
+            for mobile in (user.username, "09121234567")
+        ]
+        assert [i.version for i in ids] == [version, version]
+
+
+class TestUserBatchLookup:
+    url = reverse("v1-user-batch")
+
+    def test_requires_lookup_permission(self, user: User, client: APIClient):  # type: ignore
+        client.force_authenticate(user=user)
+        resp = client.post(self.url, {"ids": [str(user.id)]}, format="json")
+        assert resp.status_code == 403
+
+    def test_resolves_ids_and_mobiles_in_one_query(
+        self, user: User, client: APIClient, django_assert_num_queries  # type: ignore
+    ):
+        user.user_permissions.add(Permission.objects.get(codename="lookup_users"))
+        others = [UserFactory() for _ in range(3)]
+        client.force_authenticate(user=User.objects.get(pk=user.pk))
+        payload = {
+            "ids": [str(others[0].id), str(others[1].id), str(uuid4())],
+            "mobiles": [others[2].username, "09120000000"],
+        }
+
+        # permission check (user perms + group perms) + the lookup itself
+        with django_assert_num_queries(3):
+            resp = client.post(self.url, payload, format="json")
+
+        assert resp.status_code == 200
+        body = resp.json()
+        assert {r["id"] for r in body["results"]} == {str(u.id) for u in others}
+        assert body["not_found"] == {
+            "ids": [payload["ids"][2]],
+            "mobiles": ["09120000000"],
+        }
+
+    def test_rejects_too_many(self, user: User, client: APIClient, settings):  # type: ignore
+        settings.USERS_BATCH_LOOKUP_MAX_SIZE = 2
+        user.user_permissions.add(Permission.objects.get(codename="lookup_users"))
+        client.force_authenticate(user=User.objects.get(pk=user.pk))
+        resp = client.post(
+            self.url, {"ids": [str(uuid4()) for _ in range(3)]}, format="json"
+        )
+        assert resp.status_code == 400
@@ -1,6 +1,7 @@
 from rest_framework.routers import DefaultRouter
 
 from . import views as v
+from .async_views import UserMeAsyncView
 
 app_name = "users"
 
@@ -8,4 +9,9 @@ router = DefaultRouter()
 router.register("v1/auth", v.AuthenticationViewSetV1, basename="v1-authentication")
 router.register("v1/users", v.UserViewSetV1, basename="v1-user")
 
+# GET handlers used instead of the viewset's when serving over ASGI
+async_views = {
+    "v1-user-me": UserMeAsyncView,
+}
+
 urlpatterns = []
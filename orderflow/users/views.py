@@ -7,9 +7,14 @@ from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet, ViewSet
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 
-from orderflow.contrib.views import regular_post_action
+from orderflow.contrib.docs import schemas_for
+from orderflow.contrib.throttling import MobileNumberRateThrottle
+from orderflow.contrib.views import ReplicaReadMixin, regular_post_action
 
-from . import schemas, serializers
+from . import selectors, serializers
+from .permissions import CanLookupUsers
+
+schemas = schemas_for(__package__)
 
 User = get_user_model()
 
@@ -30,6 +35,12 @@ class AuthenticationViewSetV1(ViewSet):
         }
         return mapping[self.action]
 
+    def get_throttles(self):
+        throttles = super().get_throttles()
+        if self.action in ("sign_in_mobile_step1", "sign_up_mobile_step1"):
+            throttles.append(MobileNumberRateThrottle())
+        return throttles
+
     def get_serializer(self, *args, **kwargs):
         kwargs["context"] = {
             "request": self.request,
@@ -89,15 +100,18 @@ class AuthenticationViewSetV1(ViewSet):
         pass
 
 
-class UserViewSetV1(RetrieveModelMixin, GenericViewSet):
+class UserViewSetV1(ReplicaReadMixin, RetrieveModelMixin, GenericViewSet):
     permission_classes = (IsAuthenticated,)
     throttle_scope = "users"
     lookup_field = "id"
+    replica_actions = ("batch",)  # POST, but read-only
 
     def get_queryset(self, *args, **kwargs):
         return User.objects.all()
 
     def get_serializer_class(self):
+        if self.action == "batch":
+            return serializers.UserBatchLookupSerializer
         return serializers.UserSerializer
 
     @schemas.me_schema
@@ -105,3 +119,28 @@ class UserViewSetV1(RetrieveModelMixin, GenericViewSet):
     def me(self, request):
         serializer = self.get_serializer(request.user)
         return Response(status=status.HTTP_200_OK, data=serializer.data)
+
+    @schemas.batch_lookup_schema
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="batch",
+        permission_classes=(IsAuthenticated, CanLookupUsers),
+    )
+    def batch(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+        mobiles = serializer.validated_data["mobiles"]
+
+        users = list(selectors.users_by_ids_or_mobiles(ids=ids, mobiles=mobiles))
+        found_ids = {u.id for u in users}
+        found_mobiles = {u.username for u in users}
+        data = {
+            "results": serializers.UserSerializer(users, many=True).data,
+            "not_found": {
+                "ids": [str(i) for i in ids if i not in found_ids],
+                "mobiles": [m for m in mobiles if m not in found_mobiles],
+            },
+        }
+        return Response(status=status.HTTP_200_OK, data=data)